@@ -27,6 +27,9 @@ class DualTokenConfig:
     server_name: str = "moodle-course-creator"
     log_level: str = "INFO"
     
+    # Embed the code stylesheet in every page; when False it is emitted once per course
+    inline_css: bool = True
+    
     @classmethod
     def from_env(cls) -> 'DualTokenConfig':
         """Load configuration from environment variables"""
@@ -52,6 +55,8 @@ class DualTokenConfig:
         # Fallback to single token if dual tokens not provided
         single_token = os.getenv('MOODLE_TOKEN', '')
         
+        inline_css = os.getenv('MOODLE_CLAUDE_INLINE_CSS', 'true').lower() not in ('0', 'false', 'no')
+        
         # Determine token configuration
         if basic_token and plugin_token:
             # Dual token mode
@@ -61,7 +66,8 @@ class DualTokenConfig:
                 plugin_token=plugin_token,
                 username=os.getenv('MOODLE_USERNAME', ''),
                 server_name=os.getenv('SERVER_NAME', 'moodle-course-creator'),
-                log_level=os.getenv('LOG_LEVEL', 'INFO')
+                log_level=os.getenv('LOG_LEVEL', 'INFO'),
+                inline_css=inline_css
             )
         elif single_token:
             # Single token mode (try to use for both basic and plugin operations)
@@ -72,7 +78,8 @@ class DualTokenConfig:
                 single_token=single_token,
                 username=os.getenv('MOODLE_USERNAME', ''),
                 server_name=os.getenv('SERVER_NAME', 'moodle-course-creator'),
-                log_level=os.getenv('LOG_LEVEL', 'INFO')
+                log_level=os.getenv('LOG_LEVEL', 'INFO'),
+                inline_css=inline_css
             )
         else:
             raise ValueError(
@@ -102,5 +109,6 @@ class DualTokenConfig:
             "basic_token_set": bool(self.basic_token),
             "plugin_token_set": bool(self.plugin_token),
             "server_name": self.server_name,
-            "log_level": self.log_level
+            "log_level": self.log_level,
+            "inline_css": self.inline_css
         }
\ No newline at end of file
@@ -0,0 +1,131 @@
+<?php
+// This file is part of Moodle - http://moodle.org/
+//
+// Moodle is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+
+/**
+ * External function to run several MoodleClaude functions in one request
+ *
+ * @package    local_moodleclaude
+ * @copyright  2025 MoodleClaude Project
+ * @license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+ */
+
+namespace local_moodleclaude\external;
+
+defined('MOODLE_INTERNAL') || die();
+
+require_once($CFG->libdir . '/externallib.php');
+
+use external_api;
+use external_function_parameters;
+use external_multiple_structure;
+use external_single_structure;
+use external_value;
+
+/**
+ * External function executing a list of sub-calls so the client pays the
+ * web service bootstrap cost once per batch instead of once per call
+ */
+class batch extends external_api {
+
+    /** Maximum number of sub-calls accepted in one batch */
+    const MAX_CALLS = 50;
+
+    /** Functions that may be called through the batch endpoint */
+    const ALLOWED_FUNCTIONS = [
+        'local_moodleclaude_create_page_activity',
+        'local_moodleclaude_create_label_activity',
+        'local_moodleclaude_create_file_resource',
+        'local_moodleclaude_update_section_content',
+    ];
+
+    /**
+     * Define parameters for the function
+     */
+    public static function execute_parameters() {
+        return new external_function_parameters([
+            'calls' => new external_multiple_structure(
+                new external_single_structure([
+                    'wsfunction' => new external_value(PARAM_ALPHANUMEXT, 'Web service function name'),
+                    'args' => new external_value(PARAM_RAW, 'JSON-encoded function arguments'),
+                ])
+            ),
+        ]);
+    }
+
+    /**
+     * Execute each sub-call in order, isolating their failures
+     */
+    public static function execute($calls) {
+        $params = self::validate_parameters(self::execute_parameters(), ['calls' => $calls]);
+
+        if (count($params['calls']) > self::MAX_CALLS) {
+            throw new \invalid_parameter_exception('Too many calls in batch (max ' . self::MAX_CALLS . ')');
+        }
+
+        $results = [];
+        foreach ($params['calls'] as $call) {
+            $results[] = self::execute_call($call['wsfunction'], $call['args']);
+        }
+
+        return ['results' => $results];
+    }
+
+    /**
+     * Run a single sub-call; each function validates its own context and capabilities
+     */
+    protected static function execute_call($wsfunction, $args) {
+        if (!in_array($wsfunction, self::ALLOWED_FUNCTIONS, true)) {
+            return [
+                'success' => false,
+                'data' => '',
+                'error' => 'Function not allowed in batch: ' . $wsfunction,
+            ];
+        }
+
+        $decodedargs = json_decode($args, true);
+        if (!is_array($decodedargs)) {
+            return [
+                'success' => false,
+                'data' => '',
+                'error' => 'Invalid JSON arguments for ' . $wsfunction,
+            ];
+        }
+
+        $response = external_api::call_external_function($wsfunction, $decodedargs);
+
+        if (!empty($response['error'])) {
+            $exception = $response['exception'] ?? null;
+            return [
+                'success' => false,
+                'data' => '',
+                'error' => $exception ? $exception->message : 'Unknown error',
+            ];
+        }
+
+        return [
+            'success' => true,
+            'data' => json_encode($response['data']),
+            'error' => '',
+        ];
+    }
+
+    /**
+     * Define return values
+     */
+    public static function execute_returns() {
+        return new external_single_structure([
+            'results' => new external_multiple_structure(
+                new external_single_structure([
+                    'success' => new external_value(PARAM_BOOL, 'Whether the sub-call succeeded'),
+                    'data' => new external_value(PARAM_RAW, 'JSON-encoded sub-call result'),
+                    'error' => new external_value(PARAM_TEXT, 'Error message of a failed sub-call'),
+                ])
+            ),
+        ]);
+    }
+}
@@ -66,6 +66,16 @@ $functions = [
         'ajax'        => true,
         'loginrequired' => true,
     ],
+    
+    'local_moodleclaude_batch' => [
+        'classname'   => 'local_moodleclaude\external\batch',
+        'methodname'  => 'execute',
+        'description' => 'Execute several MoodleClaude content functions in one request',
+        'type'        => 'write',
+        'capabilities' => 'moodle/course:manageactivities, moodle/course:update',
+        'ajax'        => true,
+        'loginrequired' => true,
+    ],
 ];
 
 // Define the services
@@ -78,6 +88,7 @@ $services = [
             'local_moodleclaude_create_file_resource',
             'local_moodleclaude_update_section_content',
             'local_moodleclaude_create_course_structure',
+            'local_moodleclaude_batch',
             
             // Essential core functions for web service operation
             'core_webservice_get_site_info',        // Required for token validation
@@ -17,7 +17,7 @@
 defined('MOODLE_INTERNAL') || die();
 
 $plugin->component = 'local_moodleclaude';
-$plugin->version = 2025013002; // YYYYMMDDHH - Added essential core functions
+$plugin->version = 2026101600; // YYYYMMDDHH - Added batch endpoint
 $plugin->requires = 2023100900; // Moodle 4.3+
 $plugin->maturity = MATURITY_STABLE;
-$plugin->release = '1.0.2';
\ No newline at end of file
+$plugin->release = '1.1.0';
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Client-side coalescing of Moodle web service calls
+Collects calls issued within a short window and sends them as one
+local_moodleclaude_batch request
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.clients.resilience import call_deadline, remaining_time, within_deadline
+
+logger = logging.getLogger(__name__)
+
+# A sub-call as (wsfunction, params)
+BatchCall = Tuple[str, Dict[str, Any]]
+# Sends sub-calls and returns one result or Exception per call, in order
+BatchSender = Callable[[List[BatchCall]], Awaitable[List[Any]]]
+# A queued sub-call with its caller's future and absolute deadline, if any
+PendingCall = Tuple[BatchCall, asyncio.Future, Optional[float]]
+
+
+class CallBatcher:
+    """
+    Coalesces concurrent web service calls into batch requests
+
+    The first call of a batch starts a ``window`` timer; calls submitted
+    before it fires join the same batch, which is flushed early once it
+    reaches ``max_calls``. Each caller awaits only its own result under
+    its own deadline, and a sub-call's Exception is raised to that caller
+    alone. A batch is sent under the latest deadline of its callers.
+    """
+
+    def __init__(self, send_batch: BatchSender, window: float = 0.01, max_calls: int = 25):
+        """
+        Initialize call batcher
+
+        Args:
+            send_batch: Coroutine function sending a list of sub-calls
+            window: Seconds to wait for more calls before flushing
+            max_calls: Maximum sub-calls per batch request
+        """
+        self.send_batch = send_batch
+        self.window = window
+        self.max_calls = max_calls
+        self.loop = asyncio.get_running_loop()
+
+        self._pending: List[PendingCall] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight batch sends
+        self._sends: Set[asyncio.Task] = set()
+        self._stats = {"calls": 0, "batches": 0, "largest_batch": 0}
+
+    async def submit(self, function: str, params: Dict[str, Any]) -> Any:
+        """Queue a call for the next batch and wait for its result"""
+        return await within_deadline(self._submit(function, params))
+
+    async def _submit(self, function: str, params: Dict[str, Any]) -> Any:
+        remaining = remaining_time()
+        deadline = None if remaining is None else time.monotonic() + remaining
+        future = self.loop.create_future()
+        self._pending.append(((function, params), future, deadline))
+        self._stats["calls"] += 1
+
+        if len(self._pending) >= self.max_calls:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything pending as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if pending:
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(pending))
+            deadlines = [deadline for _, _, deadline in pending]
+            latest = None if None in deadlines else max(deadlines)
+            # A fresh context, so the send does not inherit whichever caller flushed
+            task = contextvars.Context().run(self.loop.create_task, self._send(pending, latest))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, pending: List[PendingCall], deadline: Optional[float]):
+        calls = [call for call, _, _ in pending]
+        bound = contextlib.nullcontext() if deadline is None else call_deadline(deadline - time.monotonic())
+        try:
+            with bound:
+                results = await self.send_batch(calls)
+            if len(results) != len(calls):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(calls)} calls")
+        except Exception as e:
+            results = [e] * len(calls)
+
+        for (_, future, _), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {**self._stats, "pending": len(self._pending)}
@@ -0,0 +1,158 @@
+"""
+Persisted snapshot of a Moodle site's web service capabilities
+Lets new processes skip the core_webservice_get_site_info probe by reusing
+the available functions, site version and user id of an earlier probe
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from src.clients.ws_responses import SiteInfo
+from src.core.constants import Defaults, Environment
+
+logger = logging.getLogger(__name__)
+
+CAPABILITIES_FILENAME = "capabilities.json"
+
+
+def site_key(base_url: str, token: str) -> str:
+    """Key a snapshot by site and token without storing the token itself"""
+    return hashlib.sha256(f"{base_url.rstrip('/')}\n{token}".encode()).hexdigest()
+
+
+@dataclass
+class CapabilitySnapshot:
+    """Web service functions available to a token, as of ``fetched_at``"""
+    functions: Dict[str, str] = field(default_factory=dict)  # name -> version
+    site_version: str = ""
+    site_release: str = ""
+    userid: Optional[int] = None
+    username: str = ""
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_site_info(cls, site_info: SiteInfo) -> "CapabilitySnapshot":
+        return cls(
+            functions=site_info.function_versions,
+            site_version=site_info.version,
+            site_release=site_info.release,
+            userid=site_info.userid,
+            username=site_info.username,
+            fetched_at=time.time(),
+        )
+
+    def has_function(self, name: str) -> bool:
+        return name in self.functions
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def same_versions(self, other: "CapabilitySnapshot") -> bool:
+        """Whether both snapshots describe the same site and plugin versions"""
+        return self.site_version == other.site_version and self.functions == other.functions
+
+
+class CapabilityStore:
+    """
+    JSON file of capability snapshots keyed by site and token
+
+    Writes replace the file atomically, so concurrent processes only ever
+    read a complete file; the last writer wins.
+    """
+
+    def __init__(self, path: str, max_age: float = Defaults.CAPABILITY_MAX_AGE):
+        """
+        Initialize capability store
+
+        Args:
+            path: JSON file holding the snapshots
+            max_age: Seconds after which a snapshot should be refreshed
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def load(self, base_url: str, token: str) -> Optional[CapabilitySnapshot]:
+        """Return the stored snapshot for a site and token, if any"""
+        entry = self._read().get(site_key(base_url, token))
+        if not entry:
+            return None
+        try:
+            return CapabilitySnapshot(**entry)
+        except TypeError:
+            # Written by an incompatible version; probe again
+            return None
+
+    def save(self, base_url: str, token: str, snapshot: CapabilitySnapshot) -> None:
+        """Store a snapshot for a site and token"""
+        with self._lock:
+            snapshots = self._read()
+            snapshots[site_key(base_url, token)] = asdict(snapshot)
+            self._write(snapshots)
+
+    def invalidate(self, base_url: str, token: str) -> None:
+        """Drop the snapshot of a site and token"""
+        with self._lock:
+            snapshots = self._read()
+            if snapshots.pop(site_key(base_url, token), None) is not None:
+                self._write(snapshots)
+
+    def is_stale(self, snapshot: CapabilitySnapshot) -> bool:
+        return snapshot.age() > self.max_age
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable capability snapshot file {self.path}: {e}")
+            return {}
+
+    def _write(self, snapshots: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(snapshots, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not persist capability snapshot to {self.path}: {e}")
+
+
+def capabilities_path(db_path: str) -> str:
+    """Path of the snapshot file kept next to a sessions database"""
+    return os.path.join(os.path.dirname(db_path) or ".", CAPABILITIES_FILENAME)
+
+
+_shared_store: Optional[CapabilityStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_capability_store() -> CapabilityStore:
+    """
+    Get the process-wide capability store
+
+    The file lives next to the sessions database (MOODLE_CLAUDE_DB_PATH,
+    data/sessions.db by default).
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            db_path = os.getenv(Environment.DB_PATH, Defaults.DB_PATH)
+            _shared_store = CapabilityStore(capabilities_path(db_path))
+        return _shared_store
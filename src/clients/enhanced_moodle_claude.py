@@ -3,16 +3,24 @@ Enhanced MoodleClaude Integration
 Advanced functionality for local_wsmanagesections and core_files_upload
 """
 
+import asyncio
 import json
 import mimetypes
 import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Hashable, List, Optional, Union
 from urllib.parse import urljoin, urlparse
 
 import requests
 
+from src.clients import json_codec
+from src.clients.file_uploader import DraftFileUploader, UploadSource
+from src.clients.http_session import get_shared_session_factory
+from src.clients.param_encoder import encode_params
+from src.core.constants import MoodleWebServices
+from src.core.rate_limiter import get_shared_rate_limiter
+
 
 @dataclass
 class SectionConfig:
@@ -86,13 +94,196 @@ class FileUploadConfig:
     userid: Optional[int] = None
 
 
-class EnhancedMoodleAPI:
+class _EnhancedMoodleAPIBase:
+    """Transport-independent request building shared by the sync and async APIs.
+    
+    Each ``_*_request`` method returns the ``(wsfunction, params)`` pair for an
+    operation, so the sync and async clients only differ in how they send it.
+    """
+
+    def __init__(self, base_url: str, token: str):
+        """Validate and store connection settings.
+        
+        Args:
+            base_url: Base URL of the Moodle installation
+            token: Valid web service authentication token
+            
+        Raises:
+            ValueError: If base_url or token are empty
+        """
+        if not base_url or not token:
+            raise ValueError("base_url and token are required")
+
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+
+    @property
+    def _rest_url(self) -> str:
+        return f"{self.base_url}/webservice/rest/server.php"
+
+    @property
+    def _upload_url(self) -> str:
+        return f"{self.base_url}/webservice/upload.php"
+
+    def _request_data(self, wsfunction: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "wstoken": self.token,
+            "wsfunction": wsfunction,
+            "moodlewsrestformat": "json",
+            **params,
+        }
+
+    @staticmethod
+    def _check_result(result: Any) -> Any:
+        """Raise for Moodle error payloads, otherwise return the result unchanged"""
+        if isinstance(result, dict):
+            if "exception" in result:
+                error_msg = result.get("message", "Unknown Moodle error")
+                raise Exception(f"Moodle API Error: {error_msg}")
+            elif "error" in result:
+                raise Exception(f"Moodle API Error: {result['error']}")
+        return result
+
+    def _create_course_section_request(self, courseid: int, section_config: SectionConfig):
+        params = {
+            "courseid": courseid,
+            "sectionname": section_config.name,
+            "visible": 1 if section_config.visible else 0,
+        }
+
+        if section_config.summary:
+            params["summary"] = section_config.summary
+
+        if section_config.availability_conditions:
+            params["availability"] = json.dumps(section_config.availability_conditions)
+
+        if section_config.position is not None:
+            params["sectionnumber"] = section_config.position
+
+        return "local_wsmanagesections_create_section", params
+
+    @staticmethod
+    def _move_operations(section_moves: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "operation": "move",
+                "sectionid": move["sectionid"],
+                "targetposition": move["position"],
+            }
+            for move in section_moves
+        ]
+
+    def _upload_fields(self, file_config: FileUploadConfig) -> Dict[str, Any]:
+        return {
+            "token": self.token,
+            "itemid": file_config.itemid,
+            "component": file_config.component,
+            "filearea": file_config.filearea,
+            "contextid": file_config.contextid,
+            "filepath": file_config.filepath,
+        }
+
+    @staticmethod
+    def _draft_upload_fields(file_config: FileUploadConfig) -> Dict[str, Any]:
+        """Upload fields beyond the token, itemid and filepath the uploader sets itself"""
+        return {
+            "component": file_config.component,
+            "filearea": file_config.filearea,
+            "contextid": file_config.contextid,
+        }
+
+    @staticmethod
+    def _content_type(filename: str) -> str:
+        return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    @staticmethod
+    def _save_draft_request(file_config: FileUploadConfig, upload_result: Any):
+        """Build the draft-area save call for an upload, or None if nothing was uploaded"""
+        if "error" in upload_result:
+            raise Exception(f"File upload failed: {upload_result['error']}")
+
+        if not upload_result or len(upload_result) == 0:
+            return None
+
+        save_params = {
+            "contextid": file_config.contextid,
+            "component": file_config.component,
+            "filearea": file_config.filearea,
+            "itemid": upload_result[0]["itemid"],
+            "filepath": file_config.filepath,
+            "filename": file_config.filename,
+            "author": file_config.author,
+        }
+
+        if file_config.license:
+            save_params["license"] = file_config.license
+
+        return "core_files_save_draft_area_files", save_params
+
+    @staticmethod
+    def _resource_file_config(file_content: bytes, filename: str) -> FileUploadConfig:
+        return FileUploadConfig(
+            filename=filename,
+            content=file_content,
+            contextid=1,  # Will be updated with proper context
+            component="mod_resource",
+            filearea="content",
+        )
+
+    @staticmethod
+    def _file_resource_request(
+        courseid: int, sectionnum: int, name: str, description: str, upload_result: Any
+    ):
+        return "core_course_create_module", {
+            "courseid": courseid,
+            "modulename": "resource",
+            "section": sectionnum,
+            "name": name,
+            "intro": description,
+            "visible": 1,
+            "files": upload_result if isinstance(upload_result, list) else [upload_result],
+        }
+
+    @staticmethod
+    def _url_resource_request(
+        courseid: int, sectionnum: int, name: str, url: str, description: str
+    ):
+        return "core_course_create_module", {
+            "courseid": courseid,
+            "modulename": "url",
+            "section": sectionnum,
+            "name": name,
+            "intro": description,
+            "visible": 1,
+            "externalurl": url,
+        }
+
+    @staticmethod
+    def _create_course_request(
+        fullname: str, shortname: str, categoryid: int, summary: str, format: str
+    ):
+        courses = [
+            {
+                "fullname": fullname,
+                "shortname": shortname,
+                "categoryid": categoryid,
+                "summary": summary,
+                "format": format,
+            }
+        ]
+        return "core_course_create_courses", {"courses": courses}
+
+
+class EnhancedMoodleAPI(_EnhancedMoodleAPIBase):
     """Enhanced Moodle API client with advanced section and file management.
     
     This class provides a high-level interface to Moodle Web Services with specialized
     methods for course section management and file uploads. It handles authentication,
     error handling, and provides convenient methods for complex operations.
     
+    This is the blocking facade for scripts and tests; async code should use
+    AsyncEnhancedMoodleAPI, which builds identical requests.
+    
     Attributes:
         base_url: Base URL of the Moodle installation (without trailing slash)
         token: Web service authentication token
@@ -104,23 +295,21 @@ class EnhancedMoodleAPI:
         >>> print(site_info['sitename'])
     """
 
-    def __init__(self, base_url: str, token: str):
+    def __init__(self, base_url: str, token: str, rate_limiter=None):
         """Initialize the Enhanced Moodle API client.
         
         Args:
             base_url: Base URL of the Moodle installation
             token: Valid web service authentication token
+            rate_limiter: RateLimiter shared with the async clients (shared limiter by default)
             
         Raises:
             ValueError: If base_url or token are empty
         """
-        if not base_url or not token:
-            raise ValueError("base_url and token are required")
-            
-        self.base_url = base_url.rstrip("/")
-        self.token = token
+        super().__init__(base_url, token)
         self.session = requests.Session()
         self.session.timeout = 30
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
 
     def _make_request(self, wsfunction: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make a request to the Moodle Web Service API.
@@ -137,35 +326,12 @@ class EnhancedMoodleAPI:
             json.JSONDecodeError: If response is not valid JSON
             Exception: For Moodle API errors (contains error message)
         """
-        url = f"{self.base_url}/webservice/rest/server.php"
-
-        data = {
-            "wstoken": self.token,
-            "wsfunction": wsfunction,
-            "moodlewsrestformat": "json",
-            **params,
-        }
-
-        try:
-            response = self.session.post(url, data=data)
-            response.raise_for_status()
-
-            result = response.json()
+        self.rate_limiter.acquire_blocking(wsfunction)
 
-            # Check for Moodle API errors
-            if isinstance(result, dict):
-                if "exception" in result:
-                    error_msg = result.get("message", "Unknown Moodle error")
-                    raise Exception(f"Moodle API Error: {error_msg}")
-                elif "error" in result:
-                    raise Exception(f"Moodle API Error: {result['error']}")
+        response = self.session.post(self._rest_url, data=self._request_data(wsfunction, params))
+        response.raise_for_status()
 
-            return result
-
-        except requests.RequestException as e:
-            raise e
-        except json.JSONDecodeError as e:
-            raise e
+        return self._check_result(response.json())
 
     def get_site_info(self) -> Dict[str, Any]:
         """Get basic information about the Moodle site.
@@ -202,22 +368,7 @@ class EnhancedMoodleAPI:
             >>> result = api.create_course_section(123, config)
             >>> print(f"Created section with ID: {result['sectionid']}")
         """
-        params = {
-            "courseid": courseid,
-            "sectionname": section_config.name,
-            "visible": 1 if section_config.visible else 0,
-        }
-
-        if section_config.summary:
-            params["summary"] = section_config.summary
-
-        if section_config.availability_conditions:
-            params["availability"] = json.dumps(section_config.availability_conditions)
-
-        if section_config.position is not None:
-            params["sectionnumber"] = section_config.position
-
-        return self._make_request("local_wsmanagesections_create_section", params)
+        return self._make_request(*self._create_course_section_request(courseid, section_config))
 
     def update_section(self, sectionid: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing section"""
@@ -231,16 +382,7 @@ class EnhancedMoodleAPI:
 
     def move_sections(self, section_moves: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Move multiple sections to new positions"""
-        operations = []
-        for move in section_moves:
-            operations.append(
-                {
-                    "operation": "move",
-                    "sectionid": move["sectionid"],
-                    "targetposition": move["position"],
-                }
-            )
-        return self.bulk_section_operations(operations)
+        return self.bulk_section_operations(self._move_operations(section_moves))
 
     def bulk_section_operations(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Perform bulk operations on sections"""
@@ -255,53 +397,24 @@ class EnhancedMoodleAPI:
     def upload_file(self, file_config: FileUploadConfig) -> Dict[str, Any]:
         """Upload a file to Moodle"""
         # Step 1: Upload file to draft area
-        upload_url = f"{self.base_url}/webservice/upload.php"
-
-        # Prepare file data
         files = {
             "file": (
                 file_config.filename,
                 file_config.content,
-                mimetypes.guess_type(file_config.filename)[0] or "application/octet-stream",
+                self._content_type(file_config.filename),
             )
         }
+        upload_data = self._upload_fields(file_config)
 
-        upload_data = {
-            "token": self.token,
-            "itemid": file_config.itemid,
-            "component": file_config.component,
-            "filearea": file_config.filearea,
-            "contextid": file_config.contextid,
-            "filepath": file_config.filepath,
-        }
-
-        # Upload file
-        upload_response = self.session.post(upload_url, data=upload_data, files=files)
+        self.rate_limiter.acquire_blocking(MoodleWebServices.UPLOAD_FILE)
+        upload_response = self.session.post(self._upload_url, data=upload_data, files=files)
         upload_response.raise_for_status()
         upload_result = upload_response.json()
 
-        if "error" in upload_result:
-            raise Exception(f"File upload failed: {upload_result['error']}")
-
         # Step 2: Save file from draft area
-        if upload_result and len(upload_result) > 0:
-            itemid = upload_result[0]["itemid"]
-
-            save_params = {
-                "contextid": file_config.contextid,
-                "component": file_config.component,
-                "filearea": file_config.filearea,
-                "itemid": itemid,
-                "filepath": file_config.filepath,
-                "filename": file_config.filename,
-                "author": file_config.author,
-            }
-
-            if file_config.license:
-                save_params["license"] = file_config.license
-
-            save_result = self._make_request("core_files_save_draft_area_files", save_params)
-            return save_result
+        save_request = self._save_draft_request(file_config, upload_result)
+        if save_request:
+            return self._make_request(*save_request)
 
         return upload_result
 
@@ -320,44 +433,20 @@ class EnhancedMoodleAPI:
         site_info = self.get_site_info()
 
         # Upload file first
-        file_config = FileUploadConfig(
-            filename=filename,
-            content=file_content,
-            contextid=1,  # Will be updated with proper context
-            component="mod_resource",
-            filearea="content",
-        )
-
-        upload_result = self.upload_file(file_config)
+        upload_result = self.upload_file(self._resource_file_config(file_content, filename))
 
         # Create module
-        module_params = {
-            "courseid": courseid,
-            "modulename": "resource",
-            "section": sectionnum,
-            "name": name,
-            "intro": description,
-            "visible": 1,
-            "files": upload_result if isinstance(upload_result, list) else [upload_result],
-        }
-
-        return self._make_request("core_course_create_module", module_params)
+        return self._make_request(
+            *self._file_resource_request(courseid, sectionnum, name, description, upload_result)
+        )
 
     def create_url_resource(
         self, courseid: int, sectionnum: int, name: str, url: str, description: str = ""
     ) -> Dict[str, Any]:
         """Create a URL resource in a course section"""
-        module_params = {
-            "courseid": courseid,
-            "modulename": "url",
-            "section": sectionnum,
-            "name": name,
-            "intro": description,
-            "visible": 1,
-            "externalurl": url,
-        }
-
-        return self._make_request("core_course_create_module", module_params)
+        return self._make_request(
+            *self._url_resource_request(courseid, sectionnum, name, url, description)
+        )
 
     def get_course_sections(self, courseid: int) -> List[Dict[str, Any]]:
         """Get all sections for a course"""
@@ -373,72 +462,198 @@ class EnhancedMoodleAPI:
         format: str = "topics",
     ) -> Dict[str, Any]:
         """Create a new course"""
-        courses = [
-            {
-                "fullname": fullname,
-                "shortname": shortname,
-                "categoryid": categoryid,
-                "summary": summary,
-                "format": format,
-            }
-        ]
-
-        result = self._make_request("core_course_create_courses", {"courses": courses})
+        result = self._make_request(
+            *self._create_course_request(fullname, shortname, categoryid, summary, format)
+        )
         return result[0] if result else {}
 
 
-class MoodleClaudeIntegration:
-    """Integration layer between Claude and Moodle with enhanced functionality.
+class AsyncEnhancedMoodleAPI(_EnhancedMoodleAPIBase):
+    """Async-native counterpart of EnhancedMoodleAPI.
     
-    This class provides high-level methods for converting Claude chat content
-    into structured Moodle courses with sections, resources, and files. It combines
-    the enhanced API functionality with intelligent content parsing capabilities.
+    Sends the same requests as the sync client over the shared pooled aiohttp
+    session and the shared rate limiter, so it never blocks the event loop and
+    independent operations can be awaited concurrently.
     
-    Attributes:
-        api: EnhancedMoodleAPI instance for Moodle operations
-        moodle_url: Base URL of the Moodle installation
-        
     Example:
-        >>> integration = MoodleClaudeIntegration(
-        ...     "https://moodle.example.com",
-        ...     "your_token_here"
-        ... )
-        >>> course_data = integration.create_structured_course_from_chat(
-        ...     courseid=123,
-        ...     chat_content="# Week 1\nIntroduction to Python..."
-        ... )
+        >>> api = AsyncEnhancedMoodleAPI("https://moodle.example.com", "your_token_here")
+        >>> site_info = await api.get_site_info()
     """
 
-    def __init__(self, moodle_url: str, token: str):
-        """Initialize the MoodleClaude integration.
+    def __init__(self, base_url: str, token: str, rate_limiter=None, session_factory=None):
+        """Initialize the async Enhanced Moodle API client.
         
         Args:
-            moodle_url: Base URL of the Moodle installation
+            base_url: Base URL of the Moodle installation
             token: Valid web service authentication token
+            rate_limiter: Limiter with an async acquire(function) method (shared limiter by default)
+            session_factory: Factory lending pooled HTTP sessions (shared factory by default)
+            
+        Raises:
+            ValueError: If base_url or token are empty
         """
-        self.api = EnhancedMoodleAPI(moodle_url, token)
-        self.moodle_url = moodle_url
+        super().__init__(base_url, token)
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.session_factory = session_factory or get_shared_session_factory()
+        self.uploader = DraftFileUploader(
+            self.base_url, token, session_factory=self.session_factory, rate_limiter=self.rate_limiter
+        )
 
-    def _parse_chat_for_sections(self, chat_content: str) -> List[Dict[str, Any]]:
-        """Parse chat content to extract sections and resources"""
-        sections = []
-        current_section = {"title": "General", "content": "", "files": []}
+    async def _make_request(self, wsfunction: str, params: Dict[str, Any]) -> Any:
+        """Make a request to the Moodle Web Service API.
+        
+        Args:
+            wsfunction: Name of the Moodle web service function to call
+            params: Dictionary of parameters to send with the request
+            
+        Returns:
+            Dictionary containing the API response data
+            
+        Raises:
+            aiohttp.ClientError: For HTTP-related errors
+            json.JSONDecodeError: If response is not valid JSON
+            Exception: For Moodle API errors (contains error message)
+        """
+        session = await self.session_factory.get_session()
+        await self.rate_limiter.acquire(wsfunction)
 
-        lines = chat_content.split("\n")
+        encoded = encode_params(self._request_data(wsfunction, params))
+        async with session.post(
+            self._rest_url, data=encoded.body, headers={"Content-Type": encoded.content_type}
+        ) as response:
+            response.raise_for_status()
+            result = json_codec.loads(await response.read())
 
-        for line in lines:
-            line = line.strip()
+        return self._check_result(result)
 
-            # Check for markdown headers
-            if line.startswith("#"):
-                # Save previous section if it has content
-                if current_section["content"].strip() or current_section["files"]:
-                    sections.append(current_section)
+    async def get_site_info(self) -> Dict[str, Any]:
+        """Get basic information about the Moodle site"""
+        return await self._make_request("core_webservice_get_site_info", {})
 
-                # Start new section
-                header_level = len(line.split()[0])  # Count # characters
-                title = line.lstrip("#").strip()
-                current_section = {
+    async def create_course_section(self, courseid: int, section_config: SectionConfig) -> Dict[str, Any]:
+        """Create a new course section with the specified configuration"""
+        return await self._make_request(*self._create_course_section_request(courseid, section_config))
+
+    async def update_section(self, sectionid: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Update an existing section"""
+        params = {"sectionid": sectionid, **updates}
+        return await self._make_request("local_wsmanagesections_update_section", params)
+
+    async def delete_section(self, sectionid: int) -> Dict[str, Any]:
+        """Delete a section"""
+        params = {"sectionid": sectionid}
+        return await self._make_request("local_wsmanagesections_delete_section", params)
+
+    async def move_sections(self, section_moves: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Move multiple sections to new positions"""
+        return await self.bulk_section_operations(self._move_operations(section_moves))
+
+    async def bulk_section_operations(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Perform bulk operations on sections"""
+        params = {"operations": operations}
+        return await self._make_request("local_wsmanagesections_bulk_operations", params)
+
+    async def duplicate_section(self, sectionid: int, target_courseid: int) -> Dict[str, Any]:
+        """Duplicate a section to another course"""
+        params = {"sectionid": sectionid, "targetcourseid": target_courseid}
+        return await self._make_request("local_wsmanagesections_duplicate_section", params)
+
+    async def upload_file(
+        self, file_config: FileUploadConfig, scope: Optional[Hashable] = None
+    ) -> Dict[str, Any]:
+        """Upload a file to Moodle, reusing an identical payload already uploaded within ``scope``"""
+        # Step 1: Upload file to draft area
+        upload_result = [
+            await self.uploader.upload(
+                UploadSource(
+                    filename=file_config.filename,
+                    content=file_config.content,
+                    filepath=file_config.filepath,
+                    content_type=self._content_type(file_config.filename),
+                ),
+                itemid=file_config.itemid,
+                fields=self._draft_upload_fields(file_config),
+                scope=scope,
+            )
+        ]
+
+        # Step 2: Save file from draft area
+        save_request = self._save_draft_request(file_config, upload_result)
+        if save_request:
+            return await self._make_request(*save_request)
+
+        return upload_result
+
+    async def create_file_resource(
+        self,
+        courseid: int,
+        sectionnum: int,
+        name: str,
+        file_content: bytes,
+        filename: str,
+        description: str = "",
+    ) -> Dict[str, Any]:
+        """Create a file resource in a course section"""
+        # Unlike the sync client, skip the unused site info round-trip
+        upload_result = await self.upload_file(
+            self._resource_file_config(file_content, filename), scope=courseid
+        )
+
+        return await self._make_request(
+            *self._file_resource_request(courseid, sectionnum, name, description, upload_result)
+        )
+
+    async def create_url_resource(
+        self, courseid: int, sectionnum: int, name: str, url: str, description: str = ""
+    ) -> Dict[str, Any]:
+        """Create a URL resource in a course section"""
+        return await self._make_request(
+            *self._url_resource_request(courseid, sectionnum, name, url, description)
+        )
+
+    async def get_course_sections(self, courseid: int) -> List[Dict[str, Any]]:
+        """Get all sections for a course"""
+        params = {"courseid": courseid}
+        return await self._make_request("core_course_get_contents", params)
+
+    async def create_course(
+        self,
+        fullname: str,
+        shortname: str,
+        categoryid: int,
+        summary: str = "",
+        format: str = "topics",
+    ) -> Dict[str, Any]:
+        """Create a new course"""
+        result = await self._make_request(
+            *self._create_course_request(fullname, shortname, categoryid, summary, format)
+        )
+        return result[0] if result else {}
+
+
+class _MoodleClaudeIntegrationBase:
+    """Content parsing and payload building shared by the sync and async integrations"""
+
+    def _parse_chat_for_sections(self, chat_content: str) -> List[Dict[str, Any]]:
+        """Parse chat content to extract sections and resources"""
+        sections = []
+        current_section = {"title": "General", "content": "", "files": []}
+
+        lines = chat_content.split("\n")
+
+        for line in lines:
+            line = line.strip()
+
+            # Check for markdown headers
+            if line.startswith("#"):
+                # Save previous section if it has content
+                if current_section["content"].strip() or current_section["files"]:
+                    sections.append(current_section)
+
+                # Start new section
+                header_level = len(line.split()[0])  # Count # characters
+                title = line.lstrip("#").strip()
+                current_section = {
                     "title": title,
                     "content": "",
                     "files": [],
@@ -489,6 +704,151 @@ class MoodleClaudeIntegration:
 
         return sections
 
+    @staticmethod
+    def _course_shortname(course_name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9]", "", course_name.replace(" ", ""))[:50]
+
+    @staticmethod
+    def _course_id_from(course_result: Any) -> int:
+        # Handle both dict and list responses (for testing compatibility)
+        if isinstance(course_result, list) and len(course_result) > 0:
+            return course_result[0]["id"]
+        elif isinstance(course_result, dict):
+            return course_result["id"]
+        raise ValueError("Unexpected course creation response format")
+
+    @staticmethod
+    def _section_config_for(position: int, section_data: Dict[str, Any]) -> SectionConfig:
+        return SectionConfig(
+            name=section_data["title"],
+            summary=(
+                section_data["content"][:500] + "..."
+                if len(section_data["content"]) > 500
+                else section_data["content"]
+            ),
+            visible=True,
+            position=position,
+        )
+
+    def _course_summary(
+        self, courseid: int, created_sections: List[Dict[str, Any]], sections: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "courseid": courseid,
+            "course_url": f"{self.moodle_url}/course/view.php?id={courseid}",
+            "sections": created_sections,
+            "parsed_content": sections,
+        }
+
+    @staticmethod
+    def _bulk_operations(structure_updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        operations = []
+
+        for update in structure_updates:
+            if update["type"] == "move_section":
+                operations.append(
+                    {
+                        "operation": "move",
+                        "sectionid": update["sectionid"],
+                        "targetposition": update["position"],
+                    }
+                )
+            elif update["type"] == "update_section":
+                operations.append(
+                    {
+                        "operation": "update",
+                        "sectionid": update["sectionid"],
+                        "data": update["data"],
+                    }
+                )
+            elif update["type"] == "duplicate_section":
+                operations.append(
+                    {
+                        "operation": "duplicate",
+                        "sectionid": update["sectionid"],
+                        "targetcourseid": update["target_courseid"],
+                    }
+                )
+            elif update["type"] == "delete_section":
+                operations.append({"operation": "delete", "sectionid": update["sectionid"]})
+
+        return operations
+
+    @staticmethod
+    def _export_structure(courseid: int, sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+        structure = {
+            "courseid": courseid,
+            "sections": [],
+            "total_sections": len(sections),
+            "export_timestamp": __import__("datetime").datetime.now().isoformat(),
+        }
+
+        for section in sections:
+            section_info = {
+                "id": section.get("id"),
+                "name": section.get("name"),
+                "summary": section.get("summary"),
+                "visible": section.get("visible"),
+                "section_number": section.get("section"),
+                "modules": [],
+            }
+
+            # Add module information
+            for module in section.get("modules", []):
+                module_info = {
+                    "id": module.get("id"),
+                    "name": module.get("name"),
+                    "modname": module.get("modname"),
+                    "url": module.get("url"),
+                    "visible": module.get("visible"),
+                }
+                section_info["modules"].append(module_info)
+
+            structure["sections"].append(section_info)
+
+        return structure
+
+    @staticmethod
+    def _import_section_config(section_data: Dict[str, Any]) -> SectionConfig:
+        return SectionConfig(
+            name=section_data["name"],
+            summary=section_data.get("summary", ""),
+            visible=section_data.get("visible", True),
+        )
+
+
+class MoodleClaudeIntegration(_MoodleClaudeIntegrationBase):
+    """Integration layer between Claude and Moodle with enhanced functionality.
+    
+    This class provides high-level methods for converting Claude chat content
+    into structured Moodle courses with sections, resources, and files. It combines
+    the enhanced API functionality with intelligent content parsing capabilities.
+    
+    Attributes:
+        api: EnhancedMoodleAPI instance for Moodle operations
+        moodle_url: Base URL of the Moodle installation
+        
+    Example:
+        >>> integration = MoodleClaudeIntegration(
+        ...     "https://moodle.example.com",
+        ...     "your_token_here"
+        ... )
+        >>> course_data = integration.create_structured_course_from_chat(
+        ...     courseid=123,
+        ...     chat_content="# Week 1\nIntroduction to Python..."
+        ... )
+    """
+
+    def __init__(self, moodle_url: str, token: str):
+        """Initialize the MoodleClaude integration.
+        
+        Args:
+            moodle_url: Base URL of the Moodle installation
+            token: Valid web service authentication token
+        """
+        self.api = EnhancedMoodleAPI(moodle_url, token)
+        self.moodle_url = moodle_url
+
     def create_structured_course_from_chat(
         self, chat_content: str, course_name: str, categoryid: int
     ) -> Dict[str, Any]:
@@ -498,48 +858,26 @@ class MoodleClaudeIntegration:
         sections = self._parse_chat_for_sections(chat_content)
 
         # Create course
-        shortname = re.sub(r"[^a-zA-Z0-9]", "", course_name.replace(" ", ""))[:50]
         course_result = self.api.create_course(
             fullname=course_name,
-            shortname=shortname,
+            shortname=self._course_shortname(course_name),
             categoryid=categoryid,
             summary=f"Course created from Claude conversation",
         )
-
-        # Handle both dict and list responses (for testing compatibility)
-        if isinstance(course_result, list) and len(course_result) > 0:
-            courseid = course_result[0]["id"]
-        elif isinstance(course_result, dict):
-            courseid = course_result["id"]
-        else:
-            raise ValueError("Unexpected course creation response format")
+        courseid = self._course_id_from(course_result)
 
         created_sections = []
 
         # Create sections
         for i, section_data in enumerate(sections):
-            section_config = SectionConfig(
-                name=section_data["title"],
-                summary=(
-                    section_data["content"][:500] + "..."
-                    if len(section_data["content"]) > 500
-                    else section_data["content"]
-                ),
-                visible=True,
-                position=i + 1,
+            section_result = self.api.create_course_section(
+                courseid, self._section_config_for(i + 1, section_data)
             )
-
-            section_result = self.api.create_course_section(courseid, section_config)
             created_sections.append(
                 {"section_info": section_result, "resources": section_data.get("files", [])}
             )
 
-        return {
-            "courseid": courseid,
-            "course_url": f"{self.moodle_url}/course/view.php?id={courseid}",
-            "sections": created_sections,
-            "parsed_content": sections,
-        }
+        return self._course_summary(courseid, created_sections, sections)
 
     def add_resources_to_section(
         self, courseid: int, sectionnum: int, resources: List[Dict[str, Any]]
@@ -602,37 +940,7 @@ class MoodleClaudeIntegration:
         self, courseid: int, structure_updates: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Perform bulk updates to course structure"""
-        operations = []
-
-        for update in structure_updates:
-            if update["type"] == "move_section":
-                operations.append(
-                    {
-                        "operation": "move",
-                        "sectionid": update["sectionid"],
-                        "targetposition": update["position"],
-                    }
-                )
-            elif update["type"] == "update_section":
-                operations.append(
-                    {
-                        "operation": "update",
-                        "sectionid": update["sectionid"],
-                        "data": update["data"],
-                    }
-                )
-            elif update["type"] == "duplicate_section":
-                operations.append(
-                    {
-                        "operation": "duplicate",
-                        "sectionid": update["sectionid"],
-                        "targetcourseid": update["target_courseid"],
-                    }
-                )
-            elif update["type"] == "delete_section":
-                operations.append({"operation": "delete", "sectionid": update["sectionid"]})
-
-        return self.api.bulk_section_operations(operations)
+        return self.api.bulk_section_operations(self._bulk_operations(structure_updates))
 
     def _create_file_resource_from_description(
         self, courseid: int, sectionnum: int, file_info: Dict[str, Any]
@@ -666,41 +974,154 @@ class MoodleClaudeIntegration:
 
     def export_course_structure(self, courseid: int) -> Dict[str, Any]:
         """Export course structure for analysis or backup"""
-        sections = self.api.get_course_sections(courseid)
+        return self._export_structure(courseid, self.api.get_course_sections(courseid))
 
-        structure = {
-            "courseid": courseid,
-            "sections": [],
-            "total_sections": len(sections),
-            "export_timestamp": __import__("datetime").datetime.now().isoformat(),
-        }
+    def import_course_structure(
+        self, structure_data: Dict[str, Any], target_courseid: int
+    ) -> Dict[str, Any]:
+        """Import course structure from exported data"""
+        results = {"imported_sections": [], "errors": []}
 
-        for section in sections:
-            section_info = {
-                "id": section.get("id"),
-                "name": section.get("name"),
-                "summary": section.get("summary"),
-                "visible": section.get("visible"),
-                "section_number": section.get("section"),
-                "modules": [],
-            }
+        for section_data in structure_data.get("sections", []):
+            try:
+                section_result = self.api.create_course_section(
+                    target_courseid, self._import_section_config(section_data)
+                )
+                results["imported_sections"].append(section_result)
 
-            # Add module information
-            for module in section.get("modules", []):
-                module_info = {
-                    "id": module.get("id"),
-                    "name": module.get("name"),
-                    "modname": module.get("modname"),
-                    "url": module.get("url"),
-                    "visible": module.get("visible"),
-                }
-                section_info["modules"].append(module_info)
+            except Exception as e:
+                results["errors"].append(
+                    {"section": section_data.get("name", "Unknown"), "error": str(e)}
+                )
 
-            structure["sections"].append(section_info)
+        return results
 
-        return structure
 
-    def import_course_structure(
+class AsyncMoodleClaudeIntegration(_MoodleClaudeIntegrationBase):
+    """Async integration layer that runs independent Moodle calls concurrently.
+    
+    Mirrors MoodleClaudeIntegration on top of AsyncEnhancedMoodleAPI. Resources
+    are independent, so they are issued concurrently (bounded by
+    ``max_concurrency``) while results keep their input order. Sections stay
+    sequential: creating one at a position shifts the sections after it, so
+    concurrent creates would leave them in completion order.
+    """
+
+    def __init__(self, moodle_url: str, token: str, max_concurrency: int = 4, api=None):
+        """Initialize the async MoodleClaude integration.
+        
+        Args:
+            moodle_url: Base URL of the Moodle installation
+            token: Valid web service authentication token
+            max_concurrency: Maximum Moodle calls in flight per bulk operation
+            api: Optional preconfigured AsyncEnhancedMoodleAPI
+        """
+        self.api = api or AsyncEnhancedMoodleAPI(moodle_url, token)
+        self.moodle_url = moodle_url
+        self.max_concurrency = max_concurrency
+
+    async def _gather_bounded(self, coroutines, return_exceptions: bool = False) -> List[Any]:
+        """Await coroutines with at most max_concurrency in flight, keeping their order"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(
+            *(run(coroutine) for coroutine in coroutines), return_exceptions=return_exceptions
+        )
+
+    async def create_structured_course_from_chat(
+        self, chat_content: str, course_name: str, categoryid: int
+    ) -> Dict[str, Any]:
+        """Create a structured course from chat content with sections"""
+        sections = self._parse_chat_for_sections(chat_content)
+
+        course_result = await self.api.create_course(
+            fullname=course_name,
+            shortname=self._course_shortname(course_name),
+            categoryid=categoryid,
+            summary="Course created from Claude conversation",
+        )
+        courseid = self._course_id_from(course_result)
+
+        created_sections = []
+        for i, section_data in enumerate(sections):
+            section_result = await self.api.create_course_section(
+                courseid, self._section_config_for(i + 1, section_data)
+            )
+            created_sections.append(
+                {"section_info": section_result, "resources": section_data.get("files", [])}
+            )
+
+        return self._course_summary(courseid, created_sections, sections)
+
+    async def _add_resource(self, courseid: int, sectionnum: int, resource: Dict[str, Any]):
+        if resource["type"] == "file":
+            file_path = Path(resource["path"])
+            if not file_path.exists():
+                return None
+            file_content = await asyncio.to_thread(file_path.read_bytes)
+            return await self.api.create_file_resource(
+                courseid=courseid,
+                sectionnum=sectionnum,
+                name=resource.get("name", file_path.name),
+                file_content=file_content,
+                filename=file_path.name,
+                description=resource.get("description", ""),
+            )
+
+        elif resource["type"] == "url":
+            return await self.api.create_url_resource(
+                courseid=courseid,
+                sectionnum=sectionnum,
+                name=resource.get("name", resource["url"]),
+                url=resource["url"],
+                description=resource.get("description", ""),
+            )
+
+        elif resource["type"] == "content":
+            filename = resource.get("filename", "content.txt")
+            return await self.api.create_file_resource(
+                courseid=courseid,
+                sectionnum=sectionnum,
+                name=resource.get("name", filename),
+                file_content=resource["content"].encode("utf-8"),
+                filename=filename,
+                description=resource.get("description", ""),
+            )
+
+        return None
+
+    async def add_resources_to_section(
+        self, courseid: int, sectionnum: int, resources: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Add various types of resources to a course section concurrently"""
+        outcomes = await self._gather_bounded(
+            (self._add_resource(courseid, sectionnum, resource) for resource in resources),
+            return_exceptions=True,
+        )
+
+        results = []
+        for resource, outcome in zip(resources, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error adding resource {resource}: {outcome}")
+            elif outcome is not None:
+                results.append(outcome)
+        return results
+
+    async def bulk_update_course_structure(
+        self, courseid: int, structure_updates: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Perform bulk updates to course structure"""
+        return await self.api.bulk_section_operations(self._bulk_operations(structure_updates))
+
+    async def export_course_structure(self, courseid: int) -> Dict[str, Any]:
+        """Export course structure for analysis or backup"""
+        return self._export_structure(courseid, await self.api.get_course_sections(courseid))
+
+    async def import_course_structure(
         self, structure_data: Dict[str, Any], target_courseid: int
     ) -> Dict[str, Any]:
         """Import course structure from exported data"""
@@ -708,13 +1129,9 @@ class MoodleClaudeIntegration:
 
         for section_data in structure_data.get("sections", []):
             try:
-                section_config = SectionConfig(
-                    name=section_data["name"],
-                    summary=section_data.get("summary", ""),
-                    visible=section_data.get("visible", True),
+                section_result = await self.api.create_course_section(
+                    target_courseid, self._import_section_config(section_data)
                 )
-
-                section_result = self.api.create_course_section(target_courseid, section_config)
                 results["imported_sections"].append(section_result)
 
             except Exception as e:
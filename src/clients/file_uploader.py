@@ -0,0 +1,242 @@
+"""
+Streaming, concurrent uploads to Moodle draft file areas
+Sends file bodies from disk or memory without extra buffering, uploads many
+files in parallel into one draft itemid and skips identical payloads
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+
+from src.clients import json_codec
+from src.clients.http_session import get_shared_session_factory
+from src.core.constants import Defaults, MoodleWebServices
+from src.core.rate_limiter import get_shared_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing files from disk
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised when webservice/upload.php rejects a file"""
+
+
+@dataclass
+class UploadSource:
+    """A file to upload, given either as in-memory content or a local path"""
+    filename: str
+    content: Optional[bytes] = None
+    path: Optional[str] = None
+    filepath: str = "/"
+    content_type: Optional[str] = None
+
+    def __post_init__(self):
+        if (self.content is None) == (self.path is None):
+            raise ValueError("Exactly one of content or path is required")
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DraftFileUploader:
+    """
+    Uploads files to webservice/upload.php
+
+    ``upload_many`` uploads the first file with itemid 0 so Moodle allocates a
+    fresh draft area, then the rest concurrently into that same itemid. With
+    a ``scope`` (normally the course id), a file with the same content, name
+    and path requested for the same itemid is uploaded once and later
+    requests reuse its draft file record. The most recent
+    ``dedupe_entries`` uploads are remembered.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        session_factory=None,
+        rate_limiter=None,
+        max_concurrency: int = Defaults.UPLOAD_CONCURRENCY,
+        dedupe_entries: int = Defaults.UPLOAD_DEDUPE_ENTRIES,
+    ):
+        """
+        Initialize draft file uploader
+
+        Args:
+            base_url: Moodle site URL
+            token: Moodle web service token
+            session_factory: Factory lending pooled HTTP sessions (shared factory by default)
+            rate_limiter: Limiter with an async acquire(function) method (shared limiter by default)
+            max_concurrency: Maximum uploads in flight per upload_many call
+            dedupe_entries: Uploads remembered for dedupe, least recently used dropped first
+        """
+        self.upload_url = f"{base_url.rstrip('/')}/webservice/upload.php"
+        self.token = token
+        self.session_factory = session_factory or get_shared_session_factory()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_concurrency = max_concurrency
+        self.dedupe_entries = dedupe_entries
+
+        # (scope, sha256, filepath, filename, itemid) -> in-flight or finished upload of that file
+        self._uploads: "OrderedDict[Tuple[Hashable, str, str, str, int], asyncio.Future]" = OrderedDict()
+        self._stats = {"uploaded": 0, "deduplicated": 0, "bytes_uploaded": 0}
+
+    async def upload(
+        self,
+        source: UploadSource,
+        itemid: int = 0,
+        fields: Optional[Dict[str, Any]] = None,
+        scope: Optional[Hashable] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a single file, reusing an identical earlier upload within scope
+
+        Args:
+            source: File to upload
+            itemid: Draft itemid (0 lets Moodle allocate one)
+            fields: Extra upload.php form fields (component, filearea, contextid...)
+            scope: Dedupe scope such as a course id; None disables dedupe
+
+        Returns:
+            Draft file record returned by Moodle
+        """
+        if scope is None:
+            return await self._post(source, itemid, fields)
+
+        key = await self._dedupe_key(source, itemid, scope)
+        existing = self._uploads.get(key)
+        if existing is not None:
+            self._uploads.move_to_end(key)
+            self._stats["deduplicated"] += 1
+            logger.debug(f"Reusing draft upload of identical file {source.filename}")
+            return await asyncio.shield(existing)
+
+        future = asyncio.ensure_future(self._post(source, itemid, fields))
+        self._remember(key, future)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # Let a later request retry a payload whose upload failed
+            if self._uploads.get(key) is future:
+                del self._uploads[key]
+            raise
+
+    async def upload_many(
+        self,
+        sources: List[UploadSource],
+        fields: Optional[Dict[str, Any]] = None,
+        scope: Optional[Hashable] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload files concurrently into one draft area
+
+        Returns:
+            Draft file records in the order of ``sources``
+        """
+        if not sources:
+            return []
+
+        # Always a fresh draft area: a reused record would point into another upload's area
+        first = await self._post(sources[0], 0, fields)
+        itemid = first.get("itemid", 0)
+        if scope is not None:
+            # Later copies of the first file in this draft area reuse it
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(first)
+            self._remember(await self._dedupe_key(sources[0], itemid, scope), done)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload_one(source: UploadSource) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.upload(source, itemid, fields, scope)
+
+        rest = await asyncio.gather(*(upload_one(source) for source in sources[1:]))
+        return [first, *rest]
+
+    def forget(self, scope: Hashable) -> None:
+        """Drop dedupe records of a scope, e.g. once its course is finished"""
+        for key in [key for key in self._uploads if key[0] == scope]:
+            del self._uploads[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get upload and dedupe statistics"""
+        return {**self._stats, "tracked_payloads": len(self._uploads)}
+
+    async def _dedupe_key(
+        self, source: UploadSource, itemid: int, scope: Hashable
+    ) -> Tuple[Hashable, str, str, str, int]:
+        # A reused record must name the same file in the draft area the caller asked for
+        return (scope, await self._digest(source), source.filepath, source.filename, itemid)
+
+    def _remember(self, key: Tuple[Hashable, str, str, str, int], future: asyncio.Future) -> None:
+        self._uploads[key] = future
+        self._uploads.move_to_end(key)
+        while len(self._uploads) > self.dedupe_entries:
+            self._uploads.popitem(last=False)
+
+    async def _digest(self, source: UploadSource) -> str:
+        if source.content is not None:
+            return hashlib.sha256(source.content).hexdigest()
+        return await asyncio.to_thread(_hash_file, source.path)
+
+    async def _post(
+        self, source: UploadSource, itemid: int, fields: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        form_fields = {"token": self.token, "filearea": "draft", "itemid": itemid, "filepath": source.filepath}
+        # Caller fields (component, contextid...) may override the draft defaults
+        form_fields.update(fields or {})
+
+        form = aiohttp.FormData()
+        for key, value in form_fields.items():
+            form.add_field(key, str(value))
+
+        session = await self.session_factory.get_session()
+        await self.rate_limiter.acquire(MoodleWebServices.UPLOAD_FILE)
+
+        if source.content is not None:
+            # Bytes are sent as-is, without an intermediate copy
+            form.add_field("file", source.content, filename=source.filename,
+                           content_type=source.content_type)
+            result = await self._send(session, form)
+            size = len(source.content)
+        else:
+            # aiohttp streams open files in chunks instead of reading them whole
+            with open(source.path, "rb") as f:
+                form.add_field("file", f, filename=source.filename, content_type=source.content_type)
+                result = await self._send(session, form)
+                size = f.tell()
+
+        self._stats["uploaded"] += 1
+        self._stats["bytes_uploaded"] += size
+        return result
+
+    async def _send(self, session, form: aiohttp.FormData) -> Dict[str, Any]:
+        try:
+            async with session.post(self.upload_url, data=form) as response:
+                if response.status != 200:
+                    raise UploadError(f"File upload failed: HTTP {response.status}")
+                # upload.php does not always label its JSON as application/json
+                result = json_codec.loads(await response.read())
+        except aiohttp.ClientError as e:
+            raise UploadError(f"Network error during file upload: {str(e)}")
+        except json_codec.DecodeError as e:
+            raise UploadError(f"Invalid JSON response from file upload: {str(e)}")
+
+        if isinstance(result, dict) and "error" in result:
+            raise UploadError(f"File upload failed: {result['error']}")
+        if isinstance(result, list) and result and isinstance(result[0], dict):
+            return result[0]
+        raise UploadError("File upload failed: Invalid response")
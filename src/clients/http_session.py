@@ -0,0 +1,126 @@
+"""
+Shared aiohttp session factory for Moodle clients
+Keeps one pooled keep-alive connector per event loop so course creations
+reuse TCP/TLS connections instead of paying a handshake per tool call
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from src.core.constants import Defaults, Environment
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSessionFactory:
+    """
+    Hands out pooled aiohttp sessions that clients borrow but never own
+
+    aiohttp sessions are bound to the event loop they were created on, so
+    the factory keeps one session per running loop. Sessions live until
+    ``close()`` is called, normally once at server shutdown.
+    """
+
+    def __init__(
+        self,
+        limit: int = Defaults.HTTP_POOL_LIMIT,
+        limit_per_host: int = Defaults.HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = Defaults.HTTP_DNS_CACHE_TTL,
+        keepalive_timeout: float = Defaults.HTTP_KEEPALIVE_TIMEOUT,
+        request_timeout: float = Defaults.HTTP_REQUEST_TIMEOUT,
+    ):
+        """
+        Initialize session factory
+
+        Args:
+            limit: Maximum open connections across all hosts
+            limit_per_host: Maximum open connections to a single Moodle host
+            dns_cache_ttl: Seconds resolved host addresses are cached
+            keepalive_timeout: Seconds idle connections are kept open
+            request_timeout: Total timeout of a single request in seconds
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Drop sessions of loops that have since been closed
+            for stale_loop in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[stale_loop]
+
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self._create_session()
+                self._sessions[loop] = session
+                self._created += 1
+            return session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        logger.debug(f"Creating pooled HTTP session (limit_per_host={self.limit_per_host})")
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+
+    async def close(self) -> None:
+        """Close the session belonging to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration and usage statistics"""
+        with self._lock:
+            open_sessions = [s for s in self._sessions.values() if not s.closed]
+            return {
+                "sessions_created": self._created,
+                "open_sessions": len(open_sessions),
+                "limit": self.limit,
+                "limit_per_host": self.limit_per_host,
+                "dns_cache_ttl": self.dns_cache_ttl,
+            }
+
+
+_shared_factory: Optional[SharedSessionFactory] = None
+_shared_factory_lock = threading.Lock()
+
+
+def get_shared_session_factory() -> SharedSessionFactory:
+    """
+    Get the process-wide session factory used by all Moodle clients
+
+    The per-host connection limit can be tuned with
+    MOODLE_CLAUDE_HTTP_LIMIT_PER_HOST.
+    """
+    global _shared_factory
+    with _shared_factory_lock:
+        if _shared_factory is None:
+            _shared_factory = SharedSessionFactory(
+                limit_per_host=int(
+                    os.getenv(Environment.HTTP_LIMIT_PER_HOST, Defaults.HTTP_POOL_LIMIT_PER_HOST)
+                ),
+            )
+        return _shared_factory
@@ -0,0 +1,55 @@
+"""
+JSON backend for Moodle web service responses
+Uses orjson or msgspec when installed and falls back to the standard library,
+decoding raw response bytes without an intermediate str
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+
+    BACKEND = "orjson"
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode a JSON document"""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode an object as a JSON string"""
+        return orjson.dumps(obj).decode("utf-8")
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    DecodeError = orjson.JSONDecodeError
+
+except ImportError:
+    try:
+        import msgspec
+
+        BACKEND = "msgspec"
+        _decoder = msgspec.json.Decoder()
+        _encoder = msgspec.json.Encoder()
+
+        def loads(data: Union[bytes, str]) -> Any:
+            """Decode a JSON document"""
+            return _decoder.decode(data)
+
+        def dumps(obj: Any) -> str:
+            """Encode an object as a JSON string"""
+            return _encoder.encode(obj).decode("utf-8")
+
+        DecodeError = msgspec.DecodeError
+
+    except ImportError:
+        BACKEND = "json"
+
+        def loads(data: Union[bytes, str]) -> Any:
+            """Decode a JSON document"""
+            return json.loads(data)
+
+        def dumps(obj: Any) -> str:
+            """Encode an object as a JSON string"""
+            return json.dumps(obj)
+
+        DecodeError = json.JSONDecodeError
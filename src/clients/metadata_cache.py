@@ -0,0 +1,198 @@
+"""
+Shared TTL cache for read-only Moodle web service calls
+Coalesces concurrent identical requests into one and drops results that
+write calls make stale
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.core.constants import Environment, MetadataCaching
+
+logger = logging.getLogger(__name__)
+
+# (site, token, wsfunction, normalized params)
+CacheKey = Tuple[str, str, str, str]
+
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    # None and {} are the same request
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+class MetadataCache:
+    """
+    TTL cache of web service results keyed by (site, token, wsfunction, params)
+
+    Only wsfunctions with a TTL are cached. Results are per token, but a
+    write invalidates them for every token of the site, since clients
+    with different tokens (such as basic and plugin tokens) see the same
+    courses. Concurrent misses of the same key
+    share one in-flight request, failures are never cached, and a result
+    whose key was invalidated while it was in flight is not stored. Cached
+    values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = MetadataCaching.MAX_ENTRIES,
+        invalidations: Optional[Dict[str, Tuple[str, ...]]] = None,
+    ):
+        """
+        Initialize metadata cache
+
+        Args:
+            ttls: Seconds each wsfunction's results stay cached
+            max_entries: Maximum number of cached results
+            invalidations: Cached wsfunctions made stale by each write wsfunction
+        """
+        self.ttls = dict(MetadataCaching.TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.invalidations = MetadataCaching.INVALIDATIONS if invalidations is None else invalidations
+
+        # key -> (expires_at, value, courseid)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, CacheKey], asyncio.Future] = {}
+        self._generations: Dict[CacheKey, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0, "evictions": 0}
+
+    def is_cacheable(self, function: str) -> bool:
+        """Whether results of a wsfunction are cached"""
+        return self.ttls.get(function, 0) > 0
+
+    async def get_or_fetch(
+        self,
+        site: str,
+        token: str,
+        function: str,
+        params: Optional[Dict[str, Any]],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the cached result of a call, fetching it on a miss
+
+        Args:
+            site: Moodle site URL
+            token: Web service token the call is made with
+            function: Web service function name
+            params: Call parameters
+            fetch: Coroutine function performing the call
+
+        Returns:
+            The call result
+        """
+        if not self.is_cacheable(function):
+            return await fetch()
+
+        key = (site, token, function, _params_key(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get((loop, key))
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        future = loop.create_future()
+        self._inflight[(loop, key)] = future
+        generation = self._generations.get(key, 0)
+        try:
+            value = await fetch()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters re-raise it; don't warn about a never-retrieved exception
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._inflight[(loop, key)]
+
+        future.set_result(value)
+        if self._generations.get(key, 0) == generation:
+            self._store(key, value, (params or {}).get("courseid"), self.ttls[function])
+        if not any(inflight_key == key for _, inflight_key in self._inflight):
+            self._generations.pop(key, None)
+        return value
+
+    def invalidate(self, site: str, function: str, courseid: Any = None) -> None:
+        """
+        Drop cached results of a wsfunction on a site, for all tokens
+
+        Args:
+            site: Moodle site URL
+            function: Cached wsfunction
+            courseid: Only drop results for this course (and course-less ones)
+        """
+        with self._lock:
+            keys = [
+                key for key, (_, _, entry_course) in self._entries.items()
+                if key[0] == site and key[2] == function
+                and (courseid is None or entry_course is None or entry_course == courseid)
+            ]
+            for key in keys:
+                del self._entries[key]
+            # Results of in-flight calls may predate the write as well
+            for _, key in self._inflight:
+                if key[0] == site and key[2] == function:
+                    self._generations[key] = self._generations.get(key, 0) + 1
+            self._stats["invalidations"] += len(keys)
+
+    def invalidate_for_write(self, site: str, function: str, params: Optional[Dict[str, Any]]) -> None:
+        """Drop cached results a successful write call on a site has made stale"""
+        courseid = (params or {}).get("courseid")
+        for stale in self.invalidations.get(function, ()):
+            self.invalidate(site, stale, courseid)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    def _store(self, key: CacheKey, value: Any, courseid: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, courseid)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+
+_shared_cache: Optional[MetadataCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_metadata_cache() -> MetadataCache:
+    """
+    Get the process-wide metadata cache used by all Moodle clients
+
+    MOODLE_CLAUDE_METADATA_TTL overrides the TTL of every cached wsfunction;
+    set it to 0 to disable caching.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            ttl = os.getenv(Environment.METADATA_TTL)
+            ttls = None if ttl is None else {function: float(ttl) for function in MetadataCaching.TTLS}
+            _shared_cache = MetadataCache(ttls=ttls)
+        return _shared_cache
@@ -4,16 +4,22 @@ Handles authentication and API interactions with Moodle
 """
 
 import asyncio
-import json
 import logging
 import os
 import tempfile
 from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
 import aiohttp
 
-from src.core.constants import Defaults, Messages, ErrorCodes, ActivityTypes, MoodleWebServices, CourseFormats
+from src.core.constants import Defaults, Messages, ErrorCodes, ActivityTypes, MoodleWebServices, CourseFormats, Resilience
+from src.clients.file_uploader import DraftFileUploader, UploadError, UploadSource
+from src.clients import json_codec
+from src.clients.http_session import get_shared_session_factory
+from src.clients.metadata_cache import get_shared_metadata_cache
+from src.clients.param_encoder import encode_params, flatten_params
+from src.clients.resilience import CircuitOpenError, DeadlineExceeded, get_shared_breakers, hedged, within_deadline
+from src.core.rate_limiter import get_shared_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -26,36 +32,54 @@ class MoodleAPIError(Exception):
         self.error_code = error_code
 
 
+def _is_outage(error: BaseException) -> bool:
+    """Whether an error means Moodle is unreachable, failing or too slow, not that a call was rejected"""
+    if isinstance(error, DeadlineExceeded):
+        return error.sent
+    return getattr(error, "error_code", None) == ErrorCodes.CONNECTION_ERROR
+
+
 class MoodleClient:
     """Client for interacting with Moodle Web Services API"""
 
-    def __init__(self, base_url: str, token: str):
+    def __init__(self, base_url: str, token: str, rate_limiter=None, session_factory=None, metadata_cache=None,
+                 breakers=None):
         """
         Initialize Moodle client
 
         Args:
             base_url: Moodle site URL (e.g., https://moodle.example.com)
             token: Moodle web service token
+            rate_limiter: Limiter with an async acquire(function) method (shared limiter by default)
+            session_factory: Factory lending pooled HTTP sessions (shared factory by default)
+            metadata_cache: Cache of read-only call results (shared cache by default)
+            breakers: Circuit breaker registry (shared registry by default)
         """
         self.base_url = base_url.rstrip("/")
+        self.host = urlparse(self.base_url).netloc or self.base_url
         self.token = token
         self.api_url = f"{self.base_url}{Defaults.WEBSERVICE_PATH}"
         self.session = None
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.session_factory = session_factory or get_shared_session_factory()
+        self.metadata_cache = metadata_cache or get_shared_metadata_cache()
+        self.breakers = breakers or get_shared_breakers()
+        self.uploader = DraftFileUploader(
+            self.base_url, token, session_factory=self.session_factory, rate_limiter=self.rate_limiter
+        )
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the pooled session stays open for reuse)"""
 
     async def _ensure_session(self):
-        """Ensure session is created"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Borrow the pooled session for the running event loop"""
+        # Re-borrowed every call: sessions are per loop and the pool may have recycled them
+        self.session = await self.session_factory.get_session()
     
     def _flatten_params(self, params: Dict[str, Any], parent_key: str = '') -> Dict[str, Any]:
         """
@@ -66,33 +90,16 @@ class MoodleClient:
         To:
             {'sections[0][name]': 'test', 'sections[0][activities]': []}
         """
-        items = []
-        
-        if isinstance(params, dict):
-            for k, v in params.items():
-                new_key = f"{parent_key}[{k}]" if parent_key else k
-                
-                if isinstance(v, list):
-                    for i, item in enumerate(v):
-                        list_key = f"{new_key}[{i}]"
-                        if isinstance(item, dict):
-                            items.extend(self._flatten_params(item, list_key).items())
-                        else:
-                            items.append((list_key, item))
-                    # Also add the empty array indicator if list is empty
-                    if not v:
-                        items.append((new_key, []))
-                elif isinstance(v, dict):
-                    items.extend(self._flatten_params(v, new_key).items())
-                else:
-                    items.append((new_key, v))
-        
-        return dict(items)
+        return flatten_params(params, parent_key)
 
     async def _call_api(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Make API call to Moodle
 
+        Read-only metadata calls are answered from the shared metadata cache
+        when possible; successful writes invalidate the results they change.
+        Requests go through the circuit breakers (see _guarded_request).
+
         Args:
             function: Moodle web service function name
             params: Parameters for the function
@@ -103,6 +110,38 @@ class MoodleClient:
         Raises:
             MoodleAPIError: If API call fails
         """
+        if self.metadata_cache.is_cacheable(function):
+            return await self.metadata_cache.get_or_fetch(
+                self.base_url, self.token, function, params, lambda: self._guarded_request(function, params)
+            )
+
+        result = await self._guarded_request(function, params)
+        self.metadata_cache.invalidate_for_write(self.base_url, function, params)
+        return result
+
+    async def _guarded_request(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Send a request unless its host or wsfunction circuit is open
+
+        Idempotent reads are hedged with a duplicate request when slow, and the
+        whole call is bounded by the deadline of the calling MCP tool. The
+        deadline applies inside the circuits, so calls it cuts short count
+        against them.
+        """
+        if function in Resilience.HEDGED_FUNCTIONS:
+            send = lambda: hedged(lambda: self._send_request(function, params), Resilience.HEDGE_DELAY)
+        else:
+            send = lambda: self._send_request(function, params)
+
+        try:
+            return await self.breakers.call(
+                self.host, function, lambda: within_deadline(send()), is_failure=_is_outage
+            )
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            raise MoodleAPIError(str(e), ErrorCodes.CONNECTION_ERROR) from e
+
+    async def _send_request(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a web service request to Moodle"""
         await self._ensure_session()
 
         data = {
@@ -112,25 +151,28 @@ class MoodleClient:
         }
 
         if params:
-            # Functions that need parameter flattening for complex structures
-            flatten_functions = [
-                'local_moodleclaude_create_course_structure',
-                'core_course_create_courses',  # Also used for courses array
-            ]
-            
-            if function in flatten_functions:
-                flattened_params = self._flatten_params(params)
-                data.update(flattened_params)
-            else:
-                data.update(params)
+            data.update(params)
+
+        # Flatten nested params into Moodle's name[0][field] keys and encode once
+        encoded = encode_params(data)
+
+        # Stay within the site and per-function web service budgets
+        await self.rate_limiter.acquire(function)
 
         try:
             if self.session:
-                async with self.session.post(self.api_url, data=data) as response:
+                async with self.session.post(
+                    self.api_url, data=encoded.body, headers={"Content-Type": encoded.content_type}
+                ) as response:
                     if response.status != 200:
-                        raise MoodleAPIError(f"HTTP {response.status}: {await response.text()}")
+                        # Server errors count against the circuit breakers, client errors don't
+                        raise MoodleAPIError(
+                            f"HTTP {response.status}: {await response.text()}",
+                            ErrorCodes.CONNECTION_ERROR if response.status >= 500 else ErrorCodes.API_ERROR,
+                        )
 
-                    result = await response.json()
+                    # Decode the raw body with the fastest available JSON backend
+                    result = json_codec.loads(await response.read())
 
                     # Check for Moodle API errors
                     if isinstance(result, dict) and "exception" in result:
@@ -143,8 +185,10 @@ class MoodleClient:
                 raise MoodleAPIError("No session available")
 
         except aiohttp.ClientError as e:
-            raise MoodleAPIError(f"Network error: {str(e)}")
-        except json.JSONDecodeError as e:
+            raise MoodleAPIError(f"Network error: {str(e)}", ErrorCodes.CONNECTION_ERROR)
+        except asyncio.TimeoutError as e:
+            raise MoodleAPIError(f"Request timed out: {str(e)}", ErrorCodes.CONNECTION_ERROR)
+        except json_codec.DecodeError as e:
             raise MoodleAPIError(f"Invalid JSON response: {str(e)}")
 
     async def create_course(
@@ -256,22 +300,23 @@ class MoodleClient:
             
             logger.info(f"Enrolling user {username} (ID: {user_id}) in course {course_id}")
             
+            # Check existing enrollments and fetch enrollment methods in one round-trip
+            user_courses, enrol_methods = await asyncio.gather(
+                self._call_api('core_enrol_get_users_courses', {'userid': user_id}),
+                self._call_api('core_enrol_get_course_enrolment_methods', {'courseid': course_id}),
+                return_exceptions=True,
+            )
+            
             # Check if user is already enrolled
-            try:
-                user_courses = await self._call_api('core_enrol_get_users_courses', {
-                    'userid': user_id
-                })
-                enrolled_course_ids = [c.get('id') for c in user_courses]
-                if course_id in enrolled_course_ids:
-                    logger.info(f"User {username} already enrolled in course {course_id}")
-                    return
-            except Exception as e:
-                logger.debug(f"Could not check existing enrollments: {e}")
+            if isinstance(user_courses, Exception):
+                logger.debug(f"Could not check existing enrollments: {user_courses}")
+            elif course_id in [c.get('id') for c in user_courses]:
+                logger.info(f"User {username} already enrolled in course {course_id}")
+                return
             
             # Try to enroll via self-enrollment method if available
-            enrol_methods = await self._call_api('core_enrol_get_course_enrolment_methods', {
-                'courseid': course_id
-            })
+            if isinstance(enrol_methods, Exception):
+                raise enrol_methods
             
             # Look for self or manual enrollment method
             for method in enrol_methods:
@@ -690,30 +735,31 @@ class MoodleClient:
         Returns:
             File ID or URL
         """
-        await self._ensure_session()
-
-        upload_url = f"{self.base_url}/webservice/upload.php"
+        try:
+            result = await self.uploader.upload(UploadSource(filename=filename, path=file_path))
+        except UploadError as e:
+            raise MoodleAPIError(str(e))
 
-        with open(file_path, "rb") as f:
-            data = aiohttp.FormData()
-            data.add_field("token", self.token)
-            data.add_field("filearea", "draft")
-            data.add_field("itemid", "0")
-            data.add_field("file", f, filename=filename)
+        return result.get("url", "")
 
-            if self.session:
-                async with self.session.post(upload_url, data=data) as response:
-                    if response.status != 200:
-                        raise MoodleAPIError(f"File upload failed: HTTP {response.status}")
-
-                    result = await response.json()
+    async def upload_files(
+        self, files: List[UploadSource], course_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload files concurrently into a single draft area
 
-                    if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict):
-                        return result[0].get("url", "")
+        Args:
+            files: Files to upload, from disk paths or in-memory content
+            course_id: Course the files belong to; identical payloads within
+                the course are uploaded once
 
-                    raise MoodleAPIError("File upload failed: Invalid response")
-            else:
-                raise MoodleAPIError("No session available for file upload")
+        Returns:
+            Draft file records (itemid, filename, url...) in the order of ``files``
+        """
+        try:
+            return await self.uploader.upload_many(files, scope=course_id)
+        except UploadError as e:
+            raise MoodleAPIError(str(e))
 
     async def _create_content_as_page(
         self, course_id: int, section_id: int, name: str, content: str, filename: str
@@ -767,6 +813,5 @@ class MoodleClient:
         return result if isinstance(result, list) else []
 
     async def close(self):
-        """Close the client session"""
-        if self.session:
-            await self.session.close()
+        """Release the borrowed session; the shared pool owns and closes it"""
+        self.session = None
@@ -4,15 +4,23 @@ Provides full content creation capabilities with real activity storage
 """
 
 import asyncio
-import json
 import logging
 import time
-from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 
 import aiohttp
 
-from src.core.constants import Defaults, Messages, ErrorCodes, ActivityTypes, MoodleWebServices, CourseFormats
+from src.core.constants import Defaults, Messages, ErrorCodes, ActivityTypes, MoodleWebServices, CourseFormats, Resilience
+from src.clients.call_batcher import CallBatcher
+from src.clients.capability_store import CapabilitySnapshot
+from src.clients import json_codec
+from src.clients.http_session import get_shared_session_factory
+from src.clients.metadata_cache import get_shared_metadata_cache
+from src.clients.param_encoder import encode_params, flatten_params
+from src.clients.resilience import CircuitOpenError, DeadlineExceeded, get_shared_breakers, hedged, retry_after, within_deadline
+from src.clients.ws_responses import SiteInfo
+from src.core.rate_limiter import get_shared_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +33,50 @@ class MoodleAPIError(Exception):
         self.error_code = error_code
 
 
+def _never_sent(error: BaseException) -> bool:
+    """Whether an error shows the request never reached Moodle, so sending it again cannot duplicate it"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, (CircuitOpenError, aiohttp.ClientConnectorError)):
+            return True
+        if isinstance(error, DeadlineExceeded):
+            return not error.sent
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _is_outage(error: BaseException) -> bool:
+    """Whether an error means Moodle is unreachable, failing or too slow, not that a call was rejected"""
+    if isinstance(error, DeadlineExceeded):
+        return error.sent
+    return getattr(error, "error_code", None) == ErrorCodes.CONNECTION_ERROR
+
+
 class EnhancedMoodleClient:
     """Enhanced client for interacting with Moodle using custom MoodleClaude plugin"""
-
-    def __init__(self, base_url: str, token: str = None, basic_token: str = None, plugin_token: str = None):
+    
+    # Moodle calls in flight while creating a structure without the plugin
+    INDIVIDUAL_CONCURRENCY = 4
+    # Attempts per activity and base backoff delay in seconds
+    ACTIVITY_MAX_ATTEMPTS = 3
+    ACTIVITY_RETRY_DELAY = 0.5
+    
+    # Plugin function whose presence marks the plugin as installed
+    PLUGIN_FUNCTION = 'local_moodleclaude_create_page_activity'
+    # Plugin endpoint executing several sub-calls per request
+    BATCH_FUNCTION = 'local_moodleclaude_batch'
+    # Calls coalesced into batches when the endpoint is available
+    BATCHABLE_FUNCTIONS = frozenset({
+        'local_moodleclaude_update_section_content',
+        'local_moodleclaude_create_page_activity',
+        'local_moodleclaude_create_label_activity',
+        'local_moodleclaude_create_file_resource',
+    })
+
+    def __init__(self, base_url: str, token: str = None, basic_token: str = None, plugin_token: str = None,
+                 rate_limiter=None, session_factory=None, batch_window: float = Defaults.BATCH_WINDOW,
+                 capability_store=None, breakers=None, metadata_cache=None):
         """
         Initialize Enhanced Moodle client
 
@@ -37,8 +85,17 @@ class EnhancedMoodleClient:
             token: Single Moodle web service token (legacy support)
             basic_token: Basic Moodle web service token (dual-token mode)
             plugin_token: Plugin-specific web service token (dual-token mode)
+            rate_limiter: Limiter with an async acquire(function) method (shared limiter by default)
+            session_factory: Factory lending pooled HTTP sessions (shared factory by default)
+            batch_window: Seconds to coalesce plugin calls into one batch request (0 disables)
+            capability_store: Store of persisted capability snapshots; without one every
+                new client probes site info on first use
+            breakers: Circuit breaker registry (shared registry by default)
+            metadata_cache: Cache of read-only call results whose entries this
+                client's writes invalidate (shared cache by default)
         """
         self.base_url = base_url.rstrip("/")
+        self.host = urlparse(self.base_url).netloc or self.base_url
         
         # Support both single-token and dual-token modes
         if basic_token and plugin_token:
@@ -57,21 +114,30 @@ class EnhancedMoodleClient:
         self.api_url = f"{self.base_url}{Defaults.WEBSERVICE_PATH}"
         self.session = None
         self.plugin_available = None  # Will be determined on first use
+        self._plugin_check_lock = asyncio.Lock()
+        self.batch_available = False  # Determined together with plugin availability
+        self.capability_store = capability_store
+        self.capabilities: Optional[CapabilitySnapshot] = None
+        self._capability_refresh: Optional[asyncio.Task] = None
+        self.batch_window = batch_window
+        self._batcher: Optional[CallBatcher] = None
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.session_factory = session_factory or get_shared_session_factory()
+        self.breakers = breakers or get_shared_breakers()
+        self.metadata_cache = metadata_cache or get_shared_metadata_cache()
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the pooled session stays open for reuse)"""
 
     async def _ensure_session(self):
-        """Ensure session is created"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Borrow the pooled session for the running event loop"""
+        # Re-borrowed every call: sessions are per loop and the pool may have recycled them
+        self.session = await self.session_factory.get_session()
     
     def _flatten_params(self, params: Dict[str, Any], parent_key: str = '') -> Dict[str, Any]:
         """
@@ -82,33 +148,14 @@ class EnhancedMoodleClient:
         To:
             {'sections[0][name]': 'test', 'sections[0][activities]': []}
         """
-        items = []
-        
-        if isinstance(params, dict):
-            for k, v in params.items():
-                new_key = f"{parent_key}[{k}]" if parent_key else k
-                
-                if isinstance(v, list):
-                    for i, item in enumerate(v):
-                        list_key = f"{new_key}[{i}]"
-                        if isinstance(item, dict):
-                            items.extend(self._flatten_params(item, list_key).items())
-                        else:
-                            items.append((list_key, item))
-                    # Also add the empty array indicator if list is empty
-                    if not v:
-                        items.append((new_key, []))
-                elif isinstance(v, dict):
-                    items.extend(self._flatten_params(v, new_key).items())
-                else:
-                    items.append((new_key, v))
-        
-        return dict(items)
+        return flatten_params(params, parent_key)
 
     async def _call_api(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Make API call to Moodle
 
+        Successful writes invalidate the metadata cache results they change.
+
         Args:
             function: Moodle web service function name
             params: Parameters for the function
@@ -119,6 +166,75 @@ class EnhancedMoodleClient:
         Raises:
             MoodleAPIError: If API call fails
         """
+        if self.batch_available and self.batch_window and function in self.BATCHABLE_FUNCTIONS:
+            result = await self._get_batcher().submit(function, params or {})
+        else:
+            result = await self._guarded_request(function, params)
+        # Results cached by other clients of the site (e.g. the basic-token client) are now stale
+        self.metadata_cache.invalidate_for_write(self.base_url, function, params)
+        return result
+
+    async def _guarded_request(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Send a request unless its host or wsfunction circuit is open
+
+        Idempotent reads are hedged with a duplicate request when slow, and the
+        whole call is bounded by the deadline of the calling MCP tool. The
+        deadline applies inside the circuits, so calls it cuts short count
+        against them.
+        """
+        if function in Resilience.HEDGED_FUNCTIONS:
+            send = lambda: hedged(lambda: self._send_request(function, params), Resilience.HEDGE_DELAY)
+        else:
+            send = lambda: self._send_request(function, params)
+
+        try:
+            return await self.breakers.call(
+                self.host, function, lambda: within_deadline(send()), is_failure=_is_outage
+            )
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            raise MoodleAPIError(str(e), ErrorCodes.CONNECTION_ERROR) from e
+
+    def _get_batcher(self) -> CallBatcher:
+        """Get the call batcher bound to the running event loop"""
+        if self._batcher is None or self._batcher.loop is not asyncio.get_running_loop():
+            self._batcher = CallBatcher(
+                self._send_batch, window=self.batch_window, max_calls=Defaults.BATCH_MAX_CALLS
+            )
+        return self._batcher
+
+    async def _send_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Send coalesced calls through the plugin batch endpoint
+
+        Returns:
+            One result or MoodleAPIError per call, in order
+        """
+        if len(calls) == 1:
+            # Nothing to coalesce: a plain call skips the batch envelope
+            function, params = calls[0]
+            try:
+                return [await self._guarded_request(function, params)]
+            except MoodleAPIError as e:
+                return [e]
+        
+        response = await self._guarded_request(self.BATCH_FUNCTION, {
+            'calls': [
+                {'wsfunction': function, 'args': json_codec.dumps(params)}
+                for function, params in calls
+            ]
+        })
+        
+        results = []
+        for entry in response.get('results', []):
+            if entry.get('success'):
+                results.append(json_codec.loads(entry['data']) if entry.get('data') else None)
+            else:
+                results.append(MoodleAPIError(f"Moodle API Error: {entry.get('error') or 'Unknown error'}"))
+        return results
+
+    async def _send_request(self, function: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a single web service request (see _call_api)"""
         await self._ensure_session()
 
         data = {
@@ -128,28 +244,35 @@ class EnhancedMoodleClient:
         }
 
         if params:
-            # Functions that need parameter flattening for complex structures
-            flatten_functions = [
-                'local_moodleclaude_create_course_structure',
-                'core_course_create_courses',  # Also used for courses array
-            ]
-            
-            if function in flatten_functions:
-                flattened_params = self._flatten_params(params)
-                data.update(flattened_params)
-            else:
-                data.update(params)
+            data.update(params)
+
+        # Flatten nested params into Moodle's name[0][field] keys and encode once
+        encoded = encode_params(data)
+
+        # Stay within the site and per-function web service budgets
+        await self.rate_limiter.acquire(function)
 
         try:
             if self.session:
-                async with self.session.post(self.api_url, data=data) as response:
+                async with self.session.post(
+                    self.api_url, data=encoded.body, headers={"Content-Type": encoded.content_type}
+                ) as response:
                     if response.status != 200:
-                        raise MoodleAPIError(f"HTTP {response.status}: {await response.text()}")
+                        # Server errors count against the circuit breakers, client errors don't
+                        raise MoodleAPIError(
+                            f"HTTP {response.status}: {await response.text()}",
+                            ErrorCodes.CONNECTION_ERROR if response.status >= 500 else ErrorCodes.API_ERROR,
+                        )
 
-                    result = await response.json()
+                    # Decode the raw body with the fastest available JSON backend
+                    result = json_codec.loads(await response.read())
 
                     # Check for Moodle API errors
                     if isinstance(result, dict) and "exception" in result:
+                        if result.get("errorcode") == "invalidrecord" and self.capabilities is not None \
+                                and self.capabilities.has_function(function):
+                            # The snapshot lists a function the site no longer has
+                            self._invalidate_capabilities()
                         raise MoodleAPIError(
                             f"Moodle API Error: {result.get('message', 'Unknown error')}"
                         )
@@ -159,8 +282,10 @@ class EnhancedMoodleClient:
                 raise MoodleAPIError("No session available")
 
         except aiohttp.ClientError as e:
-            raise MoodleAPIError(f"Network error: {str(e)}")
-        except json.JSONDecodeError as e:
+            raise MoodleAPIError(f"Network error: {str(e)}", ErrorCodes.CONNECTION_ERROR)
+        except asyncio.TimeoutError as e:
+            raise MoodleAPIError(f"Request timed out: {str(e)}", ErrorCodes.CONNECTION_ERROR)
+        except json_codec.DecodeError as e:
             raise MoodleAPIError(f"Invalid JSON response: {str(e)}")
 
     async def _check_plugin_availability(self) -> bool:
@@ -172,13 +297,26 @@ class EnhancedMoodleClient:
         """
         if self.plugin_available is not None:
             return self.plugin_available
-            
+        
+        # Concurrent callers share a single probe
+        async with self._plugin_check_lock:
+            if self.plugin_available is None:
+                snapshot = self._load_capabilities()
+                if snapshot is not None:
+                    # A persisted snapshot saves the probe; refresh it without waiting
+                    self._apply_capabilities(snapshot)
+                    if self.capability_store.is_stale(snapshot):
+                        self._schedule_capability_refresh()
+                else:
+                    await self._probe_plugin_availability()
+        return self.plugin_available
+
+    async def _probe_plugin_availability(self) -> bool:
+        """Query site info for the plugin functions and record the result"""
         try:
-            # Try to get site info to see available functions
-            site_info = await self._call_api("core_webservice_get_site_info", {})
-            if 'functions' in site_info:
-                functions = [f.get('name', '') for f in site_info['functions']]
-                self.plugin_available = 'local_moodleclaude_create_page_activity' in functions
+            snapshot = await self._fetch_capabilities()
+            if snapshot is not None:
+                self._apply_capabilities(snapshot)
                 if self.plugin_available:
                     logger.info("✅ MoodleClaude plugin detected - using enhanced functionality")
                 else:
@@ -190,6 +328,53 @@ class EnhancedMoodleClient:
         self.plugin_available = False
         return False
 
+    async def _fetch_capabilities(self) -> Optional[CapabilitySnapshot]:
+        """Fetch site info into a capability snapshot and persist it"""
+        site_info = SiteInfo.from_dict(await self._call_api("core_webservice_get_site_info", {}))
+        if not site_info.lists_functions:
+            return None
+
+        snapshot = CapabilitySnapshot.from_site_info(site_info)
+        if self.capability_store is not None:
+            self.capability_store.save(self.base_url, self.token, snapshot)
+        return snapshot
+
+    def _load_capabilities(self) -> Optional[CapabilitySnapshot]:
+        if self.capability_store is None:
+            return None
+        return self.capability_store.load(self.base_url, self.token)
+
+    def _apply_capabilities(self, snapshot: CapabilitySnapshot):
+        self.capabilities = snapshot
+        self.plugin_available = snapshot.has_function(self.PLUGIN_FUNCTION)
+        self.batch_available = snapshot.has_function(self.BATCH_FUNCTION)
+
+    def _schedule_capability_refresh(self):
+        if self._capability_refresh is None or self._capability_refresh.done():
+            self._capability_refresh = asyncio.ensure_future(self._refresh_capabilities())
+
+    async def _refresh_capabilities(self):
+        """Re-probe in the background, switching over if the site or plugin changed"""
+        try:
+            snapshot = await self._fetch_capabilities()
+        except Exception as e:
+            logger.debug(f"Background capability refresh failed: {e}")
+            return
+
+        if snapshot is None:
+            return
+        if self.capabilities is not None and not snapshot.same_versions(self.capabilities):
+            logger.info("Moodle site or plugin version changed - capability snapshot replaced")
+        self._apply_capabilities(snapshot)
+
+    def _invalidate_capabilities(self):
+        """Forget capabilities that turned out wrong so the next call probes again"""
+        if self.capability_store is not None:
+            self.capability_store.invalidate(self.base_url, self.token)
+        self.capabilities = None
+        self.plugin_available = None
+        self.batch_available = False
+
     async def create_course(
         self, 
         name: str, 
@@ -295,6 +480,8 @@ class EnhancedMoodleClient:
 
     async def _get_current_user(self) -> Dict[str, Any]:
         """Get current user information from the token"""
+        if self.capabilities is not None and self.capabilities.userid is not None:
+            return {'userid': self.capabilities.userid, 'username': self.capabilities.username}
         try:
             site_info = await self._call_api('core_webservice_get_site_info')
             return site_info
@@ -433,7 +620,8 @@ class EnhancedMoodleClient:
                 "success": False,
                 "method": "plugin_api",
                 "activity_id": None,
-                "message": f"Error: {str(e)}"
+                "message": f"Error: {str(e)}",
+                "retryable": _never_sent(e)
             }
 
     async def create_label_activity(
@@ -492,7 +680,8 @@ class EnhancedMoodleClient:
                 "success": False,
                 "method": "plugin_api",
                 "activity_id": None,
-                "message": f"Error: {str(e)}"
+                "message": f"Error: {str(e)}",
+                "retryable": _never_sent(e)
             }
 
     async def create_file_activity(
@@ -557,7 +746,8 @@ class EnhancedMoodleClient:
                 "success": False,
                 "method": "plugin_api",
                 "activity_id": None,
-                "message": f"Error: {str(e)}"
+                "message": f"Error: {str(e)}",
+                "retryable": _never_sent(e)
             }
 
     async def create_course_structure(self, course_id: int, sections_data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -593,91 +783,142 @@ class EnhancedMoodleClient:
                 
         except Exception as e:
             logger.error(f"❌ Error creating course structure: {e}")
-            return {
+            error_result = {
                 "success": False,
                 "message": f"Error: {str(e)}",
                 "sections": []
             }
-
-    async def _create_structure_individually(self, course_id: int, sections_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+            # Tell the chunk queue not to retry before an open circuit may close
+            wait = retry_after(e)
+            if wait is not None:
+                error_result["retry_after"] = wait
+            return error_result
+
+    async def _create_structure_individually(self, course_id: int, sections_data: List[Dict[str, Any]],
+                                             max_concurrency: Optional[int] = None) -> Dict[str, Any]:
         """
         Fallback method to create structure using individual API calls
+        
+        Sections are created concurrently. Each section's header is updated
+        first, then its activities are created one after another, because
+        Moodle appends modules to a section in creation order. All calls share
+        one semaphore, and results keep the order of sections_data. Failed
+        activities are retried on their own when the request never reached
+        Moodle.
         """
-        results = []
-        section_num = 1
-        
-        for section_data in sections_data:
-            section_result = {
-                'sectionnumber': section_num,
-                'sectionname': section_data['name'],
-                'success': False,
-                'activities': [],
-                'message': ''
-            }
-            
-            try:
-                # Update section
+        semaphore = asyncio.Semaphore(max_concurrency or self.INDIVIDUAL_CONCURRENCY)
+        
+        results = await asyncio.gather(*(
+            self._create_section_individually(course_id, section_num, section_data, semaphore)
+            for section_num, section_data in enumerate(sections_data, start=1)
+        ))
+        
+        return {
+            'success': any(s['success'] for s in results),
+            'message': 'Course structure creation completed (individual calls)',
+            'sections': results
+        }
+
+    async def _create_section_individually(self, course_id: int, section_num: int,
+                                           section_data: Dict[str, Any],
+                                           semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Update one section header, then create its activities in order"""
+        section_result = {
+            'sectionnumber': section_num,
+            'sectionname': section_data['name'],
+            'success': False,
+            'activities': [],
+            'message': ''
+        }
+        
+        try:
+            # Update section
+            async with semaphore:
                 section_success = await self.update_section_content(
                     course_id, section_num, 
                     section_data['name'], 
                     section_data.get('summary', '')
                 )
+            
+            if section_success:
+                section_result['success'] = True
+                section_result['message'] = 'Section updated successfully'
+                
+                # Create activities in order, so the course page lists them as given
+                for activity_data in section_data.get('activities', []):
+                    section_result['activities'].append(
+                        await self._create_activity_with_retry(course_id, section_num, activity_data, semaphore)
+                    )
+            else:
+                section_result['message'] = 'Section update failed (plugin required)'
+                
+        except Exception as e:
+            section_result['message'] = f"Section creation failed: {str(e)}"
+        
+        return section_result
+
+    async def _create_activity_with_retry(self, course_id: int, section_num: int,
+                                          activity_data: Dict[str, Any],
+                                          semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Create a single activity, retrying with backoff while the request never reached Moodle
+
+        Creates are not idempotent: a failure after the request was sent (a
+        timeout, a server error) may hide a created activity, so it is not retried.
+        """
+        activity_result = {
+            'type': activity_data['type'],
+            'name': activity_data['name'],
+            'success': False,
+            'message': '',
+            'activityid': 0
+        }
+        
+        for attempt in range(1, self.ACTIVITY_MAX_ATTEMPTS + 1):
+            retryable = False
+            try:
+                async with semaphore:
+                    result = await self._create_activity(course_id, section_num, activity_data)
+                
+                activity_result['success'] = result['success']
+                activity_result['message'] = result['message']
+                activity_result['activityid'] = result.get('activity_id', 0)
+                # The create_* methods flag failures of requests that were never sent
+                retryable = not result['success'] and result.get('retryable', False)
                 
-                if section_success:
-                    section_result['success'] = True
-                    section_result['message'] = 'Section updated successfully'
-                    
-                    # Create activities
-                    for activity_data in section_data.get('activities', []):
-                        activity_result = {
-                            'type': activity_data['type'],
-                            'name': activity_data['name'],
-                            'success': False,
-                            'message': '',
-                            'activityid': 0
-                        }
-                        
-                        try:
-                            if activity_data['type'] == 'page':
-                                result = await self.create_page_activity(
-                                    course_id, section_num, 
-                                    activity_data['name'], activity_data['content']
-                                )
-                            elif activity_data['type'] == 'label':
-                                result = await self.create_label_activity(
-                                    course_id, section_num, activity_data['content']
-                                )
-                            elif activity_data['type'] == 'file':
-                                result = await self.create_file_activity(
-                                    course_id, section_num, 
-                                    activity_data['name'], activity_data['content'],
-                                    activity_data.get('filename', activity_data['name'] + '.txt')
-                                )
-                            else:
-                                result = {'success': False, 'message': f"Unknown activity type: {activity_data['type']}"}
-                            
-                            activity_result['success'] = result['success']
-                            activity_result['message'] = result['message']
-                            activity_result['activityid'] = result.get('activity_id', 0)
-                            
-                        except Exception as e:
-                            activity_result['message'] = f"Activity creation failed: {str(e)}"
-                        
-                        section_result['activities'].append(activity_result)
-                else:
-                    section_result['message'] = 'Section update failed (plugin required)'
-                    
             except Exception as e:
-                section_result['message'] = f"Section creation failed: {str(e)}"
+                activity_result['message'] = f"Activity creation failed: {str(e)}"
+                retryable = _never_sent(e)
+            
+            if not retryable or attempt == self.ACTIVITY_MAX_ATTEMPTS:
+                break
             
-            results.append(section_result)
-            section_num += 1
+            delay = self.ACTIVITY_RETRY_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"⚠️ Activity '{activity_data['name']}' failed, retrying in {delay}s "
+                           f"(attempt {attempt + 1}/{self.ACTIVITY_MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
         
-        return {
-            'success': any(s['success'] for s in results),
-            'message': 'Course structure creation completed (individual calls)',
-            'sections': results
-        }
+        return activity_result
+
+    async def _create_activity(self, course_id: int, section_num: int,
+                               activity_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch an activity description to the matching create_* method"""
+        if activity_data['type'] == 'page':
+            return await self.create_page_activity(
+                course_id, section_num, 
+                activity_data['name'], activity_data['content']
+            )
+        elif activity_data['type'] == 'label':
+            return await self.create_label_activity(
+                course_id, section_num, activity_data['content']
+            )
+        elif activity_data['type'] == 'file':
+            return await self.create_file_activity(
+                course_id, section_num, 
+                activity_data['name'], activity_data['content'],
+                activity_data.get('filename', activity_data['name'] + '.txt')
+            )
+        return {'success': False, 'message': f"Unknown activity type: {activity_data['type']}"}
 
     # Include all other methods from original client (get_courses, get_categories, etc.)
     async def get_courses(self) -> List[Dict[str, Any]]:
@@ -703,6 +944,5 @@ class EnhancedMoodleClient:
             return []
 
     async def close(self):
-        """Close the client session"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        """Release the borrowed session; the shared pool owns and closes it"""
+        self.session = None
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Single-pass encoder for Moodle web service parameters
+Flattens nested params into Moodle's ``name[0][field]`` keys and encodes the
+request body directly, without per-level intermediate dicts or a second
+form-encoding pass in the HTTP client
+"""
+
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Tuple
+from urllib.parse import quote_plus
+
+# Requests whose values exceed this many bytes are sent as multipart/form-data,
+# which carries large HTML verbatim instead of percent-encoding it
+MULTIPART_THRESHOLD = 256 * 1024
+
+FORM_URLENCODED = "application/x-www-form-urlencoded"
+
+
+class EncodedBody(NamedTuple):
+    """Encoded request body and its Content-Type header"""
+    body: bytes
+    content_type: str
+
+
+@lru_cache(maxsize=8192)
+def _child_key(parent: str, key: Any) -> str:
+    """Build (and cache) the key of a nested field, e.g. sections[0][activities]"""
+    return f"{parent}[{key}]"
+
+
+@lru_cache(maxsize=8192)
+def _quoted_key(key: str) -> bytes:
+    return quote_plus(key).encode("ascii")
+
+
+@lru_cache(maxsize=8192)
+def _part_header(key: str) -> bytes:
+    escaped = key.replace("\\", "\\\\").replace('"', '\\"')
+    return f'Content-Disposition: form-data; name="{escaped}"\r\n\r\n'.encode("utf-8")
+
+
+def _flatten_into(value: Any, key: str, out: List[Tuple[str, Any]]) -> None:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten_into(v, _child_key(key, k), out)
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            # Keep the empty array indicator; it is dropped when encoding
+            out.append((key, []))
+        for i, v in enumerate(value):
+            _flatten_into(v, _child_key(key, i), out)
+    else:
+        out.append((key, value))
+
+
+def flatten_fields(params: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """
+    Flatten nested parameters into ordered Moodle form fields
+
+    Converts:
+        {'sections': [{'name': 'test', 'activities': []}]}
+    To:
+        [('sections[0][name]', 'test'), ('sections[0][activities]', [])]
+    """
+    out: List[Tuple[str, Any]] = []
+    for k, v in params.items():
+        _flatten_into(v, str(k), out)
+    return out
+
+
+def flatten_params(params: Dict[str, Any], parent_key: str = "") -> Dict[str, Any]:
+    """Flatten nested parameters into a dict of Moodle form fields"""
+    if not parent_key:
+        return dict(flatten_fields(params))
+    out: List[Tuple[str, Any]] = []
+    _flatten_into(params, parent_key, out)
+    return dict(out)
+
+
+def _field_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+
+def _encoded_values(fields: List[Tuple[str, Any]]) -> List[Tuple[str, bytes]]:
+    # Empty arrays have no form representation
+    return [
+        (key, _field_value(value).encode("utf-8"))
+        for key, value in fields
+        if not (isinstance(value, list) and not value)
+    ]
+
+
+def encode_params(data: Dict[str, Any], multipart_threshold: int = MULTIPART_THRESHOLD) -> EncodedBody:
+    """
+    Flatten and encode a web service request body in a single pass
+
+    Args:
+        data: Request fields, possibly nested (wstoken, wsfunction, params...)
+        multipart_threshold: Total value size in bytes above which multipart is used
+
+    Returns:
+        EncodedBody ready to be posted as-is
+    """
+    values = _encoded_values(flatten_fields(data))
+    if sum(len(value) for _, value in values) > multipart_threshold:
+        return _encode_multipart(values)
+    return _encode_urlencoded(values)
+
+
+def _encode_urlencoded(values: List[Tuple[str, bytes]]) -> EncodedBody:
+    parts = []
+    for key, value in values:
+        parts.append(_quoted_key(key) + b"=" + quote_plus(value).encode("ascii"))
+    return EncodedBody(b"&".join(parts), FORM_URLENCODED)
+
+
+def _encode_multipart(values: List[Tuple[str, bytes]]) -> EncodedBody:
+    boundary = uuid.uuid4().hex
+    delimiter = f"--{boundary}\r\n".encode("ascii")
+    while any(delimiter[:-2] in value for _, value in values):
+        boundary = uuid.uuid4().hex
+        delimiter = f"--{boundary}\r\n".encode("ascii")
+
+    parts = []
+    for key, value in values:
+        parts.append(delimiter)
+        parts.append(_part_header(key))
+        parts.append(value)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("ascii"))
+    return EncodedBody(b"".join(parts), f"multipart/form-data; boundary={boundary}")
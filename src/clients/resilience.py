@@ -0,0 +1,294 @@
+"""
+Failure isolation for Moodle web service calls
+Circuit breakers per host and per wsfunction, hedged duplicate requests for
+idempotent reads, and deadlines propagated from the calling MCP tool
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from src.core.constants import Environment, Resilience
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Moodle while a circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit open for {name}; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a call's propagated deadline has passed"""
+
+    def __init__(self, message: str, sent: bool = True):
+        super().__init__(message)
+        # Whether the call had reached Moodle, so the timeout says something about the site
+        self.sent = sent
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds until an open circuit found in an exception chain may close, if any"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, CircuitOpenError):
+            return exc.retry_after
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast. Once ``recovery_timeout`` has passed, up to
+    ``half_open_max_calls`` probe calls are let through: a success closes
+    the circuit, a failure re-opens it for another timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = Resilience.FAILURE_THRESHOLD,
+        recovery_timeout: float = Resilience.RECOVERY_TIMEOUT,
+        half_open_max_calls: int = Resilience.HALF_OPEN_MAX_CALLS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = time.monotonic() - self._opened_at
+                if elapsed < self.recovery_timeout:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+                self.state = self.HALF_OPEN
+                self._half_open_calls = 0
+
+            if self.state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(self.name, self.recovery_timeout)
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._stats["opened"] += 1
+                    logger.warning(f"Circuit {self.name} opened after {self._failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Return an admitted call's slot without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "state": self.state, "consecutive_failures": self._failures}
+
+
+class BreakerRegistry:
+    """
+    Circuit breakers for each Moodle host and each (host, wsfunction)
+
+    A call must be admitted by both: a dead site opens the host circuit for
+    every function, while one broken wsfunction only opens its own.
+    """
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, host: str, function: Optional[str] = None) -> CircuitBreaker:
+        key = (host, function)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                name = f"{host}:{function}" if function else host
+                breaker = self._breakers[key] = CircuitBreaker(name, **self.breaker_options)
+            return breaker
+
+    async def call(
+        self,
+        host: str,
+        function: str,
+        fetch: Callable[[], Awaitable[Any]],
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+    ) -> Any:
+        """
+        Run fetch if both circuits admit it and record the outcome
+
+        Args:
+            host: Moodle host the call goes to
+            function: Web service function name
+            fetch: Coroutine function performing the call
+            is_failure: Whether an exception counts against the circuits;
+                application errors from a healthy site should not
+        """
+        breakers = (self._breaker(host), self._breaker(host, function))
+        admitted = []
+        try:
+            for breaker in breakers:
+                breaker.before_call()
+                admitted.append(breaker)
+        except CircuitOpenError:
+            for breaker in admitted:
+                breaker.release()
+            raise
+
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            for breaker in breakers:
+                breaker.release()
+            raise
+        except Exception as e:
+            for breaker in breakers:
+                if is_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            raise
+
+        for breaker in breakers:
+            breaker.record_success()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state keyed by host or host:wsfunction"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.get_stats() for breaker in breakers}
+
+
+async def hedged(fetch: Callable[[], Awaitable[Any]], delay: float, max_requests: int = 2) -> Any:
+    """
+    Run fetch, starting duplicates while earlier attempts are slow
+
+    A new attempt starts every ``delay`` seconds until ``max_requests`` are in
+    flight; the first to succeed wins and the others are cancelled. Only use
+    for idempotent reads.
+    """
+    tasks = [asyncio.ensure_future(fetch())]
+    started = 1
+    error: Optional[BaseException] = None
+    try:
+        while tasks:
+            timeout = delay if started < max_requests else None
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.debug("Hedging slow read with a duplicate request")
+                tasks.append(asyncio.ensure_future(fetch()))
+                started += 1
+                continue
+
+            for task in done:
+                tasks.remove(task)
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        # Every attempt failed
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# Absolute time.monotonic() by which the current MCP tool call must finish
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("moodle_call_deadline", default=None)
+
+
+@contextlib.contextmanager
+def call_deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound every Moodle call made within the block (and tasks it spawns)
+
+    Nested deadlines can only shorten the outer one.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def tool_call_deadline() -> float:
+    """Seconds an MCP tool call may spend on Moodle calls (MOODLE_CLAUDE_TOOL_DEADLINE)"""
+    return float(os.getenv(Environment.TOOL_CALL_DEADLINE, Resilience.TOOL_CALL_DEADLINE))
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the propagated deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def within_deadline(awaitable: Awaitable[Any]) -> Any:
+    """Await under the propagated deadline, raising DeadlineExceeded when it passes"""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Deadline exceeded before the Moodle call was sent", sent=False)
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Moodle call exceeded the remaining {remaining:.1f}s deadline")
+
+
+_shared_breakers: Optional[BreakerRegistry] = None
+_shared_breakers_lock = threading.Lock()
+
+
+def get_shared_breakers() -> BreakerRegistry:
+    """Get the process-wide circuit breakers used by all Moodle clients"""
+    global _shared_breakers
+    with _shared_breakers_lock:
+        if _shared_breakers is None:
+            _shared_breakers = BreakerRegistry()
+        return _shared_breakers
@@ -0,0 +1,67 @@
+"""
+Typed views of the Moodle web service responses the clients inspect
+Slot-based structs keep only the fields we read and build derived data
+(function name sets) on first access
+"""
+
+from typing import AbstractSet, Any, Dict, List, Optional
+
+
+class SiteInfo:
+    """Response of core_webservice_get_site_info"""
+
+    __slots__ = ("sitename", "siteurl", "userid", "username", "release", "version", "_functions", "_function_names")
+
+    def __init__(
+        self,
+        sitename: str = "",
+        siteurl: str = "",
+        userid: Optional[int] = None,
+        username: str = "",
+        release: str = "",
+        version: str = "",
+        functions: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.sitename = sitename
+        self.siteurl = siteurl
+        self.userid = userid
+        self.username = username
+        self.release = release
+        self.version = version
+        self._functions = functions
+        self._function_names: Optional[AbstractSet[str]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SiteInfo":
+        """Build from a decoded response, keeping the function list undigested"""
+        return cls(
+            sitename=data.get("sitename", ""),
+            siteurl=data.get("siteurl", ""),
+            userid=data.get("userid"),
+            username=data.get("username", ""),
+            release=data.get("release", ""),
+            version=data.get("version", ""),
+            functions=data.get("functions"),
+        )
+
+    @property
+    def lists_functions(self) -> bool:
+        """Whether the response carried the token's function list"""
+        return self._functions is not None
+
+    @property
+    def function_names(self) -> AbstractSet[str]:
+        """Names of the web service functions available to the token"""
+        if self._function_names is None:
+            self._function_names = {f.get("name", "") for f in self._functions or ()}
+        return self._function_names
+
+    def has_function(self, name: str) -> bool:
+        """Check whether a web service function is available to the token"""
+        return name in self.function_names
+
+    @property
+    def function_versions(self) -> Dict[str, str]:
+        """Map of available function names to their component versions"""
+        return {f.get("name", ""): str(f.get("version", "")) for f in self._functions or ()}
+
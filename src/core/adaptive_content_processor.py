@@ -6,7 +6,6 @@ Automatically detects content limits, adapts chunking strategies, and manages se
 import asyncio
 import logging
 import json
-import hashlib
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -15,6 +14,9 @@ from enum import Enum
 from src.models.models import ChatContent, CourseStructure
 from src.core.content_chunker import ContentChunker
 from src.core.content_parser import ChatContentParser
+from src.core.parse_cache import (
+    ParseCache, content_hash as compute_content_hash, get_shared_parse_cache
+)
 
 logger = logging.getLogger(__name__)
 
@@ -139,9 +141,10 @@ class AdaptiveContentProcessor:
     and provides seamless user experience for course creation
     """
     
-    def __init__(self):
+    def __init__(self, parse_cache: Optional[ParseCache] = None):
         """Initialize the adaptive processor"""
         self.content_parser = ChatContentParser()
+        self.parse_cache = parse_cache or get_shared_parse_cache()
         self.content_chunker = ContentChunker()
         self.content_limits = ContentLimits()
         
@@ -160,12 +163,14 @@ class AdaptiveContentProcessor:
         
         logger.info("AdaptiveContentProcessor initialized with adaptive learning")
     
-    async def analyze_content_complexity(self, content: str) -> Dict[str, Any]:
+    async def analyze_content_complexity(self, content: str,
+                                         content_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze content to determine optimal processing strategy
         
         Args:
             content: The chat content to analyze
+            content_hash: Precomputed MD5 of content, used as the parse cache key
             
         Returns:
             Dictionary with analysis results and recommended strategy
@@ -183,7 +188,7 @@ class AdaptiveContentProcessor:
         
         try:
             # Parse content to get structure
-            parsed_content = self.content_parser.parse_chat(content)
+            parsed_content = self._parse_content(content, content_hash)
             
             # Count different content types
             code_items = [item for item in parsed_content.items if item.type == 'code']
@@ -302,7 +307,7 @@ class AdaptiveContentProcessor:
             Session ID for tracking
         """
         # Generate session ID and content hash
-        content_hash = hashlib.md5(content.encode()).hexdigest()
+        content_hash = compute_content_hash(content)
         session_id = f"session_{content_hash[:8]}_{int(datetime.now().timestamp())}"
         
         # Check if we already have a session for this content
@@ -318,10 +323,10 @@ class AdaptiveContentProcessor:
                 # We're already in an event loop, use create_task
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.analyze_content_complexity(content))
+                    future = executor.submit(asyncio.run, self.analyze_content_complexity(content, content_hash))
                     analysis = future.result()
             else:
-                analysis = asyncio.run(self.analyze_content_complexity(content))
+                analysis = asyncio.run(self.analyze_content_complexity(content, content_hash))
         except RuntimeError:
             # Fallback: run synchronously
             analysis = self._analyze_content_complexity_sync(content)
@@ -379,7 +384,7 @@ class AdaptiveContentProcessor:
             
             # Parse and structure the chunk
             session.state = SessionState.ANALYZING
-            parsed_content = self.content_parser.parse_chat(content_chunk)
+            parsed_content = self._parse_content(content_chunk)
             
             # Create course structure from parsed content
             course_structure = self._create_course_structure(parsed_content, session)
@@ -420,7 +425,7 @@ class AdaptiveContentProcessor:
             return session.original_content
         
         # Parse content and create logical chunks
-        parsed_content = self.content_parser.parse_chat(session.original_content)
+        parsed_content = self._parse_content(session.original_content, session.content_hash)
         
         if session.strategy == ProcessingStrategy.INTELLIGENT_CHUNK:
             chunks = self._create_intelligent_chunks(parsed_content)
@@ -434,6 +439,10 @@ class AdaptiveContentProcessor:
         
         return ""
     
+    def _parse_content(self, content: str, content_hash: Optional[str] = None) -> ChatContent:
+        """Parse content through the content-addressed parse cache"""
+        return self.parse_cache.get_or_parse(self.content_parser, content, content_hash)
+    
     def _create_intelligent_chunks(self, parsed_content: ChatContent) -> List[str]:
         """Create intelligent chunks based on content structure"""
         chunks = []
@@ -22,6 +22,8 @@ from config.dual_token_config import DualTokenConfig
 from src.core.constants import Defaults, Messages, ToolDescriptions
 from src.core.intelligent_session_manager import IntelligentSessionManager
 from src.core.adaptive_content_processor import AdaptiveContentProcessor
+from src.clients.capability_store import get_shared_capability_store
+from src.clients.resilience import call_deadline, tool_call_deadline
 from src.clients.moodle_client_enhanced import EnhancedMoodleClient
 
 # Configure logging for MCP server (stderr only)
@@ -65,7 +67,8 @@ class AdvancedMoodleMCPServer:
                 self.moodle_client = EnhancedMoodleClient(
                     base_url=self.config.moodle_url,
                     basic_token=self.config.get_basic_token(),
-                    plugin_token=self.config.get_plugin_token() if self.config.is_dual_token_mode() else None
+                    plugin_token=self.config.get_plugin_token() if self.config.is_dual_token_mode() else None,
+                    capability_store=get_shared_capability_store()
                 )
                 logger.info("Enhanced Moodle client initialized successfully")
             except Exception as e:
@@ -192,30 +195,31 @@ class AdvancedMoodleMCPServer:
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Handle tool calls with intelligent processing"""
-            try:
-                logger.info(f"Executing advanced tool: {name}")
+            with call_deadline(tool_call_deadline()):
+                try:
+                    logger.info(f"Executing advanced tool: {name}")
                 
-                if name == "create_intelligent_course":
-                    return await self._create_intelligent_course(arguments)
-                elif name == "continue_course_session":
-                    return await self._continue_course_session(arguments)
-                elif name == "validate_course":
-                    return await self._validate_course(arguments)
-                elif name == "get_session_status":
-                    return await self._get_session_status(arguments)
-                elif name == "get_processing_analytics":
-                    return await self._get_processing_analytics(arguments)
-                elif name == "analyze_content_complexity":
-                    return await self._analyze_content_complexity(arguments)
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
+                    if name == "create_intelligent_course":
+                        return await self._create_intelligent_course(arguments)
+                    elif name == "continue_course_session":
+                        return await self._continue_course_session(arguments)
+                    elif name == "validate_course":
+                        return await self._validate_course(arguments)
+                    elif name == "get_session_status":
+                        return await self._get_session_status(arguments)
+                    elif name == "get_processing_analytics":
+                        return await self._get_processing_analytics(arguments)
+                    elif name == "analyze_content_complexity":
+                        return await self._analyze_content_complexity(arguments)
+                    else:
+                        raise ValueError(f"Unknown tool: {name}")
                     
-            except Exception as e:
-                logger.error(f"Advanced tool execution failed: {e}")
-                return [types.TextContent(
-                    type="text",
-                    text=f"❌ Tool execution failed: {str(e)}\n\nI encountered an issue processing your request. Please try again or contact support if the problem persists."
-                )]
+                except Exception as e:
+                    logger.error(f"Advanced tool execution failed: {e}")
+                    return [types.TextContent(
+                        type="text",
+                        text=f"❌ Tool execution failed: {str(e)}\n\nI encountered an issue processing your request. Please try again or contact support if the problem persists."
+                    )]
     
     async def _create_intelligent_course(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Create course with intelligent processing and automatic continuation"""
@@ -534,7 +538,7 @@ class AdvancedMoodleMCPServer:
         detailed = arguments.get("detailed", False)
         
         try:
-            analytics = self.session_manager.get_session_analytics()
+            analytics = await self.session_manager.load_session_analytics()
             processor_metrics = self.session_manager.content_processor.get_processing_metrics()
             
             response_parts = [
@@ -0,0 +1,175 @@
+"""
+Content-addressed, compressed storage of session transcripts
+Stores each distinct text once in a content_blobs table keyed by its content
+hash; session and chunk rows reference it by hash and character offsets
+"""
+
+import logging
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.core.constants import Defaults
+from src.core.parse_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+
+    CODEC = "zstd"
+
+    def _compress(data: bytes) -> bytes:
+        # Compressor objects are not thread-safe and the pool has several workers
+        return zstandard.ZstdCompressor(level=Defaults.BLOB_ZSTD_LEVEL).compress(data)
+
+except ImportError:
+    zstandard = None
+    CODEC = "zlib"
+
+    def _compress(data: bytes) -> bytes:
+        return zlib.compress(data, Defaults.BLOB_ZLIB_LEVEL)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "raw":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob was compressed with zstd; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+# Tables and columns that may reference a blob
+REFERENCES = (("sessions", "content_ref"), ("session_chunks", "content_ref"))
+
+
+def ensure_columns(db: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """Add columns missing from a table created by an older schema"""
+    existing = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+    for name, declaration in columns.items():
+        if name not in existing:
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+
+
+def create_reference_index(db: sqlite3.Connection, table: str) -> None:
+    """Index a table's content_ref column so unreferenced blobs are found without scans"""
+    db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_content_ref ON {table}(content_ref)")
+
+
+class BlobStore:
+    """
+    Content-addressed text blobs in the session database
+
+    Identical texts share one row, compressed with zstd when zstandard is
+    installed and zlib otherwise; short texts are stored as-is. Methods take
+    the connection of the caller's transaction. Blobs are immutable, so
+    recently read ones are kept decompressed for offset reads.
+    """
+
+    def __init__(self, cache_entries: int = Defaults.BLOB_CACHE_ENTRIES):
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_schema(db: sqlite3.Connection) -> None:
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS content_blobs (
+                content_hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def put(self, db: sqlite3.Connection, text: str) -> str:
+        """Store a text unless already stored and return its hash"""
+        key = content_hash(text)
+        if db.execute("SELECT 1 FROM content_blobs WHERE content_hash = ?", (key,)).fetchone():
+            return key
+
+        raw = text.encode()
+        if len(raw) < Defaults.BLOB_COMPRESS_MIN_BYTES:
+            codec, data = "raw", raw
+        else:
+            codec, data = CODEC, _compress(raw)
+        db.execute(
+            "INSERT OR IGNORE INTO content_blobs (content_hash, codec, size, data) VALUES (?, ?, ?, ?)",
+            (key, codec, len(text), data),
+        )
+        return key
+
+    def get(self, db: sqlite3.Connection, key: str) -> Optional[str]:
+        """Return a stored text, or None if there is no blob with that hash"""
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                return text
+
+        row = db.execute("SELECT codec, data FROM content_blobs WHERE content_hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        text = _decompress(row[0], row[1]).decode()
+
+        with self._lock:
+            self._cache[key] = text
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return text
+
+    def get_range(self, db: sqlite3.Connection, key: str, start: int, end: int) -> Optional[str]:
+        """Return characters [start, end) of a stored text"""
+        text = self.get(db, key)
+        return None if text is None else text[start:end]
+
+    def delete_unreferenced(self, db: sqlite3.Connection, candidates: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop blobs no session or chunk row references any more
+
+        Args:
+            db: Connection of the caller's transaction
+            candidates: Only consider these hashes, e.g. those held by rows just deleted
+        """
+        tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conditions = []
+        for table, column in REFERENCES:
+            if table in tables and column in {row[1] for row in db.execute(f"PRAGMA table_info({table})")}:
+                # Indexed lookups; see create_reference_index
+                conditions.append(
+                    f"NOT EXISTS (SELECT 1 FROM {table} WHERE {table}.{column} = content_blobs.content_hash)"
+                )
+        if not conditions:
+            return 0
+
+        params: Tuple[str, ...] = ()
+        if candidates is not None:
+            params = tuple({key for key in candidates if key is not None})
+            if not params:
+                return 0
+            conditions.append(f"content_hash IN ({', '.join('?' * len(params))})")
+        return db.execute(f"DELETE FROM content_blobs WHERE {' AND '.join(conditions)}", params).rowcount
+
+
+def chunk_ranges(content: str, chunks: Iterable[str]) -> Iterable[Tuple[str, Optional[Tuple[int, int]]]]:
+    """
+    Locate each chunk in the content it was split from
+
+    Yields (chunk, (start, end)) for chunks found in order in the content
+    and (chunk, None) for chunks that have to be stored on their own.
+    """
+    position = 0
+    for chunk in chunks:
+        start = content.find(chunk, position) if chunk else -1
+        if start < 0:
+            yield chunk, None
+        else:
+            position = start + len(chunk)
+            yield chunk, (start, position)
@@ -4,12 +4,17 @@ Provides retry logic, rate limiting, and async processing
 """
 
 import asyncio
+import functools
+import heapq
+import itertools
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from src.clients.resilience import retry_after
+from src.core.rate_limiter import TokenBucket
 from src.models.models import CourseStructure
 
 logger = logging.getLogger(__name__)
@@ -21,12 +26,15 @@ class ChunkStatus(Enum):
     FAILED = "failed"
     RETRY = "retry"
 
+# Coroutine factory that formats a chunk's sections data on demand
+ChunkProducer = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
 @dataclass
 class ChunkTask:
     """Represents a chunk processing task"""
     chunk_id: str
     course_id: int
-    chunk_data: List[Dict[str, Any]]
+    chunk_data: Optional[List[Dict[str, Any]]]
     priority: int = 1
     max_retries: int = 3
     retry_count: int = 0
@@ -36,6 +44,8 @@ class ChunkTask:
     completed_at: Optional[float] = None
     error_message: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
+    chunk_producer: Optional[ChunkProducer] = None
+    production: Optional[asyncio.Task] = None
     
     def __post_init__(self):
         if self.created_at is None:
@@ -44,22 +54,30 @@ class ChunkTask:
 class ChunkProcessorQueue:
     """Queue-based processor for course content chunks"""
     
-    def __init__(self, max_concurrent: int = 2, rate_limit_delay: float = 1.0):
+    def __init__(self, max_concurrent: int = 2, rate_limit_delay: float = 1.0, prefetch: int = 1):
         """
         Initialize chunk processor queue
         
         Args:
             max_concurrent: Maximum number of chunks to process concurrently
-            rate_limit_delay: Delay between chunk processing to avoid rate limits
+            rate_limit_delay: Minimum spacing between chunk uploads (0 disables pacing)
+            prefetch: Number of pending lazy chunks produced ahead of the workers
         """
         self.max_concurrent = max_concurrent
         self.rate_limit_delay = rate_limit_delay
-        self.queue: List[ChunkTask] = []
+        self.prefetch = prefetch
+        # Heap of (-priority, created_at, sequence, task): highest priority, oldest first
+        self.queue: List[Tuple[int, float, int, ChunkTask]] = []
         self.processing: Dict[str, ChunkTask] = {}
+        self.retrying: Dict[str, ChunkTask] = {}
         self.completed: Dict[str, ChunkTask] = {}
         self.failed: Dict[str, ChunkTask] = {}
         self._processing_lock = asyncio.Lock()
-        self.last_process_time = 0.0
+        self._sequence = itertools.count()
+        # One event per running process_queue call, so overlapping calls each get woken
+        self._wakeups: Set[asyncio.Event] = set()
+        # Shared by all workers so concurrent chunks cannot slip through together
+        self.rate_limiter = TokenBucket(1.0 / rate_limit_delay, 1) if rate_limit_delay > 0 else None
         
     async def add_chunks(self, course_id: int, chunks_data: List[List[Dict[str, Any]]]) -> List[str]:
         """
@@ -79,28 +97,72 @@ class ChunkProcessorQueue:
             
             # Prioritize smaller chunks (they're more likely to succeed)
             total_activities = sum(len(section.get('activities', [])) for section in chunk_data)
-            priority = 10 - min(total_activities, 9)  # Higher priority for smaller chunks
             
             task = ChunkTask(
                 chunk_id=chunk_id,
                 course_id=course_id,
                 chunk_data=chunk_data,
-                priority=priority
+                priority=self._priority_for(total_activities)
             )
             
-            self.queue.append(task)
+            self._enqueue(task)
             chunk_ids.append(chunk_id)
-            
-        # Sort queue by priority (higher priority first)
-        self.queue.sort(key=lambda x: (-x.priority, x.created_at))
         
         logger.info(f"Added {len(chunks_data)} chunks to processing queue for course {course_id}")
         return chunk_ids
     
+    async def add_chunk_producers(self, course_id: int, producers: List[ChunkProducer],
+                                  activity_counts: Optional[List[int]] = None) -> List[str]:
+        """
+        Add lazily produced chunks to the processing queue
+        
+        Each producer is awaited just before its chunk is uploaded, and up to
+        ``prefetch`` pending producers run ahead of the workers, so formatting
+        chunk N+1 overlaps with uploading chunk N. Produced data is released
+        once the chunk finishes.
+        
+        Args:
+            course_id: Course ID
+            producers: Coroutine factories returning a chunk's sections data
+            activity_counts: Optional per-chunk activity estimates used for priority
+            
+        Returns:
+            List of chunk IDs
+        """
+        chunk_ids = []
+        
+        for i, producer in enumerate(producers):
+            chunk_id = f"course_{course_id}_chunk_{i+1}"
+            
+            # Without an estimate all lazy chunks share a priority and run in order
+            priority = self._priority_for(activity_counts[i]) if activity_counts else 1
+            
+            task = ChunkTask(
+                chunk_id=chunk_id,
+                course_id=course_id,
+                chunk_data=None,
+                priority=priority,
+                chunk_producer=producer
+            )
+            
+            self._enqueue(task)
+            chunk_ids.append(chunk_id)
+        
+        logger.info(f"Added {len(producers)} lazy chunks to processing queue for course {course_id}")
+        return chunk_ids
+    
+    @staticmethod
+    def _priority_for(total_activities: int) -> int:
+        """Higher priority for smaller chunks"""
+        return 10 - min(total_activities, 9)
+    
     async def process_queue(self, plugin_client, progress_callback=None) -> Dict[str, Any]:
         """
         Process all chunks in the queue
         
+        Workers are dispatched whenever a slot frees up; the loop sleeps on
+        an event set by task completion and retry callbacks rather than polling.
+        
         Args:
             plugin_client: Enhanced Moodle client for processing
             progress_callback: Optional callback for progress updates
@@ -110,42 +172,14 @@ class ChunkProcessorQueue:
         """
         logger.info(f"Starting queue processing with {len(self.queue)} chunks")
         
-        # Create semaphore for concurrent processing
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        wakeup = asyncio.Event()
+        self._wakeups.add(wakeup)
+        tasks = set()
         
-        # Start processing tasks
-        tasks = []
-        while self.queue or self.processing:
-            # Start new tasks if we have capacity and pending chunks
-            while len(self.processing) < self.max_concurrent and self.queue:
-                chunk_task = self.queue.pop(0)
-                task = asyncio.create_task(
-                    self._process_chunk_with_semaphore(semaphore, chunk_task, plugin_client)
-                )
-                tasks.append(task)
-                self.processing[chunk_task.chunk_id] = chunk_task
-            
-            # Wait a bit for tasks to complete
-            if tasks:
-                done, pending = await asyncio.wait(tasks, timeout=0.1, return_when=asyncio.FIRST_COMPLETED)
-                
-                # Remove completed tasks
-                for task in done:
-                    if task in tasks:
-                        tasks.remove(task)
-                
-                # Update progress if callback provided
-                if progress_callback:
-                    total_chunks = len(self.completed) + len(self.failed) + len(self.processing) + len(self.queue)
-                    completed_chunks = len(self.completed) + len(self.failed)
-                    await progress_callback(completed_chunks, total_chunks)
-            
-            # Break if no more work to do
-            if not self.queue and not self.processing:
-                break
-                
-            # Small delay to prevent busy waiting
-            await asyncio.sleep(0.1)
+        try:
+            await self._run_queue(plugin_client, progress_callback, wakeup, tasks)
+        finally:
+            self._wakeups.discard(wakeup)
         
         # Wait for any remaining tasks
         if tasks:
@@ -153,10 +187,86 @@ class ChunkProcessorQueue:
         
         return self._generate_summary()
     
-    async def _process_chunk_with_semaphore(self, semaphore: asyncio.Semaphore, chunk_task: ChunkTask, plugin_client):
-        """Process a single chunk with semaphore control"""
-        async with semaphore:
-            await self._process_single_chunk(chunk_task, plugin_client)
+    async def _run_queue(self, plugin_client, progress_callback, wakeup: asyncio.Event, tasks: set):
+        """Dispatch workers until nothing is queued, processing or waiting to retry"""
+        while self.queue or self.processing or self.retrying:
+            # Start new tasks if we have capacity and pending chunks
+            while len(self.processing) < self.max_concurrent and self.queue:
+                chunk_task = heapq.heappop(self.queue)[-1]
+                self._start_production(chunk_task)
+                self.processing[chunk_task.chunk_id] = chunk_task
+                task = asyncio.create_task(self._process_single_chunk(chunk_task, plugin_client))
+                task.add_done_callback(functools.partial(self._on_task_done, chunk_task))
+                tasks.add(task)
+            
+            # Produce upcoming lazy chunks while the current ones upload
+            self._prefetch_pending()
+            
+            # Sleep until a chunk finishes or a delayed retry becomes ready
+            await wakeup.wait()
+            wakeup.clear()
+            tasks.difference_update([task for task in tasks if task.done()])
+            
+            # Update progress if callback provided
+            if progress_callback:
+                total_chunks = (len(self.completed) + len(self.failed) + len(self.processing)
+                                + len(self.retrying) + len(self.queue))
+                completed_chunks = len(self.completed) + len(self.failed)
+                await progress_callback(completed_chunks, total_chunks)
+    
+    def _wake(self):
+        """Wake every running process_queue loop"""
+        for wakeup in self._wakeups:
+            wakeup.set()
+    
+    def _enqueue(self, chunk_task: ChunkTask):
+        """Push a task onto the priority heap"""
+        heapq.heappush(
+            self.queue, (-chunk_task.priority, chunk_task.created_at, next(self._sequence), chunk_task)
+        )
+    
+    def _on_task_done(self, chunk_task: ChunkTask, task: asyncio.Task):
+        """Completion callback that wakes the scheduler"""
+        if task.cancelled() or task.exception():
+            # Never leave a crashed worker's chunk counted as processing
+            if self.processing.pop(chunk_task.chunk_id, None) is not None:
+                chunk_task.status = ChunkStatus.FAILED
+                chunk_task.completed_at = time.time()
+                chunk_task.error_message = chunk_task.error_message or "Chunk worker crashed"
+                self.failed[chunk_task.chunk_id] = chunk_task
+                logger.error(f"❌ Chunk {chunk_task.chunk_id} worker crashed")
+        self._wake()
+    
+    def _requeue_retry(self, chunk_task: ChunkTask):
+        """Move a task whose backoff delay elapsed back onto the heap"""
+        if self.retrying.pop(chunk_task.chunk_id, None) is None:
+            return
+        chunk_task.status = ChunkStatus.PENDING
+        self._enqueue(chunk_task)
+        self._wake()
+    
+    def _prefetch_pending(self):
+        """Start producers for the next pending lazy chunks"""
+        # The k smallest heap entries always sit within its first 2**k - 1 slots
+        candidates = self.queue[:2 ** self.prefetch - 1]
+        for entry in heapq.nsmallest(self.prefetch, candidates):
+            self._start_production(entry[-1])
+    
+    @staticmethod
+    def _start_production(chunk_task: ChunkTask) -> Optional[asyncio.Task]:
+        """Start producing a lazy chunk's data if it is not already underway"""
+        if chunk_task.chunk_data is None and chunk_task.chunk_producer and chunk_task.production is None:
+            chunk_task.production = asyncio.ensure_future(chunk_task.chunk_producer())
+        return chunk_task.production
+    
+    async def _resolve_chunk_data(self, chunk_task: ChunkTask) -> List[Dict[str, Any]]:
+        """Await a lazy chunk's data, re-running its producer after a failure"""
+        if chunk_task.chunk_data is None:
+            try:
+                chunk_task.chunk_data = await self._start_production(chunk_task)
+            finally:
+                chunk_task.production = None
+        return chunk_task.chunk_data
     
     async def _process_single_chunk(self, chunk_task: ChunkTask, plugin_client):
         """Process a single chunk"""
@@ -164,23 +274,22 @@ class ChunkProcessorQueue:
         chunk_task.started_at = time.time()
         
         try:
-            # Rate limiting
-            current_time = time.time()
-            time_since_last = current_time - self.last_process_time
-            if time_since_last < self.rate_limit_delay:
-                await asyncio.sleep(self.rate_limit_delay - time_since_last)
+            chunk_data = await self._resolve_chunk_data(chunk_task)
             
-            self.last_process_time = time.time()
+            # Rate limiting
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
             
             logger.info(f"Processing chunk {chunk_task.chunk_id} (attempt {chunk_task.retry_count + 1})")
             
             # Process the chunk
-            result = await plugin_client.create_course_structure(chunk_task.course_id, chunk_task.chunk_data)
+            result = await plugin_client.create_course_structure(chunk_task.course_id, chunk_data)
             
             if result.get('success'):
                 chunk_task.status = ChunkStatus.COMPLETED
                 chunk_task.result = result
                 chunk_task.completed_at = time.time()
+                self._release_chunk_data(chunk_task)
                 
                 # Move to completed
                 async with self._processing_lock:
@@ -191,13 +300,24 @@ class ChunkProcessorQueue:
                 logger.info(f"✅ Chunk {chunk_task.chunk_id} completed successfully")
                 
             else:
-                await self._handle_chunk_failure(chunk_task, result.get('message', 'Unknown error'))
+                await self._handle_chunk_failure(
+                    chunk_task, result.get('message', 'Unknown error'), result.get('retry_after')
+                )
                 
         except Exception as e:
-            await self._handle_chunk_failure(chunk_task, str(e))
+            await self._handle_chunk_failure(chunk_task, str(e), retry_after(e))
     
-    async def _handle_chunk_failure(self, chunk_task: ChunkTask, error_message: str):
-        """Handle chunk processing failure"""
+    async def _handle_chunk_failure(self, chunk_task: ChunkTask, error_message: str,
+                                    retry_after: Optional[float] = None):
+        """
+        Handle chunk processing failure
+
+        Args:
+            chunk_task: The failed chunk
+            error_message: Why it failed
+            retry_after: Seconds until Moodle's open circuit may close; retrying
+                sooner would only be rejected
+        """
         chunk_task.retry_count += 1
         chunk_task.error_message = error_message
         
@@ -205,25 +325,25 @@ class ChunkProcessorQueue:
             # Retry with exponential backoff
             chunk_task.status = ChunkStatus.RETRY
             delay = min(2 ** chunk_task.retry_count, 30)  # Max 30 seconds
+            if retry_after is not None:
+                delay = max(delay, retry_after)
             
             logger.warning(f"⚠️ Chunk {chunk_task.chunk_id} failed, retrying in {delay}s (attempt {chunk_task.retry_count + 1}/{chunk_task.max_retries})")
             
-            # Schedule retry
-            await asyncio.sleep(delay)
-            chunk_task.status = ChunkStatus.PENDING
-            
-            # Re-add to queue with lower priority
+            # Re-add with lower priority once the backoff elapses, freeing the worker slot now
             chunk_task.priority = max(1, chunk_task.priority - 1)
             
             async with self._processing_lock:
                 if chunk_task.chunk_id in self.processing:
                     del self.processing[chunk_task.chunk_id]
-                self.queue.append(chunk_task)
-                self.queue.sort(key=lambda x: (-x.priority, x.created_at))
+                self.retrying[chunk_task.chunk_id] = chunk_task
+            
+            asyncio.get_running_loop().call_later(delay, self._requeue_retry, chunk_task)
         else:
             # Max retries reached
             chunk_task.status = ChunkStatus.FAILED
             chunk_task.completed_at = time.time()
+            self._release_chunk_data(chunk_task)
             
             async with self._processing_lock:
                 if chunk_task.chunk_id in self.processing:
@@ -232,6 +352,12 @@ class ChunkProcessorQueue:
             
             logger.error(f"❌ Chunk {chunk_task.chunk_id} failed permanently after {chunk_task.max_retries} attempts: {error_message}")
     
+    @staticmethod
+    def _release_chunk_data(chunk_task: ChunkTask):
+        """Drop produced data of finished lazy chunks to bound peak memory"""
+        if chunk_task.chunk_producer:
+            chunk_task.chunk_data = None
+    
     def _generate_summary(self) -> Dict[str, Any]:
         """Generate processing summary"""
         total_chunks = len(self.completed) + len(self.failed)
@@ -287,8 +413,10 @@ class ChunkProcessorQueue:
         return {
             'pending': len(self.queue),
             'processing': len(self.processing),
+            'retrying': len(self.retrying),
             'completed': len(self.completed),
             'failed': len(self.failed),
+            'rate_limit': self.rate_limiter.get_stats() if self.rate_limiter else None,
             'queue_tasks': [
                 {
                     'chunk_id': task.chunk_id,
@@ -296,6 +424,6 @@ class ChunkProcessorQueue:
                     'status': task.status.value,
                     'retry_count': task.retry_count
                 }
-                for task in self.queue
+                for _, _, _, task in sorted(self.queue)
             ]
         }
\ No newline at end of file
@@ -28,6 +28,46 @@ class Defaults:
     MAX_SECTIONS = 50
     MAX_ITEMS_PER_SECTION = 100
     
+    # HTTP connection pool
+    HTTP_POOL_LIMIT = 100
+    HTTP_POOL_LIMIT_PER_HOST = 10
+    HTTP_DNS_CACHE_TTL = 300
+    HTTP_KEEPALIVE_TIMEOUT = 30.0
+    HTTP_REQUEST_TIMEOUT = 300.0
+    
+    # Plugin call batching
+    BATCH_WINDOW = 0.01
+    BATCH_MAX_CALLS = 25
+    
+    # Draft file uploads in flight per upload batch
+    UPLOAD_CONCURRENCY = 4
+    UPLOAD_DEDUPE_ENTRIES = 256
+    
+    # Session database and the capability snapshot kept next to it
+    DB_PATH = "data/sessions.db"
+    CAPABILITY_MAX_AGE = 3600.0
+    
+    # Pooled SQLite connections
+    DB_POOL_SIZE = 4
+    DB_STATEMENT_CACHE = 256
+    DB_CACHE_SIZE_KB = 8192
+    DB_BUSY_TIMEOUT_MS = 5000
+    
+    # Write-behind session saves: seconds a save may stay pending, pending saves forcing a flush
+    WRITE_BEHIND_INTERVAL = 0.5
+    WRITE_BEHIND_MAX_BATCH = 64
+    
+    # Content blobs: texts below this size are stored uncompressed, decompressed blobs kept in memory
+    BLOB_COMPRESS_MIN_BYTES = 512
+    BLOB_ZSTD_LEVEL = 3
+    BLOB_ZLIB_LEVEL = 6
+    BLOB_CACHE_ENTRIES = 16
+    
+    # Cached session repository: byte budget of cached sessions, active session index refresh and size
+    SESSION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    SESSION_INDEX_TTL = 30.0
+    SESSION_INDEX_SIZE = 1000
+    
     # API endpoints
     WEBSERVICE_PATH = "/webservice/rest/server.php"
     ADMIN_PATH = "/admin"
@@ -139,6 +179,72 @@ class MoodleWebServices:
     # - mod_label_add_label (activity creation requires additional plugins)
 
 
+class RateLimits:
+    """Default web service budgets shared by all Moodle clients"""
+    
+    # Site-wide budget
+    REQUESTS_PER_SECOND = 20.0
+    BURST = 40
+    
+    # Per-wsfunction budgets as (requests per second, burst)
+    FUNCTION_LIMITS = {
+        "local_moodleclaude_create_course_structure": (2.0, 2),
+        "core_course_create_courses": (1.0, 2),
+    }
+
+
+class MetadataCaching:
+    """Caching of read-only web service results shared by all Moodle clients"""
+    
+    # Seconds a result stays cached, per wsfunction; others are never cached
+    TTLS = {
+        "core_webservice_get_site_info": 3600.0,
+        "core_course_get_categories": 300.0,
+        "core_course_get_courses": 60.0,
+        "core_course_get_contents": 60.0,
+    }
+    
+    MAX_ENTRIES = 512
+    
+    # Cached wsfunctions whose results a write call makes stale
+    INVALIDATIONS = {
+        "core_course_create_courses": ("core_course_get_courses",),
+        "core_course_create_categories": ("core_course_get_categories",),
+        "core_course_edit_section": ("core_course_get_contents",),
+        "local_wsmanagesections_create_sections": ("core_course_get_contents",),
+        "local_wsmanagesections_update_sections": ("core_course_get_contents",),
+        "local_wsmanagesections_delete_sections": ("core_course_get_contents",),
+        "local_wsmanagesections_move_section": ("core_course_get_contents",),
+        "local_moodleclaude_create_course_structure": ("core_course_get_contents",),
+        "local_moodleclaude_create_page_activity": ("core_course_get_contents",),
+        "local_moodleclaude_create_label_activity": ("core_course_get_contents",),
+        "local_moodleclaude_create_file_resource": ("core_course_get_contents",),
+        "local_moodleclaude_update_section_content": ("core_course_get_contents",),
+    }
+
+
+class Resilience:
+    """Failure isolation for Moodle web service calls"""
+    
+    # Circuit breakers (per host and per wsfunction)
+    FAILURE_THRESHOLD = 5
+    RECOVERY_TIMEOUT = 30.0
+    HALF_OPEN_MAX_CALLS = 1
+    
+    # Idempotent reads that may be sent twice when the first is slow
+    HEDGED_FUNCTIONS = frozenset({
+        "core_webservice_get_site_info",
+        "core_course_get_categories",
+        "core_course_get_courses",
+        "core_course_get_contents",
+        "local_wsmanagesections_get_sections",
+    })
+    HEDGE_DELAY = 0.75
+    
+    # Seconds an MCP tool call may spend on Moodle calls
+    TOOL_CALL_DEADLINE = 300.0
+
+
 class CourseFormats:
     """Moodle course format constants"""
     
@@ -189,6 +295,22 @@ class Environment:
     SERVER_NAME = "SERVER_NAME"
     SERVER_VERSION = "SERVER_VERSION"
     
+    # Web service rate limiting
+    RATE_LIMIT = "MOODLE_CLAUDE_RATE_LIMIT"
+    RATE_BURST = "MOODLE_CLAUDE_RATE_BURST"
+    
+    # HTTP connection pool
+    HTTP_LIMIT_PER_HOST = "MOODLE_CLAUDE_HTTP_LIMIT_PER_HOST"
+    
+    # Deadline of Moodle calls made by one MCP tool call
+    TOOL_CALL_DEADLINE = "MOODLE_CLAUDE_TOOL_DEADLINE"
+    
+    # Read-only metadata cache
+    METADATA_TTL = "MOODLE_CLAUDE_METADATA_TTL"
+    
+    # Session database location
+    DB_PATH = "MOODLE_CLAUDE_DB_PATH"
+    
     # Google Cloud specific
     PORT = "PORT"
     PROJECT_ID = "PROJECT_ID"
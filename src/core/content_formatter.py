@@ -3,13 +3,17 @@ Content Formatter for Moodle
 Handles formatting of code and topic content for Moodle activities
 """
 
+import hashlib
 import html
 import re
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
 
 import markdown
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
+from pygments.lexer import Lexer
 from pygments.lexers import get_lexer_by_name, guess_lexer
 from pygments.util import ClassNotFound
 
@@ -17,7 +21,24 @@ from pygments.util import ClassNotFound
 class ContentFormatter:
     """Formatter for creating Moodle-compatible content"""
 
-    def __init__(self):
+    def __init__(self, inline_css: bool = True, highlight_cache_size: int = 256):
+        """
+        Initialize content formatter
+
+        Args:
+            inline_css: Embed the stylesheet in every page; when False, callers
+                emit get_stylesheet() once per course instead
+            highlight_cache_size: Number of highlighted code blocks to memoise
+        """
+        self.inline_css = inline_css
+        self.highlight_cache_size = highlight_cache_size
+
+        # Lexers by language name (None when Pygments has no lexer for it)
+        self._lexer_cache: Dict[str, Optional[Lexer]] = {}
+        # Highlighted HTML by (language, code hash)
+        self._highlight_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         # Initialize Pygments HTML formatter with Moodle-friendly styling
         self.code_formatter = HtmlFormatter(
             style="default",
@@ -129,7 +150,7 @@ class ContentFormatter:
 
         # Format the complete HTML
         html_content = f"""
-        {self.code_css}
+        {self._page_css}
         
         <div class="content-section">
             <h2>{html.escape(title)}</h2>
@@ -190,7 +211,7 @@ class ContentFormatter:
 
         # Create HTML layout
         html_content = f"""
-        {self.code_css}
+        {self._page_css}
         
         <div class="topic-content">
             <h2>📚 {html.escape(title)}</h2>
@@ -224,7 +245,7 @@ class ContentFormatter:
             HTML formatted content
         """
         html_content = f"""
-        {self.code_css}
+        {self._page_css}
         
         <div class="content-section">
             <h1>📋 {html.escape(title)}</h1>
@@ -277,16 +298,46 @@ class ContentFormatter:
         html_content += "</div>"
         return html_content
 
+    @property
+    def _page_css(self) -> str:
+        """Stylesheet embedded in each generated page"""
+        return self.code_css if self.inline_css else ""
+
+    def get_stylesheet(self) -> str:
+        """Get the shared stylesheet for emitting once per course"""
+        return self.code_css
+
     def _highlight_code(self, code: str, language: Optional[str] = None) -> str:
         """Apply syntax highlighting to code"""
+        cache_key = (language, hashlib.md5(code.encode()).hexdigest())
+        with self._cache_lock:
+            highlighted = self._highlight_cache.get(cache_key)
+            if highlighted is not None:
+                self._highlight_cache.move_to_end(cache_key)
+                return highlighted
+
+        highlighted = self._render_highlighted_code(code, language)
+
+        with self._cache_lock:
+            self._highlight_cache[cache_key] = highlighted
+            if len(self._highlight_cache) > self.highlight_cache_size:
+                self._highlight_cache.popitem(last=False)
+
+        return highlighted
+
+    def _render_highlighted_code(self, code: str, language: Optional[str] = None) -> str:
+        """Run Pygments over code, falling back to escaped plain text"""
         try:
             if language:
                 # Try to get lexer by language name
-                lexer = get_lexer_by_name(language, stripnl=False)
+                lexer = self._get_lexer(language)
             else:
                 # Try to guess lexer from content
                 lexer = guess_lexer(code)
 
+            if lexer is None:
+                raise ClassNotFound(language)
+
             # Generate highlighted HTML
             highlighted = highlight(code, lexer, self.code_formatter)
             return highlighted
@@ -300,6 +351,16 @@ class ContentFormatter:
             escaped_code = html.escape(code)
             return f'<pre class="code-highlight"><code>{escaped_code}</code></pre>'
 
+    def _get_lexer(self, language: str) -> Optional[Lexer]:
+        """Get a cached lexer for a language name"""
+        with self._cache_lock:
+            if language not in self._lexer_cache:
+                try:
+                    self._lexer_cache[language] = get_lexer_by_name(language, stripnl=False)
+                except ClassNotFound:
+                    self._lexer_cache[language] = None
+            return self._lexer_cache[language]
+
     def _get_embedded_code_html(
         self, code: str, language: Optional[str] = None, description: str = ""
     ) -> str:
@@ -395,7 +456,7 @@ class ContentFormatter:
     def create_course_summary_page(self, course_name: str, sections: list) -> str:
         """Create a summary page for the course"""
         html_content = f"""
-        {self.code_css}
+        {self._page_css}
         
         <div class="content-section">
             <h1>📚 {html.escape(course_name)} - Course Overview</h1>
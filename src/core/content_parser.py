@@ -5,15 +5,162 @@ Handles parsing of chat messages to identify code blocks and topics
 
 import ast
 import logging
+import math
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.core.constants import Messages, ContentTypes
 from src.models.models import ChatContent, ContentItem
 
 logger = logging.getLogger(__name__)
 
+# Unescaped regex metacharacters that end a pattern's leading literal run
+_REGEX_META = set(".^$*+?{}[]()|")
+# Quantifiers that make the preceding character optional
+_OPTIONAL_QUANTIFIERS = set("*?{")
+
+
+def _required_literal(pattern: str) -> str:
+    """Return the literal prefix every match of ``pattern`` must start with"""
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        if char in _REGEX_META:
+            if char in _OPTIONAL_QUANTIFIERS and literal:
+                literal.pop()
+            break
+        literal.append(char)
+        i += 1
+    return "".join(literal)
+
+
+class CompiledLanguageDetector:
+    """
+    Precompiled scorer for language detection patterns
+
+    Identical patterns shared between languages (``def\\s+\\w+`` for Python,
+    Ruby and Scala, for example) are compiled and scanned once and their
+    match count is added to every owning language. Each pattern is guarded
+    by its required literal prefix, so snippets that cannot match it skip
+    the regex scan entirely. Scores are identical to running ``re.findall``
+    for every pattern of every language.
+    """
+
+    def __init__(self, language_patterns: Dict[str, List[str]]):
+        self.languages = list(language_patterns)
+        owners: Dict[str, List[int]] = {}
+        for index, patterns in enumerate(language_patterns.values()):
+            for pattern in patterns:
+                owners.setdefault(pattern, []).append(index)
+
+        self._rules = [
+            (
+                re.compile(pattern, re.IGNORECASE | re.MULTILINE),
+                _required_literal(pattern).casefold(),
+                tuple(indices),
+            )
+            for pattern, indices in owners.items()
+        ]
+
+    def score(self, code: str) -> List[int]:
+        """Return per-language match counts in ``self.languages`` order"""
+        scores = [0] * len(self.languages)
+        folded = code.casefold()
+
+        for regex, literal, indices in self._rules:
+            if literal and literal not in folded:
+                continue
+            matches = len(regex.findall(code))
+            if matches:
+                for index in indices:
+                    scores[index] += matches
+
+        return scores
+
+    def detect(self, code: str, default: str = "text") -> str:
+        """Return the highest scoring language, first declared wins ties"""
+        best_index = -1
+        best_score = 0
+        for index, score in enumerate(self.score(code)):
+            if score > best_score:
+                best_index, best_score = index, score
+
+        return self.languages[best_index] if best_index >= 0 else default
+
+
+class ContentDeduplicator:
+    """
+    Incremental duplicate filter for parsed content items
+
+    Code items are deduplicated by their stripped content, topic items by
+    word-set Jaccard similarity against previously accepted topics.
+
+    Topic word sets are built once per item and indexed by a prefix
+    signature: the first ``n - floor(threshold * n) + 1`` words of each set
+    under a fixed global word order. Two sets reaching the similarity
+    threshold always share a signature word, so only topics in a common
+    bucket are verified with the exact Jaccard check.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._seen_code: Set[int] = set()
+        self._topic_words: List[frozenset] = []
+        self._buckets: Dict[str, List[int]] = {}
+
+    def accept(self, item: ContentItem) -> bool:
+        """Return True and remember the item if it is not a duplicate"""
+        if item.type == "code":
+            code_hash = hash(item.content.strip())
+            if code_hash in self._seen_code:
+                return False
+            self._seen_code.add(code_hash)
+            return True
+
+        words = frozenset(item.content.lower().split())
+        if not words:
+            # Empty topics are never similar to anything, so never indexed
+            return True
+
+        signature = self._signature(words)
+        checked: Set[int] = set()
+        for word in signature:
+            for index in self._buckets.get(word, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if self._is_similar(words, self._topic_words[index]):
+                    return False
+
+        index = len(self._topic_words)
+        self._topic_words.append(words)
+        for word in signature:
+            self._buckets.setdefault(word, []).append(index)
+        return True
+
+    def _signature(self, words: frozenset) -> List[str]:
+        """Return the prefix words any similar set must share with ``words``"""
+        # Longer words are rarer, so they make smaller buckets
+        ordered = sorted(words, key=lambda word: (-len(word), word))
+        prefix_length = len(ordered) - math.floor(self.threshold * len(ordered)) + 1
+        return ordered[:prefix_length]
+
+    def _is_similar(self, words1: frozenset, words2: frozenset) -> bool:
+        """Exact Jaccard check, equivalent to ChatContentParser._are_similar_topics"""
+        overlap = len(words1 & words2)
+        union = len(words1) + len(words2) - overlap
+        return overlap / union >= self.threshold
+
 
 class ChatContentParser:
     """Parser for extracting structured content from Claude chat conversations"""
@@ -87,6 +234,7 @@ class ChatContentParser:
             "matlab": [r"function\s+\w+", r"end\s*$", r"plot\s*\(", r"fprintf"],
             "scala": [r"def\s+\w+", r"val\s+\w+", r"object\s+\w+", r"case\s+class"],
         }
+        self.language_detector = CompiledLanguageDetector(self.language_patterns)
 
         # Topic keywords that indicate educational content
         self.topic_keywords = [
@@ -125,12 +273,14 @@ class ChatContentParser:
             re.compile(r"^\*\*(.+)\*\*$", re.MULTILINE),  # Bold text lines
         ]
 
-    def parse_chat(self, chat_content: str) -> ChatContent:
+    def parse_chat(self, chat_content: str, max_workers: Optional[int] = None) -> ChatContent:
         """
         Parse chat content and extract code examples and topics
 
         Args:
             chat_content: Raw chat conversation content
+            max_workers: Opt-in process count for parsing messages in parallel;
+                None or 1 parses serially. Output is identical either way.
 
         Returns:
             ChatContent object with extracted items
@@ -143,19 +293,12 @@ class ChatContentParser:
         items = []
         current_topic = None
 
-        for message in messages:
-            # Extract code blocks
-            code_items = self._extract_code_blocks(message, current_topic)
-            items.extend(code_items)
-
-            # Extract topic descriptions
-            topic_items = self._extract_topic_descriptions(message)
-            items.extend(topic_items)
-
-            # Update current topic context
-            detected_topic = self._detect_topic_context(message)
-            if detected_topic:
-                current_topic = detected_topic
+        if max_workers and max_workers > 1 and len(messages) > 1:
+            items = self._parse_messages_parallel(messages, max_workers)
+        else:
+            for message in messages:
+                message_items, current_topic = self._parse_message(message, current_topic)
+                items.extend(message_items)
 
         # Post-process to remove duplicates and organize
         items = self._deduplicate_and_organize(items)
@@ -163,6 +306,89 @@ class ChatContentParser:
         logger.info(Messages.PARSING_COMPLETED.format(count=len(items)))
         return ChatContent(items=items)
 
+    def parse_stream(self, chunks: Iterable[str]) -> Iterator[ContentItem]:
+        """
+        Incrementally parse chat content delivered in arbitrary text chunks
+
+        Messages are delimited by blank lines followed by a word character,
+        the same boundary ``_split_into_messages`` prefers, but boundaries
+        inside fenced code blocks are ignored. Only the unfinished message is
+        buffered, and the topic context is carried across chunk boundaries.
+
+        Args:
+            chunks: Iterable of raw chat text fragments
+
+        Yields:
+            Deduplicated ContentItem objects as soon as their message is complete
+        """
+        deduplicator = ContentDeduplicator()
+        splitter = _StreamingMessageSplitter()
+        current_topic = None
+        count = 0
+
+        def drain(messages: List[str]) -> Iterator[ContentItem]:
+            nonlocal current_topic, count
+            for message in messages:
+                message_items, current_topic = self._parse_message(message, current_topic)
+                for item in message_items:
+                    if deduplicator.accept(item):
+                        count += 1
+                        yield item
+
+        for chunk in chunks:
+            yield from drain(splitter.feed(chunk))
+        yield from drain(splitter.close())
+
+        logger.info(Messages.PARSING_COMPLETED.format(count=count))
+
+    def _parse_message(
+        self, message: str, current_topic: Optional[str]
+    ) -> Tuple[List[ContentItem], Optional[str]]:
+        """Extract items from one message and return the updated topic context"""
+        # Extract code blocks
+        items = self._extract_code_blocks(message, current_topic)
+
+        # Extract topic descriptions
+        items.extend(self._extract_topic_descriptions(message))
+
+        # Update current topic context
+        detected_topic = self._detect_topic_context(message)
+        if detected_topic:
+            current_topic = detected_topic
+
+        return items, current_topic
+
+    def _parse_messages_parallel(self, messages: List[str], max_workers: int) -> List[ContentItem]:
+        """
+        Parse messages over a process pool and reconcile topic context afterwards
+
+        Workers parse each message without topic context, so code items carry
+        the topic inferred from their own message. The sequential pass then
+        applies the carried-over topic, which takes precedence exactly as in
+        ``_parse_message``.
+        """
+        workers = min(max_workers, len(messages), os.cpu_count() or 1)
+        chunksize = max(1, len(messages) // (workers * 4))
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_parse_worker, initargs=(self,)
+        ) as executor:
+            results = list(executor.map(_parse_message_worker, messages, chunksize=chunksize))
+
+        items = []
+        current_topic = None
+        for message_items, detected_topic in results:
+            if current_topic:
+                for item in message_items:
+                    if item.type == "code":
+                        item.topic = current_topic
+            items.extend(message_items)
+
+            if detected_topic:
+                current_topic = detected_topic
+
+        return items
+
     def _split_into_messages(self, content: str) -> List[str]:
         """Split content into individual messages"""
         # Try to detect message boundaries
@@ -255,24 +481,7 @@ class ChatContentParser:
 
     def _detect_language(self, code: str) -> str:
         """Detect programming language from code content"""
-        code_lower = code.lower()
-
-        # Score each language based on pattern matches
-        scores = {}
-        for language, patterns in self.language_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, code, re.IGNORECASE | re.MULTILINE))
-                score += matches
-
-            if score > 0:
-                scores[language] = score
-
-        # Return language with highest score
-        if scores:
-            return max(scores.keys(), key=lambda k: scores[k])
-
-        return "text"
+        return self.language_detector.detect(code)
 
     def _generate_code_metadata(self, code: str, language: str, context: str) -> Tuple[str, str]:
         """Generate title and description for code"""
@@ -599,31 +808,8 @@ class ChatContentParser:
 
     def _deduplicate_and_organize(self, items: List[ContentItem]) -> List[ContentItem]:
         """Remove duplicates and organize content items"""
-        # Remove duplicate code blocks
-        seen_code = set()
-        unique_items = []
-
-        for item in items:
-            if item.type == "code":
-                # Create hash of code content for deduplication
-                code_hash = hash(item.content.strip())
-                if code_hash not in seen_code:
-                    seen_code.add(code_hash)
-                    unique_items.append(item)
-            else:
-                # For topics, check for similar content
-                is_duplicate = False
-                for existing_item in unique_items:
-                    if existing_item.type == "topic" and self._are_similar_topics(
-                        item.content, existing_item.content
-                    ):
-                        is_duplicate = True
-                        break
-
-                if not is_duplicate:
-                    unique_items.append(item)
-
-        return unique_items
+        deduplicator = ContentDeduplicator()
+        return [item for item in items if deduplicator.accept(item)]
 
     def _are_similar_topics(self, content1: str, content2: str, threshold: float = 0.8) -> bool:
         """Check if two topic contents are similar"""
@@ -639,3 +825,68 @@ class ChatContentParser:
 
         similarity = overlap / union if union > 0 else 0
         return similarity >= threshold
+
+
+# Parser instance used by process pool workers, set by _init_parse_worker
+_worker_parser: Optional[ChatContentParser] = None
+
+
+def _init_parse_worker(parser: ChatContentParser) -> None:
+    """Install the submitting parser's configuration in a worker process"""
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _parse_message_worker(message: str) -> Tuple[List[ContentItem], Optional[str]]:
+    """Parse one message without topic context and report its detected topic"""
+    return _worker_parser._parse_message(message, None)
+
+
+class _StreamingMessageSplitter:
+    """Fence-aware splitter that turns text chunks into complete messages"""
+
+    # Fence markers and the blank-line message boundary
+    _token_pattern = re.compile(r"```|\n\n(?=\w)")
+    # Tokens are at most three characters, so only the buffer tail can hold a partial one
+    _lookbehind = 3
+
+    def __init__(self):
+        self._buffer = ""
+        self._scan_from = 0
+        self._in_fence = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk and return the messages it completed"""
+        if not chunk:
+            return []
+
+        self._buffer += chunk
+        messages = []
+        message_start = 0
+        scanned_to = self._scan_from
+
+        for match in self._token_pattern.finditer(self._buffer, self._scan_from):
+            if match.group() == "```":
+                if match.end() > len(self._buffer) - 1:
+                    # A following backtick would change how the run is tokenised
+                    break
+                self._in_fence = not self._in_fence
+            elif not self._in_fence:
+                message = self._buffer[message_start : match.start()].strip()
+                if message:
+                    messages.append(message)
+                message_start = match.end()
+            scanned_to = match.end()
+
+        self._buffer = self._buffer[message_start:]
+        tail_start = len(self._buffer) - self._lookbehind
+        self._scan_from = max(scanned_to - message_start, tail_start, 0)
+        return messages
+
+    def close(self) -> List[str]:
+        """Flush the trailing message once the input is exhausted"""
+        message = self._buffer.strip()
+        self._buffer = ""
+        self._scan_from = 0
+        self._in_fence = False
+        return [message] if message else []
@@ -6,7 +6,8 @@ Supports both basic Moodle operations and enhanced plugin functionality
 
 import asyncio
 import logging
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 import mcp.server.stdio
 import mcp.types as types
@@ -25,9 +26,13 @@ from src.core.content_parser import ChatContentParser
 from src.core.content_chunker import ContentChunker
 from src.core.chunk_processor_queue import ChunkProcessorQueue
 from src.core.content_preprocessor import ContentPreprocessor
+from src.core.parse_cache import get_shared_parse_cache
 from src.models.models import ChatContent, CourseStructure
 from src.clients.moodle_client import MoodleClient
 from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+from src.clients.capability_store import get_shared_capability_store
+from src.clients.resilience import call_deadline, tool_call_deadline
+from src.clients.http_session import get_shared_session_factory
 
 # Configure logging for MCP server (stderr only, no emojis)
 import sys
@@ -42,19 +47,29 @@ logger = logging.getLogger(__name__)
 class EnhancedMoodleMCPServer:
     """Enhanced MCP Server with dual-token support for optimal functionality"""
     
+    # Threads used for parsing, formatting and sanitizing course content
+    FORMAT_WORKERS = 2
+    
     def __init__(self):
         """Initialize the Enhanced MCP Server with dual-token configuration"""
         self.server = Server(Defaults.SERVER_NAME)
         self.content_parser = ChatContentParser()
+        self.parse_cache = get_shared_parse_cache()
         self.content_formatter = ContentFormatter()
         self.content_chunker = ContentChunker()
         self.content_preprocessor = ContentPreprocessor()
         self.chunk_processor = ChunkProcessorQueue(max_concurrent=2, rate_limit_delay=0.5)
         
+        # Bounded pool for CPU-heavy parsing/formatting so the MCP loop stays responsive
+        self.format_executor = ThreadPoolExecutor(
+            max_workers=self.FORMAT_WORKERS, thread_name_prefix="moodle-format"
+        )
+        
         # Load dual-token configuration
         try:
             self.config = DualTokenConfig.from_env()
             logger.info(f"Configuration loaded: {self.config.get_config_summary()}")
+            self.content_formatter.inline_css = self.config.inline_css
         except Exception as e:
             logger.error(f"Configuration error: {e}")
             self.config = None
@@ -80,7 +95,8 @@ class EnhancedMoodleMCPServer:
                 plugin_token = self.config.get_plugin_token()
                 self.plugin_client = EnhancedMoodleClient(
                     base_url=self.config.moodle_url,
-                    token=plugin_token
+                    token=plugin_token,
+                    capability_store=get_shared_capability_store()
                 )
                 
                 if self.config.is_dual_token_mode():
@@ -158,20 +174,21 @@ class EnhancedMoodleMCPServer:
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Handle tool calls"""
-            try:
-                if name == "create_course_from_chat":
-                    return await self._create_course_from_chat(arguments)
-                elif name == "extract_and_preview_content":
-                    return await self._extract_and_preview_content(arguments)
-                elif name == "test_plugin_functionality":
-                    return await self._test_plugin_functionality(arguments)
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
-            except Exception as e:
-                logger.error(f"Tool execution failed: {e}")
-                return [
-                    types.TextContent(type="text", text=f"Error executing tool '{name}': {str(e)}")
-                ]
+            with call_deadline(tool_call_deadline()):
+                try:
+                    if name == "create_course_from_chat":
+                        return await self._create_course_from_chat(arguments)
+                    elif name == "extract_and_preview_content":
+                        return await self._extract_and_preview_content(arguments)
+                    elif name == "test_plugin_functionality":
+                        return await self._test_plugin_functionality(arguments)
+                    else:
+                        raise ValueError(f"Unknown tool: {name}")
+                except Exception as e:
+                    logger.error(f"Tool execution failed: {e}")
+                    return [
+                        types.TextContent(type="text", text=f"Error executing tool '{name}': {str(e)}")
+                    ]
     
     async def _create_course_from_chat(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Create course using enhanced dual-token system"""
@@ -186,9 +203,14 @@ class EnhancedMoodleMCPServer:
         course_description = arguments.get("course_description", "")
         category_id = arguments.get("category_id", 1)
         
+        loop = asyncio.get_running_loop()
+        format_futures = []
+        
         try:
             # Parse content
-            parsed_content = self.content_parser.parse_chat(chat_content)
+            parsed_content = await loop.run_in_executor(
+                self.format_executor, self.parse_cache.get_or_parse, self.content_parser, chat_content
+            )
             course_structure = self._organize_content(parsed_content)
             
             # Check if content needs chunking
@@ -202,6 +224,13 @@ class EnhancedMoodleMCPServer:
             else:
                 course_chunks = [course_structure]
             
+            # Start formatting the first chunk now so it overlaps with course creation
+            format_futures = [
+                loop.run_in_executor(
+                    self.format_executor, self._build_chunk_sections_data, 0, course_chunks[0]
+                )
+            ]
+            
             # Create course using basic client
             logger.info(f"Creating course with basic client: {course_name}")
             async with self.basic_client as basic:
@@ -222,68 +251,35 @@ class EnhancedMoodleMCPServer:
                 if plugin_available:
                     logger.info("[OK] Plugin available - using enhanced functionality with queue processing")
                     
-                    # Prepare sections data for all chunks with preprocessing
-                    chunks_sections_data = []
+                    # Format and preprocess each chunk lazily, just ahead of its upload
                     preprocessing_stats = []
+                    # The first chunk's formatting is already underway; later ones start on demand
+                    started_futures = {0: format_futures[0]}
                     
-                    for chunk_index, chunk_structure in enumerate(course_chunks):
-                        sections_data = []
-                        for section in chunk_structure.sections:
-                            section_data = {
-                                'name': section.name,
-                                'summary': section.description,
-                                'activities': []
-                            }
-                            
-                            for item in section.items:
-                                if item.type == "code":
-                                    # Create both file and page for code
-                                    section_data['activities'].extend([
-                                        {
-                                            'type': 'file',
-                                            'name': f"{item.title} - Code File",
-                                            'content': item.content,
-                                            'filename': f"{item.title.lower().replace(' ', '_')}.{item.language or 'txt'}"
-                                        },
-                                        {
-                                            'type': 'page',
-                                            'name': item.title,
-                                            'content': self.content_formatter.format_code_for_moodle(
-                                                code=item.content,
-                                                language=item.language,
-                                                title=item.title,
-                                                description=item.description or ""
-                                            )
-                                        }
-                                    ])
-                                elif item.type == "topic":
-                                    section_data['activities'].append({
-                                        'type': 'page',
-                                        'name': item.title,
-                                        'content': self.content_formatter.format_topic_for_moodle(
-                                            content=item.content,
-                                            title=item.title,
-                                            description=item.description or ""
-                                        )
-                                    })
-                            
-                            sections_data.append(section_data)
-                        
-                        # Apply preprocessing to each chunk
-                        original_sections = sections_data.copy()
-                        sanitized_sections = self.content_preprocessor.sanitize_sections_data(sections_data)
-                        
-                        # Get preprocessing statistics
-                        chunk_stats = self.content_preprocessor.get_preprocessing_stats(original_sections, sanitized_sections)
-                        chunk_stats['chunk_index'] = chunk_index
-                        preprocessing_stats.append(chunk_stats)
-                        
-                        logger.info(f"Chunk {chunk_index + 1} preprocessing: {chunk_stats['size_reduction_percent']:.1f}% size reduction, {chunk_stats['estimated_success_probability']:.1f}% success probability")
-                        
-                        chunks_sections_data.append(sanitized_sections)
+                    def make_chunk_producer(chunk_index: int, chunk_structure: CourseStructure):
+                        async def produce_chunk() -> List[Dict[str, Any]]:
+                            future = started_futures.pop(chunk_index, None) or loop.run_in_executor(
+                                self.format_executor, self._build_chunk_sections_data,
+                                chunk_index, chunk_structure
+                            )
+                            sanitized_sections, chunk_stats = await future
+                            preprocessing_stats.append(chunk_stats)
+                            return sanitized_sections
+                        return produce_chunk
+                    
+                    chunk_producers = [
+                        make_chunk_producer(chunk_index, chunk_structure)
+                        for chunk_index, chunk_structure in enumerate(course_chunks)
+                    ]
+                    activity_counts = [
+                        sum(2 if item.type == "code" else 1 for section in chunk.sections for item in section.items)
+                        for chunk in course_chunks
+                    ]
                     
                     # Add chunks to queue and process
-                    chunk_ids = await self.chunk_processor.add_chunks(course_id, chunks_sections_data)
+                    chunk_ids = await self.chunk_processor.add_chunk_producers(
+                        course_id, chunk_producers, activity_counts
+                    )
                     logger.info(f"Added {len(chunk_ids)} chunks to processing queue: {chunk_ids}")
                     
                     # Progress callback for user feedback
@@ -393,14 +389,22 @@ class EnhancedMoodleMCPServer:
                         
                 else:
                     logger.warning("[ERROR] Plugin not available - using fallback")
+                    self._cancel_futures(format_futures)
                     summary = await self._create_course_fallback(course_id, course_structure, plugin)
                     
             return [types.TextContent(type="text", text=summary)]
             
         except Exception as e:
             logger.error(f"Course creation failed: {e}")
+            self._cancel_futures(format_futures)
             return [types.TextContent(type="text", text=f"Failed to create course: {str(e)}")]
     
+    @staticmethod
+    def _cancel_futures(futures: List[asyncio.Future]):
+        """Cancel formatting work whose result is no longer needed"""
+        for future in futures:
+            future.cancel()
+    
     async def _create_course_fallback(self, course_id: int, course_structure: CourseStructure, client) -> str:
         """Fallback course creation without plugin"""
         summary = f"""
@@ -478,7 +482,7 @@ class EnhancedMoodleMCPServer:
         chat_content = arguments["chat_content"]
         
         try:
-            parsed_content = self.content_parser.parse_chat(chat_content)
+            parsed_content = self.parse_cache.get_or_parse(self.content_parser, chat_content)
             course_structure = self._organize_content(parsed_content)
             
             preview = f"""
@@ -497,6 +501,74 @@ class EnhancedMoodleMCPServer:
             logger.error(f"Failed to preview content: {e}")
             return [types.TextContent(type="text", text=f"Failed to preview content: {str(e)}")]
     
+    def _build_chunk_sections_data(
+        self, chunk_index: int, chunk_structure: CourseStructure
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Format and sanitize one chunk into plugin sections data
+
+        CPU-bound (Pygments, markdown, regex sanitising); runs on the format executor.
+        """
+        sections_data = []
+        for section in chunk_structure.sections:
+            section_data = {
+                'name': section.name,
+                'summary': section.description,
+                'activities': []
+            }
+
+            for item in section.items:
+                if item.type == "code":
+                    # Create both file and page for code
+                    section_data['activities'].extend([
+                        {
+                            'type': 'file',
+                            'name': f"{item.title} - Code File",
+                            'content': item.content,
+                            'filename': f"{item.title.lower().replace(' ', '_')}.{item.language or 'txt'}"
+                        },
+                        {
+                            'type': 'page',
+                            'name': item.title,
+                            'content': self.content_formatter.format_code_for_moodle(
+                                code=item.content,
+                                language=item.language,
+                                title=item.title,
+                                description=item.description or ""
+                            )
+                        }
+                    ])
+                elif item.type == "topic":
+                    section_data['activities'].append({
+                        'type': 'page',
+                        'name': item.title,
+                        'content': self.content_formatter.format_topic_for_moodle(
+                            content=item.content,
+                            title=item.title,
+                            description=item.description or ""
+                        )
+                    })
+
+            sections_data.append(section_data)
+
+        # Emit the shared stylesheet once per course when pages omit it
+        if chunk_index == 0 and sections_data and not self.content_formatter.inline_css:
+            sections_data[0]['summary'] = (
+                self.content_formatter.get_stylesheet() + sections_data[0]['summary']
+            )
+
+        # Apply preprocessing to each chunk
+        original_sections = sections_data.copy()
+        sanitized_sections = self.content_preprocessor.sanitize_sections_data(sections_data)
+
+        # Get preprocessing statistics
+        chunk_stats = self.content_preprocessor.get_preprocessing_stats(original_sections, sanitized_sections)
+        chunk_stats['chunk_index'] = chunk_index
+
+        logger.info(f"Chunk {chunk_index + 1} preprocessing: {chunk_stats['size_reduction_percent']:.1f}% size reduction, {chunk_stats['estimated_success_probability']:.1f}% success probability")
+
+        return sanitized_sections, chunk_stats
+    
     def _organize_content(self, parsed_content: ChatContent) -> CourseStructure:
         """Organize parsed content into course structure (same as original)"""
         sections = []
@@ -558,19 +630,22 @@ async def main():
     """Main entry point for the Enhanced MCP server"""
     server_instance = EnhancedMoodleMCPServer()
     
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server_instance.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="enhanced-moodle-course-creator",
-                server_version="2.0.0",
-                capabilities=server_instance.server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server_instance.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="enhanced-moodle-course-creator",
+                    server_version="2.0.0",
+                    capabilities=server_instance.server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await get_shared_session_factory().close()
 
 
 if __name__ == "__main__":
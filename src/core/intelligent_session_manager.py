@@ -9,16 +9,24 @@ import json
 import sqlite3
 import os
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
-from src.core.adaptive_content_processor import AdaptiveContentProcessor, ProcessingSession, SessionState
+from src.core.adaptive_content_processor import (
+    AdaptiveContentProcessor, ProcessingSession, ProcessingStrategy, SessionState
+)
+from src.core.blob_store import BlobStore, create_reference_index, ensure_columns
+from src.core.sqlite_pool import get_shared_pool
+from src.core.write_behind import WriteBehindQueue
 from src.clients.moodle_client_enhanced import EnhancedMoodleClient
 from src.models.models import CourseStructure
 
 logger = logging.getLogger(__name__)
 
+# Session states after which a session is no longer updated
+DURABLE_STATES = frozenset({SessionState.COMPLETED, SessionState.FAILED})
+
 @dataclass
 class SessionDatabase:
     """Database configuration for session persistence"""
@@ -53,10 +61,19 @@ class IntelligentSessionManager:
             )
         self.db_config = db_config
         self.content_processor = AdaptiveContentProcessor()
+        self._blobs = BlobStore()
         
         # Initialize database
         self._init_database()
         
+        # Session saves are coalesced and written in batches off the event loop
+        # Content hash of each written session row
+        self._persisted_content: Dict[str, str] = {}
+        self._session_writer = WriteBehindQueue(
+            get_shared_pool(self.db_config.db_path), self._write_sessions,
+            name="session-writer", on_written=self._sessions_written,
+        )
+        
         # Load active sessions from database
         self._load_active_sessions()
         
@@ -127,6 +144,11 @@ class IntelligentSessionManager:
                     )
                 """)
                 
+                # Original content is stored once per distinct text in content_blobs
+                self._blobs.create_schema(conn)
+                ensure_columns(conn, "sessions", {"content_ref": "TEXT"})
+                create_reference_index(conn, "sessions")
+                
                 conn.commit()
                 
         except Exception as e:
@@ -146,9 +168,15 @@ class IntelligentSessionManager:
                 
                 for row in cursor:
                     session_data = dict(row)
+                    content_ref = session_data.pop('content_ref', None)
+                    if content_ref is not None:
+                        session_data['original_content'] = self._blobs.get(conn, content_ref)
                     session_data['created_sections'] = json.loads(session_data['created_sections'] or '[]')
                     session_data['needs_continuation'] = bool(session_data['needs_continuation'])
                     
+                    session_data['strategy'] = ProcessingStrategy(session_data['strategy'])
+                    session_data['state'] = SessionState(session_data['state'])
+                    
                     # Convert datetime strings back to datetime objects
                     for field in ['created_at', 'updated_at', 'expires_at']:
                         session_data[field] = datetime.fromisoformat(session_data[field])
@@ -156,6 +184,7 @@ class IntelligentSessionManager:
                     # Convert to ProcessingSession object
                     session = ProcessingSession(**session_data)
                     self.content_processor.active_sessions[session.session_id] = session
+                    self._persisted_content[session.session_id] = session.content_hash
                 
                 logger.info(f"Loaded {len(self.content_processor.active_sessions)} active sessions from database")
                 
@@ -163,39 +192,67 @@ class IntelligentSessionManager:
             logger.error(f"Failed to load sessions from database: {e}")
     
     def _save_session_to_db(self, session: ProcessingSession):
-        """Save session to database"""
+        """
+        Queue a session save
+        
+        Repeated saves of a session are coalesced and written in batches by a
+        background thread. Completed and failed sessions are flushed and
+        synced to disk right away.
+        """
         try:
-            with sqlite3.connect(self.db_config.db_path) as conn:
-                session_data = asdict(session)
-                session_data['created_sections'] = json.dumps(session_data['created_sections'])
-                session_data['needs_continuation'] = int(session_data['needs_continuation'])
-                
-                # Convert datetime objects to strings
-                for field in ['created_at', 'updated_at', 'expires_at']:
-                    session_data[field] = session_data[field].isoformat()
-                
-                conn.execute("""
-                    INSERT OR REPLACE INTO sessions (
-                        session_id, content_hash, original_content, course_name, strategy, state,
-                        total_chunks, processed_chunks, current_chunk_index, course_id, created_sections,
-                        error_count, last_error, retry_attempts, needs_continuation, continuation_prompt,
-                        created_at, updated_at, expires_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session_data['session_id'], session_data['content_hash'], session_data['original_content'],
-                    session_data['course_name'], session_data['strategy'], session_data['state'],
-                    session_data['total_chunks'], session_data['processed_chunks'], session_data['current_chunk_index'],
-                    session_data['course_id'], session_data['created_sections'], session_data['error_count'],
-                    session_data['last_error'], session_data['retry_attempts'], session_data['needs_continuation'],
-                    session_data['continuation_prompt'], session_data['created_at'], session_data['updated_at'],
-                    session_data['expires_at']
-                ))
-                
-                conn.commit()
+            row = (
+                session.session_id, session.content_hash, session.original_content,
+                session.course_name, session.strategy.value, session.state.value,
+                session.total_chunks, session.processed_chunks, session.current_chunk_index,
+                session.course_id, json.dumps(session.created_sections), session.error_count,
+                session.last_error, session.retry_attempts, int(session.needs_continuation),
+                session.continuation_prompt, session.created_at.isoformat(), session.updated_at.isoformat(),
+                session.expires_at.isoformat()
+            )
+            self._session_writer.submit(
+                session.session_id, row, durable=session.state in DURABLE_STATES
+            )
                 
         except Exception as e:
             logger.error(f"Failed to save session {session.session_id} to database: {e}")
     
+    def _write_sessions(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]):
+        """Write a batch of queued session rows (runs on the session writer thread)"""
+        for session_id, row in batch:
+            if self._persisted_content.get(session_id) == row[1]:
+                # Content unchanged since it was written: leave the large columns alone
+                cursor = conn.execute("""
+                    UPDATE sessions SET
+                        course_name = ?, strategy = ?, state = ?, total_chunks = ?, processed_chunks = ?,
+                        current_chunk_index = ?, course_id = ?, created_sections = ?, error_count = ?,
+                        last_error = ?, retry_attempts = ?, needs_continuation = ?, continuation_prompt = ?,
+                        created_at = ?, updated_at = ?, expires_at = ?
+                    WHERE session_id = ?
+                """, row[3:] + (session_id,))
+                if cursor.rowcount:
+                    continue
+            
+            # The content goes to its blob; sessions with the same content share it
+            previous = conn.execute(
+                "SELECT content_ref FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            content_ref = self._blobs.put(conn, row[2])
+            conn.execute("""
+                INSERT OR REPLACE INTO sessions (
+                    session_id, content_hash, original_content, content_ref, course_name, strategy, state,
+                    total_chunks, processed_chunks, current_chunk_index, course_id, created_sections,
+                    error_count, last_error, retry_attempts, needs_continuation, continuation_prompt,
+                    created_at, updated_at, expires_at
+                ) VALUES (?, ?, '', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row[:2] + (content_ref,) + row[3:])
+            if previous and previous[0] not in (None, content_ref):
+                self._blobs.delete_unreferenced(conn, [previous[0]])
+    
+    def _sessions_written(self, batch: List[Tuple[str, tuple]]):
+        """Remember which content each written session row holds"""
+        for session_id, row in batch:
+            self._persisted_content[session_id] = row[1]
+    
     def _start_background_tasks(self):
         """Start background maintenance tasks"""
         # Cleanup task
@@ -214,6 +271,7 @@ class IntelligentSessionManager:
             try:
                 await asyncio.sleep(self.db_config.backup_interval)
                 self.content_processor.cleanup_expired_sessions()
+                await asyncio.to_thread(self._session_writer.flush)
                 
                 # Clean up database
                 with sqlite3.connect(self.db_config.db_path) as conn:
@@ -221,6 +279,7 @@ class IntelligentSessionManager:
                         DELETE FROM sessions 
                         WHERE datetime(expires_at) < datetime('now', '-1 day')
                     """)
+                    self._blobs.delete_unreferenced(conn)
                     conn.commit()
                     
             except Exception as e:
@@ -232,7 +291,8 @@ class IntelligentSessionManager:
             try:
                 await asyncio.sleep(self.db_config.backup_interval)
                 
-                # Create backup
+                # Create backup, including saves still pending
+                await asyncio.to_thread(self._session_writer.flush)
                 backup_path = f"{self.db_config.db_path}.backup.{int(datetime.now().timestamp())}"
                 
                 with sqlite3.connect(self.db_config.db_path) as source:
@@ -626,9 +686,21 @@ class IntelligentSessionManager:
         except Exception as e:
             logger.error(f"Error recording session metrics: {e}")
     
+    async def load_session_analytics(self) -> Dict[str, Any]:
+        """Get session analytics without blocking the event loop on queued saves or queries"""
+        return await asyncio.to_thread(self.get_session_analytics)
+    
     def get_session_analytics(self) -> Dict[str, Any]:
-        """Get comprehensive session analytics"""
+        """
+        Get comprehensive session analytics
+        
+        Waits for queued session saves and queries the database on the calling
+        thread; async callers use load_session_analytics.
+        """
         try:
+            # Count sessions whose saves are still queued
+            self._session_writer.flush()
+            
             with sqlite3.connect(self.db_config.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 
@@ -639,8 +711,9 @@ class IntelligentSessionManager:
                         COUNT(CASE WHEN state = 'completed' THEN 1 END) as completed_sessions,
                         COUNT(CASE WHEN state = 'failed' THEN 1 END) as failed_sessions,
                         AVG(processed_chunks * 1.0 / total_chunks) as avg_completion_rate,
-                        AVG(LENGTH(original_content)) as avg_content_size
+                        AVG(COALESCE(content_blobs.size, LENGTH(original_content))) as avg_content_size
                     FROM sessions
+                    LEFT JOIN content_blobs ON content_blobs.content_hash = sessions.content_ref
                 """).fetchone()
                 
                 # Strategy effectiveness
@@ -687,8 +760,9 @@ class IntelligentSessionManager:
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
         
-        # Save all active sessions
+        # Save all active sessions and wait until they are written
         for session in self.content_processor.active_sessions.values():
             self._save_session_to_db(session)
+        await asyncio.to_thread(self._session_writer.close)
         
         logger.info("IntelligentSessionManager shutdown complete")
\ No newline at end of file
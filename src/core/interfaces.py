@@ -30,6 +30,13 @@ class SessionEventType(Enum):
     VALIDATION_COMPLETED = "validation_completed"
 
 
+class SessionView(Enum):
+    """Fields of a session loaded by ISessionRepository.get_by_id"""
+    STATUS = "status"            # Session row only: state, progress and timestamps, no content
+    LAZY_CHUNKS = "lazy_chunks"  # Everything but content; chunk bodies load on request
+    FULL = "full"                # Everything, including content and chunk bodies
+
+
 class SessionEvent:
     """Event data structure for session notifications"""
     def __init__(self, event_type: SessionEventType, session_id: str, data: Dict[str, Any]):
@@ -151,8 +158,8 @@ class ISessionRepository(ABC):
         pass
     
     @abstractmethod
-    async def get_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve session by ID"""
+    async def get_by_id(self, session_id: str, view: SessionView = SessionView.FULL) -> Optional[Dict[str, Any]]:
+        """Retrieve session by ID, loading at least the fields of the view"""
         pass
     
     @abstractmethod
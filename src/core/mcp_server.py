@@ -18,7 +18,9 @@ from src.core.constants import Defaults, Messages, ToolDescriptions, ContentType
 from src.core.content_formatter import ContentFormatter
 from src.core.content_parser import ChatContentParser
 from src.models.models import ChatContent, CourseStructure
+from src.clients.capability_store import get_shared_capability_store
 from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+from src.clients.resilience import call_deadline, tool_call_deadline
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -60,7 +62,8 @@ class MoodleMCPServer:
         if self.config.moodle_url and self.config.moodle_token:
             try:
                 self.moodle_client = EnhancedMoodleClient(
-                    base_url=self.config.moodle_url, token=self.config.moodle_token
+                    base_url=self.config.moodle_url, token=self.config.moodle_token,
+                    capability_store=get_shared_capability_store()
                 )
                 logger.info("Enhanced Moodle client initialized with plugin support")
             except Exception as e:
@@ -315,20 +318,21 @@ class MoodleMCPServer:
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Handle tool calls"""
-            try:
-                if name == "create_course_from_chat":
-                    return await self._create_course_from_chat(arguments)
-                elif name == "extract_and_preview_content":
-                    return await self._extract_and_preview_content(arguments)
-                elif name == "add_content_to_existing_course":
-                    return await self._add_content_to_existing_course(arguments)
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
-            except Exception as e:
-                logger.error(f"Tool execution failed: {e}")
-                return [
-                    types.TextContent(type="text", text=f"Error executing tool '{name}': {str(e)}")
-                ]
+            with call_deadline(tool_call_deadline()):
+                try:
+                    if name == "create_course_from_chat":
+                        return await self._create_course_from_chat(arguments)
+                    elif name == "extract_and_preview_content":
+                        return await self._extract_and_preview_content(arguments)
+                    elif name == "add_content_to_existing_course":
+                        return await self._add_content_to_existing_course(arguments)
+                    else:
+                        raise ValueError(f"Unknown tool: {name}")
+                except Exception as e:
+                    logger.error(f"Tool execution failed: {e}")
+                    return [
+                        types.TextContent(type="text", text=f"Error executing tool '{name}': {str(e)}")
+                    ]
 
     async def _create_course_from_chat(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Create a new Moodle course from chat content"""
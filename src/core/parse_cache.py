@@ -0,0 +1,263 @@
+"""
+Content-addressed cache for parsed chat content
+Keeps ChatContent results keyed by the transcript's MD5 hash so repeated,
+retried and continued sessions never reparse identical content
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.content_parser import ChatContentParser
+from src.models.models import ChatContent, ContentItem
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    """Return the content hash used for sessions and the parse cache"""
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of ChatContent results with an optional on-disk tier
+
+    The memory tier is bounded by entry count and by the total character
+    size of cached items. When ``disk_dir`` is set, every parsed result is
+    also written there as JSON and memory misses fall back to it; the
+    directory is kept under ``disk_max_bytes`` by removing the least recently
+    used files. Cached ChatContent items are shared between callers and must
+    be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        max_chars: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        Initialize parse cache
+
+        Args:
+            max_entries: Maximum number of parse results kept in memory
+            max_chars: Maximum total item characters kept in memory
+            disk_dir: Optional directory for the persistent tier
+            disk_max_bytes: Maximum total size of the persistent tier's files
+        """
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries: "OrderedDict[str, Tuple[ChatContent, int]]" = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[ChatContent]:
+        """Return the cached parse result for a content hash, if any"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._view(entry[0])
+
+        parsed = self._load_from_disk(key)
+        with self._lock:
+            if parsed is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._store(key, parsed)
+        return self._view(parsed)
+
+    def put(self, key: str, parsed: ChatContent) -> None:
+        """Cache a parse result under a content hash"""
+        with self._lock:
+            self._store(key, parsed)
+        self._save_to_disk(key, parsed)
+
+    def get_or_parse(
+        self, parser: ChatContentParser, content: str, key: Optional[str] = None
+    ) -> ChatContent:
+        """
+        Return the parse result for content, parsing only on a cache miss
+
+        Args:
+            parser: Parser used on a miss
+            content: Raw chat content
+            key: Precomputed content hash, computed from content if omitted
+
+        Returns:
+            ChatContent for the given content
+        """
+        key = key or content_hash(content)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        parsed = parser.parse_chat(content)
+        self.put(key, parsed)
+        return self._view(parsed)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a content hash from both tiers"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_chars -= entry[1]
+
+        path = self._disk_path(key)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+            self._total_chars = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "total_chars": self._total_chars,
+                "max_entries": self.max_entries,
+                "max_chars": self.max_chars,
+                "disk_enabled": bool(self.disk_dir),
+                "disk_max_bytes": self.disk_max_bytes,
+            }
+
+    def _store(self, key: str, parsed: ChatContent) -> None:
+        """Insert into the memory tier and evict down to the bounds (lock held)"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._total_chars -= previous[1]
+
+        size = sum(item.char_count for item in parsed.items)
+        if size > self.max_chars:
+            return
+
+        self._entries[key] = (parsed, size)
+        self._total_chars += size
+
+        while len(self._entries) > self.max_entries or self._total_chars > self.max_chars:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._total_chars -= evicted_size
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _view(parsed: ChatContent) -> ChatContent:
+        """Wrap cached items in a fresh ChatContent so metadata stays private"""
+        return ChatContent(items=list(parsed.items))
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_from_disk(self, key: str) -> Optional[ChatContent]:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            parsed = ChatContent(items=[ContentItem(**item) for item in data["items"]])
+            # Mark the entry recently used so pruning removes it last
+            os.utime(path)
+            return parsed
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parse cache entry {key}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, parsed: ChatContent) -> None:
+        path = self._disk_path(key)
+        if not path:
+            return
+
+        data = {
+            "items": [
+                {
+                    "type": item.type,
+                    "title": item.title,
+                    "content": item.content,
+                    "description": item.description,
+                    "language": item.language,
+                    "topic": item.topic,
+                    "metadata": item.metadata,
+                }
+                for item in parsed.items
+            ]
+        }
+        try:
+            # Write to a temporary file first so readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Failed to persist parse cache entry {key}: {e}")
+            return
+
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove the least recently used entry files until the tier fits disk_max_bytes"""
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                files = [
+                    (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                    for entry in entries if entry.name.endswith(".json") and entry.is_file()
+                ]
+        except OSError as e:
+            logger.warning(f"Failed to scan parse cache directory {self.disk_dir}: {e}")
+            return
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self._stats["disk_evictions"] += 1
+
+
+_shared_cache: Optional[ParseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_parse_cache() -> ParseCache:
+    """
+    Get the process-wide parse cache
+
+    The disk tier is enabled when MOODLE_CLAUDE_PARSE_CACHE_DIR is set.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ParseCache(disk_dir=os.getenv("MOODLE_CLAUDE_PARSE_CACHE_DIR"))
+        return _shared_cache
@@ -0,0 +1,211 @@
+"""
+Token-bucket rate limiting for Moodle web service calls
+Shares one site-wide budget plus per-wsfunction budgets across all clients
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.constants import Environment, RateLimits
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at ``rate`` tokens per second
+
+    Callers reserve tokens up front and sleep only for their own deficit, so
+    concurrent callers are spaced out fairly instead of racing on a shared
+    timestamp. Reservations are guarded by a thread lock, which keeps a bucket
+    usable from several event loops in the same process.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Sustained tokens per second
+            capacity: Burst capacity; the bucket starts full
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, going into debt if needed
+
+        Returns:
+            Seconds the caller must wait before the reservation is honoured
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens from a reservation that was abandoned"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def record_wait(self, wait: float) -> None:
+        """Record the wait time of an honoured reservation"""
+        with self._lock:
+            self._stats["acquired"] += 1
+            if wait > 0:
+                self._stats["throttled"] += 1
+                self._stats["total_wait"] += wait
+                self._stats["max_wait"] = max(self._stats["max_wait"], wait)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until tokens are available
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(tokens)
+                raise
+        self.record_wait(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket configuration and wait-time metrics"""
+        with self._lock:
+            acquired = self._stats["acquired"]
+            return {
+                **self._stats,
+                "average_wait": self._stats["total_wait"] / acquired if acquired else 0.0,
+                "rate": self.rate,
+                "capacity": self.capacity,
+            }
+
+
+class RateLimiter:
+    """
+    Site-wide token bucket combined with optional per-wsfunction buckets
+
+    Every call draws from the site bucket; functions with their own budget
+    also draw from theirs, and the caller waits for whichever is further in
+    debt. Any object with an async ``acquire(function)`` method can be
+    injected into the clients in place of this class.
+    """
+
+    def __init__(
+        self,
+        rate: float = RateLimits.REQUESTS_PER_SECOND,
+        burst: float = RateLimits.BURST,
+        function_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Site-wide sustained requests per second
+            burst: Site-wide burst capacity
+            function_limits: Optional {wsfunction: (rate, burst)} budgets
+        """
+        self.site_bucket = TokenBucket(rate, burst)
+        self.function_buckets: Dict[str, TokenBucket] = {}
+        for function, (function_rate, function_burst) in (function_limits or {}).items():
+            self.set_limit(function, function_rate, function_burst)
+
+    def set_limit(self, function: str, rate: float, burst: float) -> None:
+        """Set or replace the budget of a single wsfunction"""
+        self.function_buckets[function] = TokenBucket(rate, burst)
+
+    def _buckets_for(self, function: str):
+        buckets = [self.site_bucket]
+        function_bucket = self.function_buckets.get(function)
+        if function_bucket is not None:
+            buckets.append(function_bucket)
+        return buckets
+
+    async def acquire(self, function: str) -> float:
+        """
+        Wait until a call to ``function`` fits within the budgets
+
+        Returns:
+            Seconds spent waiting
+        """
+        buckets = self._buckets_for(function)
+        wait = max(bucket.reserve() for bucket in buckets)
+        if wait > 0:
+            logger.debug(f"Throttling {function} for {wait:.3f}s")
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                for bucket in buckets:
+                    bucket.refund()
+                raise
+
+        for bucket in buckets:
+            bucket.record_wait(wait)
+        return wait
+
+    def acquire_blocking(self, function: str) -> float:
+        """
+        Blocking variant of acquire() for synchronous clients
+
+        Returns:
+            Seconds spent waiting
+        """
+        buckets = self._buckets_for(function)
+        wait = max(bucket.reserve() for bucket in buckets)
+        if wait > 0:
+            time.sleep(wait)
+        for bucket in buckets:
+            bucket.record_wait(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get wait-time metrics for the site and per-function budgets"""
+        return {
+            "site": self.site_bucket.get_stats(),
+            "functions": {
+                function: bucket.get_stats() for function, bucket in self.function_buckets.items()
+            },
+        }
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter used by all Moodle clients
+
+    The site budget can be tuned with MOODLE_CLAUDE_RATE_LIMIT (requests per
+    second) and MOODLE_CLAUDE_RATE_BURST.
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                rate=float(os.getenv(Environment.RATE_LIMIT, RateLimits.REQUESTS_PER_SECOND)),
+                burst=float(os.getenv(Environment.RATE_BURST, RateLimits.BURST)),
+                function_limits=RateLimits.FUNCTION_LIMITS,
+            )
+        return _shared_limiter
@@ -25,6 +25,7 @@ from src.core.interfaces import (
     ICourseCreationService, IAnalyticsService, IEventPublisher, ISessionRepository
 )
 from src.core.event_system import MetricsObserver
+from src.clients.resilience import call_deadline, tool_call_deadline
 
 # Configure logging
 logging.basicConfig(
@@ -211,35 +212,36 @@ class RefactoredMoodleMCPServer:
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Handle tool calls using service-oriented architecture"""
-            try:
-                logger.info(f"Executing refactored tool: {name}")
+            with call_deadline(tool_call_deadline()):
+                try:
+                    logger.info(f"Executing refactored tool: {name}")
                 
-                if name == "create_intelligent_course":
-                    return await self._create_intelligent_course(arguments)
-                elif name == "continue_course_session":
-                    return await self._continue_course_session(arguments)
-                elif name == "validate_course":
-                    return await self._validate_course(arguments)
-                elif name == "get_session_status":
-                    return await self._get_session_status(arguments)
-                elif name == "get_processing_analytics":
-                    return await self._get_processing_analytics(arguments)
-                elif name == "get_system_health":
-                    return await self._get_system_health(arguments)
-                else:
-                    return await self._handle_unknown_tool(name)
+                    if name == "create_intelligent_course":
+                        return await self._create_intelligent_course(arguments)
+                    elif name == "continue_course_session":
+                        return await self._continue_course_session(arguments)
+                    elif name == "validate_course":
+                        return await self._validate_course(arguments)
+                    elif name == "get_session_status":
+                        return await self._get_session_status(arguments)
+                    elif name == "get_processing_analytics":
+                        return await self._get_processing_analytics(arguments)
+                    elif name == "get_system_health":
+                        return await self._get_system_health(arguments)
+                    else:
+                        return await self._handle_unknown_tool(name)
                     
-            except Exception as e:
-                logger.error(f"Tool execution failed for {name}: {e}")
-                logger.error(traceback.format_exc())
-                return [types.TextContent(
-                    type="text",
-                    text=f"❌ **Tool Execution Failed**\n\n"
-                         f"Tool: {name}\n"
-                         f"Error: {str(e)}\n\n"
-                         f"This error has been logged for investigation. "
-                         f"Please try again or contact support if the problem persists."
-                )]
+                except Exception as e:
+                    logger.error(f"Tool execution failed for {name}: {e}")
+                    logger.error(traceback.format_exc())
+                    return [types.TextContent(
+                        type="text",
+                        text=f"❌ **Tool Execution Failed**\n\n"
+                             f"Tool: {name}\n"
+                             f"Error: {str(e)}\n\n"
+                             f"This error has been logged for investigation. "
+                             f"Please try again or contact support if the problem persists."
+                    )]
     
     async def _create_intelligent_course(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Create course using service-oriented architecture"""
@@ -8,15 +8,19 @@ import asyncio
 import sqlite3
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Sequence, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from abc import ABC, abstractmethod
-import aiosqlite
 import os
+import time
+from collections import OrderedDict
 from threading import Lock
 
-from .interfaces import ISessionRepository
+from .interfaces import ISessionRepository, SessionView
+from .constants import Defaults
 from .dependency_injection import service, ServiceLifetime
+from .sqlite_pool import SQLiteConnectionPool, get_shared_pool
+from .blob_store import BlobStore, chunk_ranges, create_reference_index, ensure_columns
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +30,88 @@ class RepositoryException(Exception):
     pass
 
 
+class LazyChunks(Sequence):
+    """
+    Chunks of a session whose bodies load on request
+    
+    The number of chunks is known up front; ``await load()`` reads every
+    body with one query off the event loop and keeps them. Indexing or
+    iterating before that raises instead of blocking on the database.
+    """
+    
+    def __init__(self, count: int, load: Callable[[], Awaitable[List[str]]]):
+        self._count = count
+        self._load = load
+        self._chunks: Optional[List[str]] = None
+    
+    @property
+    def loaded(self) -> bool:
+        return self._chunks is not None
+    
+    async def load(self) -> List[str]:
+        """Read the chunk bodies unless already loaded and return them"""
+        if self._chunks is None:
+            self._chunks = await self._load()
+        return self._chunks
+    
+    def _bodies(self) -> List[str]:
+        if self._chunks is None:
+            raise RuntimeError("Chunk bodies are not loaded; await load() first")
+        return self._chunks
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index):
+        return self._bodies()[index]
+    
+    def __iter__(self):
+        return iter(self._bodies())
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        if self._chunks is None:
+            return f"<LazyChunks: {self._count} chunks, not loaded>"
+        return repr(self._chunks)
+
+
 @service(ISessionRepository, ServiceLifetime.SINGLETON)
 class SQLiteSessionRepository(ISessionRepository):
     """
     SQLite implementation of session repository
     
     Features:
-    - Async operations with aiosqlite
+    - Pooled long-lived connections in WAL mode (see sqlite_pool)
     - JSON serialization for complex data
+    - Content stored once, compressed, in content_blobs (see blob_store)
     - Automatic table creation
-    - Connection pooling
-    - Transaction support
+    - One transaction per operation, run off the event loop
+    - Single-query reads with a projection per SessionView
     """
     
-    def __init__(self, db_path: str = "data/sessions.db"):
+    # Session row columns returned by every view
+    STATUS_COLUMNS = (
+        "session_id", "course_name", "state", "strategy", "progress_data", "course_id",
+        "error_count", "last_error", "created_at", "updated_at", "expires_at"
+    )
+    
+    def __init__(self, db_path: str = "data/sessions.db", pool: Optional[SQLiteConnectionPool] = None):
+        """
+        Initialize SQLite session repository
+        
+        Args:
+            db_path: SQLite database file
+            pool: Connection pool to use (the shared pool of db_path by default)
+        """
         self.db_path = db_path
         self._ensure_directory()
-        self._connection_lock = Lock()
+        self._pool = pool or get_shared_pool(db_path)
+        self._blobs = BlobStore()
+        self._init_lock = Lock()
         self._initialized = False
     
     def _ensure_directory(self) -> None:
@@ -57,66 +126,80 @@ class SQLiteSessionRepository(ISessionRepository):
             return
         
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Sessions table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        session_id TEXT PRIMARY KEY,
-                        content TEXT NOT NULL,
-                        course_name TEXT NOT NULL,
-                        state TEXT NOT NULL DEFAULT 'created',
-                        strategy TEXT NOT NULL DEFAULT 'single_pass',
-                        progress_data TEXT DEFAULT '{}',
-                        course_structure TEXT DEFAULT '{}',
-                        course_id INTEGER,
-                        error_count INTEGER DEFAULT 0,
-                        last_error TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        expires_at DATETIME
-                    )
-                """)
-                
-                # Session chunks table for large content
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS session_chunks (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        chunk_index INTEGER NOT NULL,
-                        chunk_content TEXT NOT NULL,
-                        processed BOOLEAN DEFAULT FALSE,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (session_id) REFERENCES sessions (session_id) ON DELETE CASCADE,
-                        UNIQUE(session_id, chunk_index)
-                    )
-                """)
-                
-                # Session metadata table for extended attributes
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS session_metadata (
-                        session_id TEXT NOT NULL,
-                        key TEXT NOT NULL,
-                        value TEXT NOT NULL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        PRIMARY KEY (session_id, key),
-                        FOREIGN KEY (session_id) REFERENCES sessions (session_id) ON DELETE CASCADE
-                    )
-                """)
-                
-                # Create indexes for performance
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_state ON sessions(state)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_session_chunks_session_id ON session_chunks(session_id)")
-                
-                await db.commit()
-                logger.debug(f"Session database initialized at {self.db_path}")
-                self._initialized = True
-        
+            await self._pool.run(self._create_schema)
         except Exception as e:
             logger.error(f"Failed to initialize session database: {e}")
             raise RepositoryException(f"Database initialization failed: {e}")
     
+    def _create_schema(self, db: sqlite3.Connection) -> None:
+        # Runs on a pool worker; concurrent first calls create the schema once
+        with self._init_lock:
+            if self._initialized:
+                return
+            
+            # Sessions table
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    course_name TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'created',
+                    strategy TEXT NOT NULL DEFAULT 'single_pass',
+                    progress_data TEXT DEFAULT '{}',
+                    course_structure TEXT DEFAULT '{}',
+                    course_id INTEGER,
+                    error_count INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    expires_at DATETIME
+                )
+            """)
+            
+            # Session chunks table for large content
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS session_chunks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    chunk_content TEXT NOT NULL,
+                    processed BOOLEAN DEFAULT FALSE,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (session_id) REFERENCES sessions (session_id) ON DELETE CASCADE,
+                    UNIQUE(session_id, chunk_index)
+                )
+            """)
+            
+            # Session metadata table for extended attributes
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS session_metadata (
+                    session_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, key),
+                    FOREIGN KEY (session_id) REFERENCES sessions (session_id) ON DELETE CASCADE
+                )
+            """)
+            
+            # Content lives in content_blobs; rows reference it by hash (and chunks by offsets)
+            self._blobs.create_schema(db)
+            ensure_columns(db, "sessions", {"content_ref": "TEXT"})
+            ensure_columns(db, "session_chunks", {
+                "content_ref": "TEXT", "start_offset": "INTEGER", "end_offset": "INTEGER"
+            })
+            create_reference_index(db, "sessions")
+            create_reference_index(db, "session_chunks")
+            
+            # Create indexes for performance
+            db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_state ON sessions(state)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_session_chunks_session_id ON session_chunks(session_id)")
+            
+            logger.debug(f"Session database initialized at {self.db_path}")
+            self._initialized = True
+    
     async def save(self, session_data: Dict[str, Any]) -> None:
         """Save session data to database"""
         await self._initialize_database()
@@ -125,138 +208,170 @@ class SQLiteSessionRepository(ISessionRepository):
         if not session_id:
             raise RepositoryException("Session ID is required")
         
+        # Calculate expiration time (default: 24 hours)
+        expires_at = datetime.now() + timedelta(hours=24)
+        if "expires_at" in session_data:
+            expires_at = session_data["expires_at"]
+        
+        content = session_data.get("content", "")
+        session_row = (
+            session_id,
+            session_data.get("course_name", ""),
+            session_data.get("state", "created"),
+            session_data.get("strategy", "single_pass"),
+            json.dumps(session_data.get("progress", {})),
+            json.dumps(session_data.get("course_structure", {})),
+            session_data.get("course_id"),
+            session_data.get("error_count", 0),
+            session_data.get("last_error"),
+            expires_at
+        )
+        chunks = session_data.get("chunks", [])
+        metadata = session_data.get("metadata", {})
+        
+        def write(db: sqlite3.Connection) -> None:
+            held = self._held_refs(db, session_id)
+            
+            # Upsert main session record; the inline content column stays empty
+            content_ref = self._blobs.put(db, content)
+            db.execute("""
+                INSERT OR REPLACE INTO sessions (
+                    session_id, content, content_ref, course_name, state, strategy, 
+                    progress_data, course_structure, course_id, error_count, 
+                    last_error, updated_at, expires_at
+                ) VALUES (?, '', ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
+            """, (session_row[0], content_ref) + session_row[1:])
+            
+            # Replace chunks if present; chunks cut from the content are offset ranges into its blob
+            if chunks:
+                db.execute("DELETE FROM session_chunks WHERE session_id = ?", (session_id,))
+                chunk_rows = []
+                for i, (chunk, span) in enumerate(chunk_ranges(content, chunks)):
+                    if span is None:
+                        chunk_rows.append((session_id, i, self._blobs.put(db, chunk), 0, len(chunk)))
+                    else:
+                        chunk_rows.append((session_id, i, content_ref) + span)
+                db.executemany("""
+                    INSERT INTO session_chunks (
+                        session_id, chunk_index, chunk_content, content_ref, start_offset, end_offset
+                    ) VALUES (?, ?, '', ?, ?, ?)
+                """, chunk_rows)
+            
+            # Replace metadata if present
+            if metadata:
+                db.execute("DELETE FROM session_metadata WHERE session_id = ?", (session_id,))
+                db.executemany("""
+                    INSERT INTO session_metadata (session_id, key, value)
+                    VALUES (?, ?, ?)
+                """, [(session_id, key, json.dumps(value)) for key, value in metadata.items()])
+            
+            # Drop the previous content and chunk blobs unless still referenced
+            self._blobs.delete_unreferenced(db, held)
+        
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Calculate expiration time (default: 24 hours)
-                expires_at = datetime.now() + timedelta(hours=24)
-                if "expires_at" in session_data:
-                    expires_at = session_data["expires_at"]
-                
-                # Upsert main session record
-                await db.execute("""
-                    INSERT OR REPLACE INTO sessions (
-                        session_id, content, course_name, state, strategy, 
-                        progress_data, course_structure, course_id, error_count, 
-                        last_error, updated_at, expires_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
-                """, (
-                    session_id,
-                    session_data.get("content", ""),
-                    session_data.get("course_name", ""),
-                    session_data.get("state", "created"),
-                    session_data.get("strategy", "single_pass"),
-                    json.dumps(session_data.get("progress", {})),
-                    json.dumps(session_data.get("course_structure", {})),
-                    session_data.get("course_id"),
-                    session_data.get("error_count", 0),
-                    session_data.get("last_error"),
-                    expires_at
-                ))
-                
-                # Save chunks if present
-                chunks = session_data.get("chunks", [])
-                if chunks:
-                    # Clear existing chunks
-                    await db.execute("DELETE FROM session_chunks WHERE session_id = ?", (session_id,))
-                    
-                    # Insert new chunks
-                    for i, chunk in enumerate(chunks):
-                        await db.execute("""
-                            INSERT INTO session_chunks (session_id, chunk_index, chunk_content)
-                            VALUES (?, ?, ?)
-                        """, (session_id, i, chunk))
-                
-                # Save metadata if present
-                metadata = session_data.get("metadata", {})
-                if metadata:
-                    # Clear existing metadata
-                    await db.execute("DELETE FROM session_metadata WHERE session_id = ?", (session_id,))
-                    
-                    # Insert new metadata
-                    for key, value in metadata.items():
-                        await db.execute("""
-                            INSERT INTO session_metadata (session_id, key, value)
-                            VALUES (?, ?, ?)
-                        """, (session_id, key, json.dumps(value)))
-                
-                await db.commit()
-                logger.debug(f"Session {session_id} saved successfully")
+            await self._pool.run(write)
+            logger.debug(f"Session {session_id} saved successfully")
         
         except Exception as e:
             logger.error(f"Failed to save session {session_id}: {e}")
             raise RepositoryException(f"Save operation failed: {e}")
     
-    async def get_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve session by ID"""
+    async def get_by_id(self, session_id: str, view: SessionView = SessionView.FULL) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve session by ID
+        
+        Every view is one primary key query. STATUS reads the session row
+        without content or course structure; the other views aggregate
+        metadata and chunk references into the same query. Chunk bodies are
+        sliced from the content blob, right away for FULL and on
+        ``await chunks.load()`` for LAZY_CHUNKS.
+        """
         await self._initialize_database()
         
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                
-                # Get main session data
-                cursor = await db.execute("""
-                    SELECT * FROM sessions WHERE session_id = ?
-                """, (session_id,))
-                
-                row = await cursor.fetchone()
+        def read(db: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            if view is SessionView.STATUS:
+                row = db.execute(
+                    f"SELECT {', '.join(self.STATUS_COLUMNS)} FROM sessions WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()
                 if not row:
                     return None
-                
-                # Convert to dict
                 session_data = dict(row)
-                
-                # Parse JSON fields
-                session_data["progress"] = json.loads(session_data.pop("progress_data", "{}"))
-                session_data["course_structure"] = json.loads(session_data.pop("course_structure", "{}"))
-                
-                # Get chunks
-                cursor = await db.execute("""
-                    SELECT chunk_index, chunk_content, processed
-                    FROM session_chunks 
-                    WHERE session_id = ? 
-                    ORDER BY chunk_index
-                """, (session_id,))
-                
-                chunks_data = await cursor.fetchall()
-                session_data["chunks"] = [row["chunk_content"] for row in chunks_data]
-                session_data["chunks_processed"] = [row["processed"] for row in chunks_data]
-                
-                # Get metadata
-                cursor = await db.execute("""
-                    SELECT key, value FROM session_metadata WHERE session_id = ?
-                """, (session_id,))
-                
-                metadata_rows = await cursor.fetchall()
-                metadata = {}
-                for row in metadata_rows:
-                    metadata[row["key"]] = json.loads(row["value"])
-                session_data["metadata"] = metadata
-                
+                session_data["progress"] = json.loads(session_data.pop("progress_data") or "{}")
                 return session_data
+            
+            row = db.execute(f"""
+                SELECT {', '.join(self.STATUS_COLUMNS)}, course_structure, content_ref,
+                    CASE WHEN content_ref IS NULL THEN content END AS content,
+                    (SELECT json_group_object(key, json(value))
+                     FROM session_metadata WHERE session_id = ?1) AS metadata,
+                    (SELECT json_group_array(json_array(
+                        chunk_content, content_ref, start_offset, end_offset, processed))
+                     FROM (SELECT * FROM session_chunks WHERE session_id = ?1 ORDER BY chunk_index)
+                    ) AS chunk_rows
+                FROM sessions WHERE session_id = ?1
+            """, (session_id,)).fetchone()
+            if not row:
+                return None
+            
+            session_data = dict(row)
+            content_ref = session_data.pop("content_ref")
+            session_data["progress"] = json.loads(session_data.pop("progress_data") or "{}")
+            session_data["course_structure"] = json.loads(session_data["course_structure"] or "{}")
+            session_data["metadata"] = json.loads(session_data["metadata"])
+            
+            chunk_rows = json.loads(session_data.pop("chunk_rows"))
+            session_data["chunks_processed"] = [chunk[4] for chunk in chunk_rows]
+            if view is SessionView.LAZY_CHUNKS:
+                del session_data["content"]
+                session_data["chunks"] = LazyChunks(
+                    len(chunk_rows), lambda: self._pool.run(lambda conn: self._chunk_bodies(conn, chunk_rows))
+                )
+            else:
+                if content_ref is not None:
+                    session_data["content"] = self._blobs.get(db, content_ref)
+                session_data["chunks"] = self._chunk_bodies(db, chunk_rows)
+            
+            return session_data
+        
+        try:
+            return await self._pool.run(read)
         
         except Exception as e:
             logger.error(f"Failed to retrieve session {session_id}: {e}")
             raise RepositoryException(f"Retrieval operation failed: {e}")
     
+    @staticmethod
+    def _held_refs(db: sqlite3.Connection, session_id: str) -> List[str]:
+        """Blob hashes referenced by a session's row and chunks"""
+        return [row[0] for row in db.execute("""
+            SELECT content_ref FROM sessions WHERE session_id = ?1
+            UNION SELECT content_ref FROM session_chunks WHERE session_id = ?1
+        """, (session_id,))]
+    
+    def _chunk_bodies(self, db: sqlite3.Connection, chunk_rows: List[list]) -> List[str]:
+        """Resolve (inline content, blob ref, start, end, processed) chunk rows to their text"""
+        return [
+            inline if content_ref is None else self._blobs.get_range(db, content_ref, start, end)
+            for inline, content_ref, start, end, _ in chunk_rows
+        ]
+    
     async def get_active_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all active (non-expired) sessions"""
         await self._initialize_database()
         
+        def read(db: sqlite3.Connection) -> List[Dict[str, Any]]:
+            rows = db.execute("""
+                SELECT session_id, course_name, state, created_at, updated_at, expires_at
+                FROM sessions 
+                WHERE expires_at > CURRENT_TIMESTAMP OR expires_at IS NULL
+                ORDER BY updated_at DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+            return [dict(row) for row in rows]
+        
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                
-                cursor = await db.execute("""
-                    SELECT session_id, course_name, state, created_at, updated_at, expires_at
-                    FROM sessions 
-                    WHERE expires_at > CURRENT_TIMESTAMP OR expires_at IS NULL
-                    ORDER BY updated_at DESC
-                    LIMIT ?
-                """, (limit,))
-                
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            return await self._pool.run(read)
         
         except Exception as e:
             logger.error(f"Failed to get active sessions: {e}")
@@ -266,17 +381,23 @@ class SQLiteSessionRepository(ISessionRepository):
         """Delete session and all related data"""
         await self._initialize_database()
         
+        def write(db: sqlite3.Connection) -> bool:
+            held = self._held_refs(db, session_id)
+            
+            # Foreign keys are not enforced on the connection, so related rows go explicitly
+            db.execute("DELETE FROM session_chunks WHERE session_id = ?", (session_id,))
+            db.execute("DELETE FROM session_metadata WHERE session_id = ?", (session_id,))
+            cursor = db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            # Blobs shared with other sessions stay
+            self._blobs.delete_unreferenced(db, held)
+            return cursor.rowcount > 0
+        
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Delete from main table (cascades to related tables)
-                cursor = await db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-                await db.commit()
-                
-                deleted = cursor.rowcount > 0
-                if deleted:
-                    logger.debug(f"Session {session_id} deleted successfully")
-                
-                return deleted
+            deleted = await self._pool.run(write)
+            if deleted:
+                logger.debug(f"Session {session_id} deleted successfully")
+            
+            return deleted
         
         except Exception as e:
             logger.error(f"Failed to delete session {session_id}: {e}")
@@ -286,51 +407,51 @@ class SQLiteSessionRepository(ISessionRepository):
         """Update session state and related data"""
         await self._initialize_database()
         
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Update main session state
-                cursor = await db.execute("""
+        def write(db: sqlite3.Connection) -> bool:
+            # Update main session state
+            cursor = db.execute("""
+                UPDATE sessions 
+                SET state = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
+            """, (state, session_id))
+            
+            # Update additional fields if provided
+            if "progress" in data:
+                db.execute("""
+                    UPDATE sessions 
+                    SET progress_data = ? 
+                    WHERE session_id = ?
+                """, (json.dumps(data["progress"]), session_id))
+            
+            if "course_structure" in data:
+                db.execute("""
+                    UPDATE sessions 
+                    SET course_structure = ? 
+                    WHERE session_id = ?
+                """, (json.dumps(data["course_structure"]), session_id))
+            
+            if "course_id" in data:
+                db.execute("""
+                    UPDATE sessions 
+                    SET course_id = ? 
+                    WHERE session_id = ?
+                """, (data["course_id"], session_id))
+            
+            if "error_count" in data:
+                db.execute("""
                     UPDATE sessions 
-                    SET state = ?, updated_at = CURRENT_TIMESTAMP
+                    SET error_count = ?, last_error = ? 
                     WHERE session_id = ?
-                """, (state, session_id))
-                
-                # Update additional fields if provided
-                if "progress" in data:
-                    await db.execute("""
-                        UPDATE sessions 
-                        SET progress_data = ? 
-                        WHERE session_id = ?
-                    """, (json.dumps(data["progress"]), session_id))
-                
-                if "course_structure" in data:
-                    await db.execute("""
-                        UPDATE sessions 
-                        SET course_structure = ? 
-                        WHERE session_id = ?
-                    """, (json.dumps(data["course_structure"]), session_id))
-                
-                if "course_id" in data:
-                    await db.execute("""
-                        UPDATE sessions 
-                        SET course_id = ? 
-                        WHERE session_id = ?
-                    """, (data["course_id"], session_id))
-                
-                if "error_count" in data:
-                    await db.execute("""
-                        UPDATE sessions 
-                        SET error_count = ?, last_error = ? 
-                        WHERE session_id = ?
-                    """, (data["error_count"], data.get("last_error"), session_id))
-                
-                await db.commit()
-                
-                updated = cursor.rowcount > 0
-                if updated:
-                    logger.debug(f"Session {session_id} state updated to {state}")
-                
-                return updated
+                """, (data["error_count"], data.get("last_error"), session_id))
+            
+            return cursor.rowcount > 0
+        
+        try:
+            updated = await self._pool.run(write)
+            if updated:
+                logger.debug(f"Session {session_id} state updated to {state}")
+            
+            return updated
         
         except Exception as e:
             logger.error(f"Failed to update session {session_id} state: {e}")
@@ -340,19 +461,23 @@ class SQLiteSessionRepository(ISessionRepository):
         """Remove expired sessions"""
         await self._initialize_database()
         
+        def write(db: sqlite3.Connection) -> int:
+            expired = "SELECT session_id FROM sessions WHERE expires_at < CURRENT_TIMESTAMP"
+            db.execute(f"DELETE FROM session_chunks WHERE session_id IN ({expired})")
+            db.execute(f"DELETE FROM session_metadata WHERE session_id IN ({expired})")
+            cursor = db.execute("""
+                DELETE FROM sessions 
+                WHERE expires_at < CURRENT_TIMESTAMP
+            """)
+            self._blobs.delete_unreferenced(db)
+            return cursor.rowcount
+        
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    DELETE FROM sessions 
-                    WHERE expires_at < CURRENT_TIMESTAMP
-                """)
-                await db.commit()
-                
-                deleted_count = cursor.rowcount
-                if deleted_count > 0:
-                    logger.info(f"Cleaned up {deleted_count} expired sessions")
-                
-                return deleted_count
+            deleted_count = await self._pool.run(write)
+            if deleted_count > 0:
+                logger.info(f"Cleaned up {deleted_count} expired sessions")
+            
+            return deleted_count
         
         except Exception as e:
             logger.error(f"Failed to cleanup expired sessions: {e}")
@@ -362,42 +487,41 @@ class SQLiteSessionRepository(ISessionRepository):
         """Get repository statistics"""
         await self._initialize_database()
         
+        def read(db: sqlite3.Connection) -> Dict[str, Any]:
+            # Total sessions
+            total_sessions = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            
+            # Active sessions
+            active_sessions = db.execute("""
+                SELECT COUNT(*) FROM sessions 
+                WHERE expires_at > CURRENT_TIMESTAMP OR expires_at IS NULL
+            """).fetchone()[0]
+            
+            # Sessions by state
+            states = {row[0]: row[1] for row in db.execute("""
+                SELECT state, COUNT(*) as count 
+                FROM sessions 
+                GROUP BY state
+            """)}
+            
+            # Recent activity (last 24 hours)
+            recent_activity = db.execute("""
+                SELECT COUNT(*) FROM sessions 
+                WHERE updated_at > datetime('now', '-1 day')
+            """).fetchone()[0]
+            
+            return {
+                "total_sessions": total_sessions,
+                "active_sessions": active_sessions,
+                "expired_sessions": total_sessions - active_sessions,
+                "sessions_by_state": states,
+                "recent_activity_24h": recent_activity,
+                "database_path": self.db_path,
+                "connection_pool": self._pool.get_stats()
+            }
+        
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Total sessions
-                cursor = await db.execute("SELECT COUNT(*) FROM sessions")
-                total_sessions = (await cursor.fetchone())[0]
-                
-                # Active sessions
-                cursor = await db.execute("""
-                    SELECT COUNT(*) FROM sessions 
-                    WHERE expires_at > CURRENT_TIMESTAMP OR expires_at IS NULL
-                """)
-                active_sessions = (await cursor.fetchone())[0]
-                
-                # Sessions by state
-                cursor = await db.execute("""
-                    SELECT state, COUNT(*) as count 
-                    FROM sessions 
-                    GROUP BY state
-                """)
-                states = {row[0]: row[1] for row in await cursor.fetchall()}
-                
-                # Recent activity (last 24 hours)
-                cursor = await db.execute("""
-                    SELECT COUNT(*) FROM sessions 
-                    WHERE updated_at > datetime('now', '-1 day')
-                """)
-                recent_activity = (await cursor.fetchone())[0]
-                
-                return {
-                    "total_sessions": total_sessions,
-                    "active_sessions": active_sessions,
-                    "expired_sessions": total_sessions - active_sessions,
-                    "sessions_by_state": states,
-                    "recent_activity_24h": recent_activity,
-                    "database_path": self.db_path
-                }
+            return await self._pool.run(read)
         
         except Exception as e:
             logger.error(f"Failed to get repository statistics: {e}")
@@ -425,8 +549,8 @@ class InMemorySessionRepository(ISessionRepository):
         
         logger.debug(f"Session {session_id} saved to memory")
     
-    async def get_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve session from memory"""
+    async def get_by_id(self, session_id: str, view: SessionView = SessionView.FULL) -> Optional[Dict[str, Any]]:
+        """Retrieve session from memory (every view returns all fields)"""
         with self._lock:
             session_data = self._sessions.get(session_id)
             if session_data:
@@ -490,17 +614,121 @@ class InMemorySessionRepository(ISessionRepository):
             }
 
 
+def _blocked(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable; copy it to make changes")
+
+
+class FrozenDict(dict):
+    """Read-only dict handed out as a cached session snapshot; ``copy()`` returns a mutable dict"""
+    
+    __setitem__ = __delitem__ = __ior__ = _blocked
+    clear = pop = popitem = setdefault = update = _blocked
+    
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list inside a cached session snapshot; ``copy()`` returns a mutable list"""
+    
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _blocked
+    append = extend = insert = pop = remove = clear = sort = reverse = _blocked
+    
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def _freeze(value: Any) -> Tuple[Any, int]:
+    """Make an immutable copy of session data and estimate its size in bytes"""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        # Parts of an existing snapshot are shared, not copied
+        return value, _estimate_size(value)
+    if isinstance(value, dict):
+        items, size = {}, 64
+        for key, item in value.items():
+            items[key], item_size = _freeze(item)
+            size += len(key) + item_size if isinstance(key, str) else 8 + item_size
+        return FrozenDict(items), size
+    if isinstance(value, (list, tuple)):
+        frozen = [_freeze(item) for item in value]
+        return FrozenList(item for item, _ in frozen), 56 + sum(size for _, size in frozen)
+    if isinstance(value, (str, bytes)):
+        return value, 49 + len(value)
+    return value, 16
+
+
+def _estimate_size(value: Any) -> int:
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_size(key) + _estimate_size(item) for key, item in value.items())
+    if isinstance(value, list):
+        return 56 + sum(_estimate_size(item) for item in value)
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    return 16
+
+
+def _utc_timestamp() -> str:
+    """Current time formatted like SQLite's CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _is_expired(expires_at: Any, now: datetime) -> bool:
+    if isinstance(expires_at, str):
+        try:
+            expires_at = datetime.fromisoformat(expires_at)
+        except ValueError:
+            return False
+    return isinstance(expires_at, datetime) and expires_at.replace(tzinfo=None) < now
+
+
 class CachedSessionRepository(ISessionRepository):
     """
     Cached repository implementation with write-through caching
+    
+    Full sessions are kept in an LRU bounded by entry count and estimated
+    bytes, and handed out as immutable snapshots (FrozenDict/FrozenList)
+    instead of copies. Active sessions are listed from an index loaded
+    from the primary repository and kept current by writes through this
+    cache. Meant for use from one event loop; nothing here blocks.
     """
     
-    def __init__(self, primary_repo: ISessionRepository, cache_size: int = 100):
+    # Session fields listed by get_active_sessions
+    INDEX_FIELDS = ("session_id", "course_name", "state", "created_at", "updated_at", "expires_at")
+    
+    def __init__(
+        self,
+        primary_repo: ISessionRepository,
+        cache_size: int = 100,
+        max_bytes: int = Defaults.SESSION_CACHE_MAX_BYTES,
+        index_ttl: float = Defaults.SESSION_INDEX_TTL,
+        index_size: int = Defaults.SESSION_INDEX_SIZE,
+    ):
+        """
+        Initialize cached repository
+        
+        Args:
+            primary_repo: Repository the cache writes through to
+            cache_size: Maximum number of cached sessions
+            max_bytes: Maximum estimated size of the cached sessions
+            index_ttl: Seconds before the active session index is reloaded
+            index_size: Sessions loaded into the active session index
+        """
         self.primary_repo = primary_repo
-        self.cache: Dict[str, Dict[str, Any]] = {}
         self.cache_size = cache_size
-        self._lock = Lock()
-        self._access_order: List[str] = []  # LRU tracking
+        self.max_bytes = max_bytes
+        self.index_ttl = index_ttl
+        self.index_size = index_size
+        
+        self.cache: "OrderedDict[str, FrozenDict]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        # Bumped by every write, so reads that raced a write are not cached
+        self._generation = 0
+        
+        self._index: Optional[Dict[str, FrozenDict]] = None
+        self._index_complete = False
+        self._index_expires = 0.0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "index_hits": 0, "index_loads": 0}
     
     async def save(self, session_data: Dict[str, Any]) -> None:
         """Save to both cache and primary repository"""
@@ -510,46 +738,71 @@ class CachedSessionRepository(ISessionRepository):
         
         # Save to primary repository first
         await self.primary_repo.save(session_data)
+        self._generation += 1
         
-        # Update cache
-        with self._lock:
-            self.cache[session_id] = json.loads(json.dumps(session_data, default=str))
-            self._update_access_order(session_id)
-            self._evict_if_needed()
+        self._store(session_id, session_data)
+        if self._index is not None:
+            entry = self._index.get(session_id)
+            if entry is None:
+                # Creation time and expiry are set by the primary repository
+                self._index = None
+            else:
+                self._index_update(session_id, entry, {
+                    key: session_data[key] for key in ("course_name", "state", "expires_at") if key in session_data
+                })
     
-    async def get_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id(self, session_id: str, view: SessionView = SessionView.FULL) -> Optional[Dict[str, Any]]:
         """Get from cache first, then primary repository"""
-        with self._lock:
-            if session_id in self.cache:
-                self._update_access_order(session_id)
-                return json.loads(json.dumps(self.cache[session_id]))
+        snapshot = self.cache.get(session_id)
+        if snapshot is not None:
+            # A cached full session serves every view
+            self.cache.move_to_end(session_id)
+            self._stats["hits"] += 1
+            return snapshot
+        self._stats["misses"] += 1
         
-        # Not in cache, get from primary repository
-        session_data = await self.primary_repo.get_by_id(session_id)
+        # Not in cache, get from primary repository; only full sessions are cached
+        generation = self._generation
+        session_data = await self.primary_repo.get_by_id(session_id, view)
         
-        if session_data:
-            with self._lock:
-                self.cache[session_id] = json.loads(json.dumps(session_data, default=str))
-                self._update_access_order(session_id)
-                self._evict_if_needed()
+        if session_data and view is SessionView.FULL and generation == self._generation:
+            return self._store(session_id, session_data)
         
         return session_data
     
     async def get_active_sessions(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get from primary repository (bypass cache for list operations)"""
-        return await self.primary_repo.get_active_sessions(limit)
+        """Get active sessions from the index, loading it from the primary repository when stale"""
+        if self._index is None or time.monotonic() >= self._index_expires:
+            generation = self._generation
+            sessions = await self.primary_repo.get_active_sessions(max(limit, self.index_size))
+            if generation != self._generation:
+                return sessions[:limit]
+            self._index = {session["session_id"]: _freeze(
+                {key: session.get(key) for key in self.INDEX_FIELDS}
+            )[0] for session in sessions}
+            self._index_complete = len(sessions) < max(limit, self.index_size)
+            self._index_expires = time.monotonic() + self.index_ttl
+            self._stats["index_loads"] += 1
+        elif not self._index_complete and limit > len(self._index):
+            return await self.primary_repo.get_active_sessions(limit)
+        else:
+            self._stats["index_hits"] += 1
+        
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        active = [entry for entry in self._index.values() if not _is_expired(entry.get("expires_at"), now)]
+        active.sort(key=lambda entry: str(entry.get("updated_at") or ""), reverse=True)
+        return active[:limit]
     
     async def delete(self, session_id: str) -> bool:
         """Delete from both cache and primary repository"""
         # Delete from primary repository
         deleted = await self.primary_repo.delete(session_id)
+        self._generation += 1
         
-        # Remove from cache
-        with self._lock:
-            if session_id in self.cache:
-                del self.cache[session_id]
-                if session_id in self._access_order:
-                    self._access_order.remove(session_id)
+        # Remove from cache and index
+        self._discard(session_id)
+        if self._index is not None:
+            self._index.pop(session_id, None)
         
         return deleted
     
@@ -557,38 +810,52 @@ class CachedSessionRepository(ISessionRepository):
         """Update in both cache and primary repository"""
         # Update primary repository
         updated = await self.primary_repo.update_session_state(session_id, state, data)
+        self._generation += 1
         
-        # Update cache if present
-        with self._lock:
-            if session_id in self.cache:
-                self.cache[session_id]["state"] = state
-                for key, value in data.items():
-                    self.cache[session_id][key] = value
-                self._update_access_order(session_id)
+        # Replace the cached snapshot with an updated copy if present
+        snapshot = self.cache.get(session_id)
+        if snapshot is not None:
+            self._store(session_id, {**snapshot, **data, "state": state})
+        if self._index is not None and session_id in self._index:
+            self._index_update(session_id, self._index[session_id], {"state": state})
         
         return updated
     
-    def _update_access_order(self, session_id: str) -> None:
-        """Update LRU access order"""
-        if session_id in self._access_order:
-            self._access_order.remove(session_id)
-        self._access_order.append(session_id)
+    def _store(self, session_id: str, session_data: Dict[str, Any]) -> FrozenDict:
+        """Cache a snapshot of a session as most recently used, evicting beyond the budgets"""
+        snapshot, size = _freeze(session_data)
+        self._discard(session_id)
+        self.cache[session_id] = snapshot
+        self._sizes[session_id] = size
+        self._bytes += size
+        
+        # The newest entry stays even if it alone exceeds the byte budget
+        while len(self.cache) > 1 and (len(self.cache) > self.cache_size or self._bytes > self.max_bytes):
+            evicted, _ = self.cache.popitem(last=False)
+            self._bytes -= self._sizes.pop(evicted)
+            self._stats["evictions"] += 1
+        return snapshot
+    
+    def _discard(self, session_id: str) -> None:
+        if self.cache.pop(session_id, None) is not None:
+            self._bytes -= self._sizes.pop(session_id)
     
-    def _evict_if_needed(self) -> None:
-        """Evict least recently used items if cache is full"""
-        while len(self.cache) > self.cache_size:
-            if self._access_order:
-                lru_session = self._access_order.pop(0)
-                self.cache.pop(lru_session, None)
+    def _index_update(self, session_id: str, entry: FrozenDict, changes: Dict[str, Any]) -> None:
+        self._index[session_id] = _freeze({**entry, **changes, "updated_at": _utc_timestamp()})[0]
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._lock:
-            return {
-                "cache_size": len(self.cache),
-                "max_cache_size": self.cache_size,
-                "cache_utilization": len(self.cache) / self.cache_size * 100
-            }
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "cache_size": len(self.cache),
+            "max_cache_size": self.cache_size,
+            "cache_utilization": len(self.cache) / self.cache_size * 100,
+            "cache_bytes": self._bytes,
+            "max_cache_bytes": self.max_bytes,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "indexed_sessions": len(self._index) if self._index is not None else 0,
+            **self._stats
+        }
     
     async def get_session_statistics(self) -> Dict[str, Any]:
         """Get session statistics (delegate to primary repository)"""
@@ -19,6 +19,7 @@ from .repositories import SQLiteSessionRepository, InMemorySessionRepository, Ca
 from .services import CourseCreationService, AnalyticsService, SessionCoordinatorService
 
 # Import existing implementations (these would need to be adapted to interfaces)
+from ..clients.capability_store import CapabilityStore, capabilities_path
 from ..clients.moodle_client_enhanced import EnhancedMoodleClient
 from .adaptive_content_processor import AdaptiveContentProcessor
 from config.dual_token_config import DualTokenConfig
@@ -112,7 +113,9 @@ def configure_services(container: ServiceContainer, config_options: Dict[str, An
         moodle_client = EnhancedMoodleClient(
             base_url=dual_config.moodle_url,
             basic_token=dual_config.get_basic_token(),
-            plugin_token=dual_config.get_plugin_token() if dual_config.is_dual_token_mode() else None
+            plugin_token=dual_config.get_plugin_token() if dual_config.is_dual_token_mode() else None,
+            # Persist the plugin probe next to the session database
+            capability_store=CapabilityStore(capabilities_path(db_path))
         )
         # Register under the interface for dependency injection
         container.register_instance(IMoodleClient, moodle_client)
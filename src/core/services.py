@@ -12,13 +12,16 @@ import uuid
 
 from .interfaces import (
     ICourseCreationService, IAnalyticsService, IMoodleClient, IContentProcessor,
-    ISessionRepository, IEventPublisher, SessionEventType
+    ISessionRepository, IEventPublisher, SessionEventType, SessionView
 )
 from .dependency_injection import service, ServiceLifetime
 from .command_system import (
     CommandExecutor, CreateCourseCommand, CreateCourseStructureCommand,
     ProcessContentCommand, ValidateCourseCommand, CommandContext
 )
+from .rate_limiter import get_shared_rate_limiter
+from src.clients.metadata_cache import get_shared_metadata_cache
+from src.clients.resilience import get_shared_breakers
 from .event_system import (
     publish_session_created, publish_processing_started, publish_course_created,
     publish_session_completed, publish_session_failed
@@ -180,7 +183,7 @@ class CourseCreationService(ICourseCreationService):
     async def continue_course_creation(self, session_id: str, additional_content: str = "") -> Dict[str, Any]:
         """Continue an existing course creation session"""
         try:
-            session_data = await self.session_repository.get_by_id(session_id)
+            session_data = await self.session_repository.get_by_id(session_id, SessionView.STATUS)
             if not session_data:
                 return {
                     "success": False,
@@ -213,7 +216,7 @@ class CourseCreationService(ICourseCreationService):
     async def validate_course(self, session_id: str, course_id: Optional[int] = None) -> Dict[str, Any]:
         """Validate created course"""
         try:
-            session_data = await self.session_repository.get_by_id(session_id)
+            session_data = await self.session_repository.get_by_id(session_id, SessionView.LAZY_CHUNKS)
             if not session_data:
                 return {
                     "success": False,
@@ -253,7 +256,7 @@ class CourseCreationService(ICourseCreationService):
     async def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Get detailed session status"""
         try:
-            session_data = await self.session_repository.get_by_id(session_id)
+            session_data = await self.session_repository.get_by_id(session_id, SessionView.STATUS)
             if not session_data:
                 return {
                     "success": False,
@@ -287,7 +290,7 @@ class CourseCreationService(ICourseCreationService):
     async def _build_course_structure_data(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
         """Build course structure data from session"""
         try:
-            session_data = await self.session_repository.get_by_id(session_id)
+            session_data = await self.session_repository.get_by_id(session_id, SessionView.STATUS)
             if not session_data:
                 return None
             
@@ -352,11 +355,10 @@ class AnalyticsService(IAnalyticsService):
     async def record_session_metrics(self, session_id: str, metrics: Dict[str, Any]) -> None:
         """Record session performance metrics"""
         try:
-            session_data = await self.session_repository.get_by_id(session_id)
+            session_data = await self.session_repository.get_by_id(session_id, SessionView.STATUS)
             if session_data:
                 # Update session with metrics
-                current_metrics = session_data.get("metrics", {})
-                current_metrics.update(metrics)
+                current_metrics = {**session_data.get("metrics", {}), **metrics}
                 
                 await self.session_repository.update_session_state(
                     session_id, session_data["state"],
@@ -415,10 +417,13 @@ class AnalyticsService(IAnalyticsService):
             active_sessions = repo_stats.get("active_sessions", 0)
             error_rate = self._calculate_error_rate(repo_stats.get("sessions_by_state", {}))
             
+            circuit_breakers = get_shared_breakers().get_stats()
+            open_circuits = [name for name, stats in circuit_breakers.items() if stats["state"] != "closed"]
+            
             health_status = "healthy"
             if error_rate > 0.3:  # More than 30% errors
                 health_status = "unhealthy"
-            elif error_rate > 0.1:  # More than 10% errors
+            elif error_rate > 0.1 or open_circuits:  # More than 10% errors or Moodle failing
                 health_status = "degraded"
             
             return {
@@ -426,6 +431,10 @@ class AnalyticsService(IAnalyticsService):
                 "active_sessions": active_sessions,
                 "error_rate": error_rate,
                 "database_accessible": True,  # If we got stats, DB is accessible
+                "rate_limits": get_shared_rate_limiter().get_stats(),
+                "metadata_cache": get_shared_metadata_cache().get_stats(),
+                "circuit_breakers": circuit_breakers,
+                "open_circuits": open_circuits,
                 "timestamp": datetime.now().isoformat(),
                 "details": repo_stats
             }
@@ -0,0 +1,147 @@
+"""
+Long-lived SQLite connections for the session repositories
+Each worker thread keeps one connection open in WAL mode, so a repository
+operation costs one hop off the event loop instead of a fresh connection
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, TypeVar
+
+from src.core.constants import Defaults
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Applied to every pooled connection; journal_mode is persistent in the file
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    # WAL keeps NORMAL safe from corruption; only the last commits can be lost on power failure
+    ("synchronous", "NORMAL"),
+    ("cache_size", f"-{Defaults.DB_CACHE_SIZE_KB}"),
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", str(Defaults.DB_BUSY_TIMEOUT_MS)),
+)
+
+
+class SQLiteConnectionPool:
+    """
+    Pool of SQLite connections, one per worker thread
+
+    ``run(fn)`` executes ``fn(connection)`` on a worker as one transaction:
+    it commits when fn returns and rolls back when it raises. Connections
+    are opened lazily, live as long as the pool and keep their prepared
+    statements cached, so repeated SQL is parsed once per connection.
+    Unlike asyncio primitives the pool is not bound to an event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = Defaults.DB_POOL_SIZE,
+        statement_cache: int = Defaults.DB_STATEMENT_CACHE,
+    ):
+        """
+        Initialize connection pool
+
+        Args:
+            db_path: SQLite database file
+            size: Maximum number of connections (and worker threads)
+            statement_cache: Prepared statements kept per connection
+        """
+        self.db_path = db_path
+        self.size = size
+        self.statement_cache = statement_cache
+
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite-pool")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"operations": 0, "rollbacks": 0}
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn with a pooled connection in a worker thread, as one transaction"""
+        if self._closed:
+            raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._transaction, fn)
+
+    def run_sync(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run fn as one transaction on the calling thread
+
+        For threads that own their SQLite work, such as a write-behind
+        flusher; the thread gets its own long-lived connection.
+        """
+        if self._closed:
+            raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+        return self._transaction(fn)
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._connection()
+        try:
+            result = fn(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            with self._lock:
+                self._stats["rollbacks"] += 1
+            raise
+        with self._lock:
+            self._stats["operations"] += 1
+        return result
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the calling worker thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only its worker uses it; close() may run on another thread once workers stopped
+            conn = sqlite3.connect(
+                self.db_path, cached_statements=self.statement_cache, check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            for name, value in PRAGMAS:
+                conn.execute(f"PRAGMA {name} = {value}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+            logger.debug(f"Opened pooled SQLite connection to {self.db_path}")
+        return conn
+
+    def close(self) -> None:
+        """Wait for running operations, then close every connection"""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics"""
+        with self._lock:
+            return {**self._stats, "connections": len(self._connections), "size": self.size}
+
+
+_shared_pools: Dict[str, SQLiteConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(db_path: str) -> SQLiteConnectionPool:
+    """Get the process-wide connection pool of a database file"""
+    key = os.path.abspath(db_path)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool.closed:
+            pool = _shared_pools[key] = SQLiteConnectionPool(db_path)
+        return pool
@@ -0,0 +1,200 @@
+"""
+Write-behind buffer for frequently rewritten SQLite rows
+Coalesces repeated saves of the same key and writes them in batches from a
+background thread, so hot paths neither block on SQLite nor rewrite a row
+once per state change
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.constants import Defaults
+from src.core.sqlite_pool import SQLiteConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Writes a batch of (key, value) pairs inside an open transaction
+BatchWriter = Callable[[sqlite3.Connection, List[Tuple[str, Any]]], None]
+
+
+class WriteBehindQueue:
+    """
+    Coalescing write-behind queue flushed by a background thread
+
+    Only the latest value submitted for a key is written. Pending values are
+    flushed as one transaction once ``flush_interval`` has passed since the
+    oldest of them, once ``max_batch`` keys are pending, or right away for a
+    durable submit. Durable batches are committed with synchronous=FULL so
+    they are on disk when the flush completes; other batches rely on WAL
+    with synchronous=NORMAL. Pending values are flushed at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        write_batch: BatchWriter,
+        flush_interval: float = Defaults.WRITE_BEHIND_INTERVAL,
+        max_batch: int = Defaults.WRITE_BEHIND_MAX_BATCH,
+        name: str = "write-behind",
+        on_written: Optional[Callable[[List[Tuple[str, Any]]], None]] = None,
+    ):
+        """
+        Initialize write-behind queue
+
+        Args:
+            pool: Connection pool of the database written to
+            write_batch: Writes (key, value) pairs inside an open transaction
+            flush_interval: Seconds a value may stay pending
+            max_batch: Pending keys that trigger an early flush
+            name: Name of the flushing thread
+            on_written: Called with each batch once it is committed
+        """
+        self.pool = pool
+        self.write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.name = name
+        self.on_written = on_written
+
+        self._pending: Dict[str, Any] = {}
+        self._oldest_pending = 0.0
+        self._durable = False
+        self._flush_requested = False
+        # Submits so far, and how many of them are written (or dropped after a failed flush)
+        self._submitted = 0
+        self._flushed = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {"submitted": 0, "coalesced": 0, "batches": 0, "durable_batches": 0, "failures": 0}
+
+    def submit(self, key: str, value: Any, durable: bool = False) -> None:
+        """
+        Queue a value to be written, replacing any pending value of the key
+
+        Args:
+            key: Row key; only the latest value per key is written
+            value: Passed to write_batch
+            durable: Flush now and fsync the batch (e.g. a session finished)
+        """
+        with self._cond:
+            if self._closed:
+                # Nothing flushes anymore; write in the caller's thread
+                self._write([(key, value)], durable)
+                return
+
+            if key in self._pending:
+                self._stats["coalesced"] += 1
+            elif not self._pending:
+                self._oldest_pending = time.monotonic()
+            self._pending[key] = value
+            self._durable = self._durable or durable
+            self._submitted += 1
+            self._stats["submitted"] += 1
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every value submitted so far has been flushed
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._cond:
+            target = self._submitted
+            if self._flushed >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._flushed >= target, timeout)
+
+    def close(self) -> None:
+        """Flush pending values and stop the flushing thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+            atexit.unregister(self.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics"""
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            # Daemon threads still run during atexit; flush before the interpreter goes away
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending and (
+                        self._closed or self._durable or self._flush_requested
+                        or len(self._pending) >= self.max_batch
+                    ):
+                        break
+                    if self._closed:
+                        return
+                    if self._pending:
+                        wait = self._oldest_pending + self.flush_interval - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+
+                batch = list(self._pending.items())
+                durable = self._durable
+                flushed = self._submitted
+                self._pending = {}
+                self._durable = False
+                self._flush_requested = False
+
+            self._write(batch, durable)
+
+            with self._cond:
+                self._flushed = flushed
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Tuple[str, Any]], durable: bool) -> None:
+        try:
+            self.pool.run_sync(lambda db: self._write_batch(db, batch, durable))
+        except Exception as e:
+            # Like a failed direct save: logged, and the next save of a key retries it
+            logger.error(f"Failed to write {len(batch)} pending rows: {e}")
+            with self._cond:
+                self._stats["failures"] += 1
+            return
+
+        with self._cond:
+            self._stats["batches"] += 1
+            if durable:
+                self._stats["durable_batches"] += 1
+        if self.on_written is not None:
+            self.on_written(batch)
+
+    def _write_batch(self, db: sqlite3.Connection, batch: List[Tuple[str, Any]], durable: bool) -> None:
+        if not durable:
+            self.write_batch(db, batch)
+            return
+
+        # The safety level can only change outside a transaction
+        db.execute("PRAGMA synchronous = FULL")
+        try:
+            self.write_batch(db, batch)
+            db.commit()
+        finally:
+            if db.in_transaction:
+                db.rollback()
+            db.execute("PRAGMA synchronous = NORMAL")
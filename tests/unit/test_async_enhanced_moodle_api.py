@@ -0,0 +1,167 @@
+"""
+Unit tests for the async EnhancedMoodleAPI and integration layer
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("requests")
+
+from src.clients.enhanced_moodle_claude import (
+    AsyncEnhancedMoodleAPI,
+    AsyncMoodleClaudeIntegration,
+    SectionConfig,
+)
+from src.core.rate_limiter import RateLimiter
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def text(self):
+        return json.dumps(self.payload)
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+
+class FakeSession:
+    """Records posted form fields and answers per wsfunction"""
+
+    def __init__(self):
+        self.posts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.next_section = 0
+
+    def post(self, url, data, headers=None):
+        fields = dict(parse_qsl(data.decode()))
+        self.posts.append(fields)
+        return self._respond(fields)
+
+    def _respond(self, fields):
+        session = self
+
+        class Pending(FakeResponse):
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await asyncio.sleep(0.001)
+                session.in_flight -= 1
+                return self
+
+        function = fields["wsfunction"]
+        if function == "core_course_create_courses":
+            return Pending([{"id": 42}])
+        if function == "local_wsmanagesections_create_section":
+            return Pending({"sectionid": int(fields["sectionnumber"]) * 10})
+        return Pending({"success": True})
+
+
+class InsertingSession(FakeSession):
+    """Inserts created sections at their position; later positions answer sooner"""
+
+    def __init__(self):
+        super().__init__()
+        self.course_sections = []
+
+    def _respond(self, fields):
+        if fields["wsfunction"] != "local_wsmanagesections_create_section":
+            return super()._respond(fields)
+        session = self
+        position = int(fields["sectionnumber"])
+
+        class Inserted(FakeResponse):
+            async def __aenter__(self):
+                await asyncio.sleep(0.001 * (10 - position))
+                session.course_sections.insert(position - 1, fields["sectionname"])
+                return self
+
+        return Inserted({"sectionid": position * 10})
+
+
+class FakeSessionFactory:
+    def __init__(self, session):
+        self.session = session
+
+    async def get_session(self):
+        return self.session
+
+
+def make_api(session):
+    return AsyncEnhancedMoodleAPI(
+        "http://moodle.test", "token",
+        rate_limiter=RateLimiter(rate=1e6, burst=1e6),
+        session_factory=FakeSessionFactory(session),
+    )
+
+
+class TestAsyncEnhancedMoodleAPI:
+    """Test async requests and concurrent bulk operations"""
+
+    @pytest.mark.asyncio
+    async def test_nested_params_are_flattened(self):
+        session = FakeSession()
+        api = make_api(session)
+
+        await api.move_sections([{"sectionid": 5, "position": 2}])
+
+        fields = session.posts[0]
+        assert fields["wsfunction"] == "local_wsmanagesections_bulk_operations"
+        assert fields["operations[0][operation]"] == "move"
+        assert fields["operations[0][targetposition]"] == "2"
+
+    @pytest.mark.asyncio
+    async def test_section_request_matches_sync_builder(self):
+        session = FakeSession()
+        api = make_api(session)
+        config = SectionConfig(name="Intro", summary="<p>Hi</p>", position=1)
+
+        await api.create_course_section(7, config)
+
+        function, params = api._create_course_section_request(7, config)
+        assert session.posts[0]["wsfunction"] == function
+        assert session.posts[0]["sectionname"] == params["sectionname"]
+
+    @pytest.mark.asyncio
+    async def test_sections_keep_chat_order_when_later_creates_finish_first(self):
+        session = InsertingSession()
+        integration = AsyncMoodleClaudeIntegration(
+            "http://moodle.test", "token", max_concurrency=3, api=make_api(session)
+        )
+        chat = "\n".join(f"# Week {i}\nContent for week {i}" for i in range(1, 9))
+
+        result = await integration.create_structured_course_from_chat(chat, "Course", 1)
+
+        assert result["courseid"] == 42
+        assert session.course_sections == [f"Week {i}" for i in range(1, 9)]
+
+    @pytest.mark.asyncio
+    async def test_resources_added_concurrently_in_order(self):
+        session = FakeSession()
+        integration = AsyncMoodleClaudeIntegration(
+            "http://moodle.test", "token", max_concurrency=3, api=make_api(session)
+        )
+        resources = [{"type": "url", "url": f"http://example.com/{i}"} for i in range(6)]
+
+        results = await integration.add_resources_to_section(42, 1, resources)
+
+        assert len(results) == 6
+        assert [post["externalurl"] for post in session.posts if "externalurl" in post] == [
+            resource["url"] for resource in resources
+        ]
+        assert 1 < session.max_in_flight <= 3
@@ -0,0 +1,145 @@
+"""
+Unit tests for content-addressed session content storage
+"""
+
+import sqlite3
+
+import pytest
+
+from src.core.blob_store import BlobStore, chunk_ranges
+from src.core.repositories import SQLiteSessionRepository
+from src.core.sqlite_pool import SQLiteConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "sessions.db"), size=2)
+    yield pool
+    pool.close()
+
+
+def blob_rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT codec, size, LENGTH(data) FROM content_blobs ORDER BY size").fetchall()
+
+
+class TestBlobStore:
+    def test_identical_text_is_stored_once_and_compressed(self):
+        db = sqlite3.connect(":memory:")
+        blobs = BlobStore()
+        blobs.create_schema(db)
+        text = "Python functions and classes. " * 500
+
+        assert blobs.put(db, text) == blobs.put(db, text)
+        blobs.put(db, "short")
+
+        (short_codec, _, _), (codec, size, stored) = db.execute(
+            "SELECT codec, size, LENGTH(data) FROM content_blobs ORDER BY size"
+        ).fetchall()
+        assert short_codec == "raw"
+        assert codec in ("zstd", "zlib")
+        assert size == len(text) and stored < len(text) // 10
+
+        key = blobs.put(db, text)
+        assert BlobStore().get(db, key) == text
+        assert blobs.get_range(db, key, 7, 16) == "functions"
+
+    def test_chunk_ranges_locate_chunks_in_order(self):
+        content = "intro\n\nbody\n\nintro"
+
+        assert list(chunk_ranges(content, ["intro", "body", "intro", "summary"])) == [
+            ("intro", (0, 5)), ("body", (7, 11)), ("intro", (13, 18)), ("summary", None)
+        ]
+
+
+class TestRepositoryBlobs:
+    @pytest.mark.asyncio
+    async def test_sessions_share_content_and_chunks_are_ranges(self, tmp_path, pool):
+        db_path = str(tmp_path / "sessions.db")
+        repo = SQLiteSessionRepository(db_path, pool=pool)
+        content = "\n\n".join(f"Section {i}: " + "lorem ipsum " * 100 for i in range(3))
+        chunks = content.split("\n\n") + ["generated summary"]
+
+        for session_id in ("s1", "s2"):
+            await repo.save({"session_id": session_id, "content": content,
+                             "course_name": "Course", "chunks": chunks})
+
+        # One blob for the content, one for the chunk that is not part of it
+        assert [size for _, size, _ in blob_rows(db_path)] == [len("generated summary"), len(content)]
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT SUM(LENGTH(content)) FROM sessions").fetchone()[0] == 0
+
+        session = await repo.get_by_id("s1")
+        assert session["content"] == content
+        assert session["chunks"] == chunks
+
+        await repo.delete("s1")
+        assert len(blob_rows(db_path)) == 2
+        await repo.delete("s2")
+        assert blob_rows(db_path) == []
+
+    @pytest.mark.asyncio
+    async def test_rows_without_blob_reference_still_read(self, tmp_path, pool):
+        db_path = str(tmp_path / "sessions.db")
+        repo = SQLiteSessionRepository(db_path, pool=pool)
+        await repo.save({"session_id": "new", "content": "x", "course_name": "c"})
+
+        # Saved before content moved to blobs
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO sessions (session_id, content, course_name) VALUES ('old', 'inline', 'c')")
+            conn.execute("INSERT INTO session_chunks (session_id, chunk_index, chunk_content) "
+                         "VALUES ('old', 0, 'inline chunk')")
+
+        session = await repo.get_by_id("old")
+        assert session["content"] == "inline"
+        assert session["chunks"] == ["inline chunk"]
+
+    @pytest.mark.asyncio
+    async def test_unreferenced_blob_lookup_uses_indexes(self, tmp_path, pool):
+        db_path = str(tmp_path / "sessions.db")
+        repo = SQLiteSessionRepository(db_path, pool=pool)
+        await repo.save({"session_id": "s1", "content": "x", "course_name": "c", "chunks": ["x"]})
+
+        with sqlite3.connect(db_path) as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT 1 FROM content_blobs WHERE NOT EXISTS ("
+                "SELECT 1 FROM session_chunks WHERE session_chunks.content_ref = content_blobs.content_hash)"
+            ))
+        assert "idx_session_chunks_content_ref" in plan
+
+    @pytest.mark.asyncio
+    async def test_resave_drops_replaced_blobs(self, tmp_path, pool):
+        db_path = str(tmp_path / "sessions.db")
+        repo = SQLiteSessionRepository(db_path, pool=pool)
+        await repo.save({"session_id": "s1", "content": "first draft", "course_name": "c",
+                         "chunks": ["first draft", "old summary"]})
+        await repo.save({"session_id": "s2", "content": "shared", "course_name": "c"})
+
+        await repo.save({"session_id": "s1", "content": "second draft", "course_name": "c",
+                         "chunks": ["second draft"]})
+        await repo.save({"session_id": "s2", "content": "shared", "course_name": "c"})
+
+        assert sorted(size for _, size, _ in blob_rows(db_path)) == [len("shared"), len("second draft")]
+
+
+class TestSessionManagerBlobs:
+    @pytest.mark.asyncio
+    async def test_rewritten_content_drops_the_old_blob(self, tmp_path):
+        from src.core.adaptive_content_processor import ProcessingSession, ProcessingStrategy
+        from src.core.intelligent_session_manager import IntelligentSessionManager, SessionDatabase
+
+        db_path = str(tmp_path / "sessions.db")
+        manager = IntelligentSessionManager(db_config=SessionDatabase(db_path=db_path))
+        session = ProcessingSession(
+            session_id="s1", content_hash="h1", original_content="first draft",
+            strategy=ProcessingStrategy.SINGLE_PASS, course_name="Course", total_chunks=1,
+        )
+        manager._save_session_to_db(session)
+        manager._session_writer.flush()
+
+        session.content_hash, session.original_content = "h2", "second draft"
+        manager._save_session_to_db(session)
+        manager._session_writer.flush()
+
+        assert [size for _, size, _ in blob_rows(db_path)] == [len("second draft")]
+        await manager.cleanup_and_shutdown()
@@ -0,0 +1,181 @@
+"""
+Unit tests for web service call batching
+"""
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qsl
+
+import pytest
+
+from src.clients.call_batcher import CallBatcher
+from src.clients.resilience import DeadlineExceeded, call_deadline, remaining_time
+
+
+class TestCallBatcher:
+    """Test coalescing of concurrent calls"""
+
+    @pytest.mark.asyncio
+    async def test_calls_within_window_share_a_batch(self):
+        sent = []
+
+        async def send_batch(calls):
+            sent.append(calls)
+            return [f"{function}:{params['n']}" for function, params in calls]
+
+        batcher = CallBatcher(send_batch, window=0.01, max_calls=10)
+        results = await asyncio.gather(*(batcher.submit("fn", {"n": i}) for i in range(4)))
+
+        assert results == ["fn:0", "fn:1", "fn:2", "fn:3"]
+        assert len(sent) == 1
+        assert batcher.get_stats()["largest_batch"] == 4
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_early_and_errors_stay_isolated(self):
+        sent = []
+
+        async def send_batch(calls):
+            sent.append(len(calls))
+            return [ValueError("bad") if params["n"] == 1 else params["n"] for _, params in calls]
+
+        batcher = CallBatcher(send_batch, window=10, max_calls=3)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("fn", {"n": i}) for i in range(3)), return_exceptions=True),
+            timeout=1,
+        )
+
+        assert sent == [3]
+        assert results[0] == 0 and results[2] == 2
+        assert isinstance(results[1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_each_caller_keeps_its_own_deadline(self):
+        seen = []
+
+        async def send_batch(calls):
+            seen.append(remaining_time())
+            await asyncio.sleep(0.05)
+            return [params["n"] for _, params in calls]
+
+        batcher = CallBatcher(send_batch, window=0.01, max_calls=10)
+
+        async def submit(n, seconds):
+            with call_deadline(seconds):
+                return await batcher.submit("fn", {"n": n})
+
+        results = await asyncio.gather(submit(0, 0.02), submit(1, 5), return_exceptions=True)
+
+        assert isinstance(results[0], DeadlineExceeded)
+        assert results[1] == 1
+        # The batch is bounded by the later deadline, not by the first submitter's
+        assert seen[0] > 1
+        assert not batcher._sends
+
+
+class StubBatchMoodle:
+    """PHP-free stand-in for a Moodle site with the local_moodleclaude_batch endpoint"""
+
+    FUNCTIONS = [
+        "local_moodleclaude_create_page_activity",
+        "local_moodleclaude_update_section_content",
+        "local_moodleclaude_batch",
+    ]
+
+    def __init__(self):
+        self.requests = []
+
+    def handle(self, function, args):
+        if function == "local_moodleclaude_create_page_activity":
+            if args["name"] == "broken":
+                raise ValueError("invalid name")
+            return {"success": True, "activityid": len(args["content"]), "message": "created"}
+        if function == "local_moodleclaude_update_section_content":
+            return {"success": True, "message": "updated"}
+        raise ValueError(f"unknown function {function}")
+
+    def respond(self, data):
+        function = data["wsfunction"]
+        self.requests.append(function)
+        if function == "core_webservice_get_site_info":
+            return {"functions": [{"name": name} for name in self.FUNCTIONS]}
+        if function != "local_moodleclaude_batch":
+            args = {k: v for k, v in data.items() if not k.startswith(("ws", "moodlews"))}
+            return self.handle(function, args)
+
+        calls = {}
+        for key, value in data.items():
+            match = re.fullmatch(r"calls\[(\d+)\]\[(\w+)\]", key)
+            if match:
+                calls.setdefault(int(match.group(1)), {})[match.group(2)] = value
+
+        results = []
+        for index in sorted(calls):
+            call = calls[index]
+            try:
+                result = self.handle(call["wsfunction"], json.loads(call["args"]))
+                results.append({"success": True, "data": json.dumps(result), "error": ""})
+            except ValueError as e:
+                results.append({"success": False, "data": "", "error": str(e)})
+        return {"results": results}
+
+
+class StubResponse:
+    status = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return json.dumps(self.payload)
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+    async def json(self):
+        return self.payload
+
+
+class StubSessionFactory:
+    def __init__(self, moodle):
+        self.moodle = moodle
+        self.closed = False
+
+    async def get_session(self):
+        return self
+
+    def post(self, url, data, headers=None):
+        return StubResponse(self.moodle.respond(dict(parse_qsl(data.decode()))))
+
+
+class TestEnhancedClientBatching:
+    """Test EnhancedMoodleClient against the stub batch protocol"""
+
+    @pytest.mark.asyncio
+    async def test_activity_storm_is_sent_as_one_batch(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+        from src.core.rate_limiter import RateLimiter
+
+        moodle = StubBatchMoodle()
+        client = EnhancedMoodleClient(
+            "http://moodle.test", token="token",
+            rate_limiter=RateLimiter(rate=1e6, burst=1e6),
+            session_factory=StubSessionFactory(moodle),
+        )
+
+        results = await asyncio.gather(
+            client.update_section_content(1, 1, "Intro", "<p>x</p>"),
+            *(client.create_page_activity(1, 1, name, "<p>body</p>") for name in ["a", "broken", "c"]),
+        )
+
+        assert results[0] is True
+        assert [r["success"] for r in results[1:]] == [True, False, True]
+        assert "invalid name" in results[2]["message"]
+        assert moodle.requests == ["core_webservice_get_site_info", "local_moodleclaude_batch"]
@@ -0,0 +1,116 @@
+"""
+Unit tests for persisted plugin capability snapshots
+"""
+
+import time
+
+import pytest
+
+from src.clients.capability_store import CapabilitySnapshot, CapabilityStore, capabilities_path
+from src.clients.ws_responses import SiteInfo
+
+
+def site_info(version="2023100902", plugin_version="2026101600"):
+    return {
+        "sitename": "Moodle",
+        "userid": 2,
+        "username": "admin",
+        "version": version,
+        "functions": [
+            {"name": "core_course_get_contents", "version": version},
+            {"name": "local_moodleclaude_create_page_activity", "version": plugin_version},
+            {"name": "local_moodleclaude_batch", "version": plugin_version},
+        ],
+    }
+
+
+class TestCapabilityStore:
+    def test_round_trip_keyed_by_site_and_token(self, tmp_path):
+        store = CapabilityStore(str(tmp_path / "capabilities.json"))
+        snapshot = CapabilitySnapshot.from_site_info(SiteInfo.from_dict(site_info()))
+
+        store.save("http://moodle.test/", "token", snapshot)
+
+        loaded = store.load("http://moodle.test", "token")
+        assert loaded == snapshot
+        assert loaded.has_function("local_moodleclaude_batch")
+        assert store.load("http://moodle.test", "other-token") is None
+        assert "token" not in (tmp_path / "capabilities.json").read_text()
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        path = tmp_path / "capabilities.json"
+        path.write_text("{not json")
+
+        assert CapabilityStore(str(path)).load("http://moodle.test", "token") is None
+
+    def test_staleness_and_invalidation(self, tmp_path):
+        store = CapabilityStore(str(tmp_path / "capabilities.json"), max_age=60)
+        snapshot = CapabilitySnapshot(functions={"f": "1"}, fetched_at=time.time() - 120)
+
+        store.save("http://moodle.test", "token", snapshot)
+        assert store.is_stale(store.load("http://moodle.test", "token"))
+
+        store.invalidate("http://moodle.test", "token")
+        assert store.load("http://moodle.test", "token") is None
+
+    def test_path_next_to_session_database(self):
+        assert capabilities_path("data/sessions.db") == "data/capabilities.json"
+        assert capabilities_path("sessions.db") == "./capabilities.json"
+
+
+class TestClientSnapshotUse:
+    def make_client(self, store, responses):
+        pytest.importorskip("aiohttp")
+        from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+
+        class ProbeCountingClient(EnhancedMoodleClient):
+            def __init__(self):
+                super().__init__("http://moodle.test", token="token", capability_store=store)
+                self.probes = 0
+
+            async def _call_api(self, function, params=None):
+                assert function == "core_webservice_get_site_info"
+                self.probes += 1
+                return responses.pop(0)
+
+        return ProbeCountingClient()
+
+    @pytest.mark.asyncio
+    async def test_cold_start_reuses_persisted_probe(self, tmp_path):
+        store = CapabilityStore(str(tmp_path / "capabilities.json"))
+
+        first = self.make_client(store, [site_info()])
+        assert await first._check_plugin_availability()
+        assert first.probes == 1
+
+        second = self.make_client(store, [])
+        assert await second._check_plugin_availability()
+        assert second.batch_available
+        assert second.probes == 0
+        assert await second._get_current_user() == {"userid": 2, "username": "admin"}
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_refreshes_in_background(self, tmp_path):
+        store = CapabilityStore(str(tmp_path / "capabilities.json"), max_age=60)
+        old = CapabilitySnapshot.from_site_info(SiteInfo.from_dict(site_info()))
+        old.fetched_at -= 120
+        store.save("http://moodle.test", "token", old)
+
+        # The plugin was uninstalled since the snapshot was taken
+        upgraded = site_info(version="2024042200")
+        upgraded["functions"] = upgraded["functions"][:1]
+        client = self.make_client(store, [upgraded])
+
+        assert await client._check_plugin_availability()
+        await client._capability_refresh
+
+        assert client.probes == 1
+        assert client.plugin_available is False
+        assert store.load("http://moodle.test", "token").site_version == "2024042200"
+
+    @pytest.mark.asyncio
+    async def test_no_store_probes_every_client(self):
+        client = self.make_client(None, [site_info()])
+
+        assert await client._check_plugin_availability()
+        assert client.probes == 1
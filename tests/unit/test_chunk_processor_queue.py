@@ -0,0 +1,108 @@
+"""
+Unit tests for the queue-based chunk processor
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.chunk_processor_queue import ChunkProcessorQueue
+
+
+class FakePluginClient:
+    """Plugin client stub recording create_course_structure calls"""
+
+    def __init__(self, fail_times: int = 0):
+        self.calls = []
+        self.fail_times = fail_times
+
+    async def create_course_structure(self, course_id, sections):
+        self.calls.append((course_id, sections))
+        await asyncio.sleep(0)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            return {"success": False, "message": "temporary failure"}
+        return {
+            "success": True,
+            "sections": [
+                {"activities": [{"success": True} for _ in section["activities"]]}
+                for section in sections
+            ],
+        }
+
+
+def make_sections(index: int):
+    return [{"name": f"Section {index}", "summary": "", "activities": [{"type": "page"}]}]
+
+
+class TestChunkProcessorQueue:
+    """Test chunk queue processing"""
+
+    @pytest.mark.asyncio
+    async def test_lazy_producers_are_awaited_and_released(self):
+        queue = ChunkProcessorQueue(max_concurrent=1, rate_limit_delay=0)
+        client = FakePluginClient()
+        produced = []
+
+        def make_producer(index):
+            async def produce():
+                produced.append(index)
+                return make_sections(index)
+            return produce
+
+        progress = []
+
+        async def progress_callback(completed, total):
+            progress.append((completed, total))
+
+        chunk_ids = await queue.add_chunk_producers(7, [make_producer(i) for i in range(3)])
+        summary = await queue.process_queue(client, progress_callback)
+
+        assert chunk_ids == ["course_7_chunk_1", "course_7_chunk_2", "course_7_chunk_3"]
+        assert produced == [0, 1, 2]
+        assert [sections[0]["name"] for _, sections in client.calls] == [
+            "Section 0",
+            "Section 1",
+            "Section 2",
+        ]
+        assert summary["successful_chunks"] == 3
+        assert progress[-1] == (3, 3)
+        assert all(task.chunk_data is None for task in queue.completed.values())
+
+    @pytest.mark.asyncio
+    async def test_eager_chunks_still_supported(self):
+        queue = ChunkProcessorQueue(max_concurrent=2, rate_limit_delay=0)
+        client = FakePluginClient()
+
+        await queue.add_chunks(3, [make_sections(0), make_sections(1)])
+        summary = await queue.process_queue(client)
+
+        assert summary["successful_chunks"] == 2
+        assert summary["successful_activities"] == 2
+
+    @pytest.mark.asyncio
+    async def test_smaller_chunks_dispatched_first(self):
+        queue = ChunkProcessorQueue(max_concurrent=1, rate_limit_delay=0)
+        client = FakePluginClient()
+        large = [{"name": "Large", "summary": "", "activities": [{"type": "page"}] * 5}]
+
+        await queue.add_chunks(1, [large, make_sections(1)])
+        await queue.process_queue(client)
+
+        assert [sections[0]["name"] for _, sections in client.calls] == ["Section 1", "Large"]
+
+    @pytest.mark.asyncio
+    async def test_overlapping_process_queue_calls_both_finish(self):
+        queue = ChunkProcessorQueue(max_concurrent=1, rate_limit_delay=0)
+        client = FakePluginClient()
+
+        await queue.add_chunks(1, [make_sections(0)])
+        first = asyncio.create_task(queue.process_queue(client))
+        await asyncio.sleep(0)
+        await queue.add_chunks(2, [make_sections(1)])
+        second = asyncio.create_task(queue.process_queue(client))
+
+        summaries = await asyncio.wait_for(asyncio.gather(first, second), timeout=5)
+
+        assert all(summary["successful_chunks"] == 2 for summary in summaries)
+        assert not queue.processing and not queue.queue
@@ -73,6 +73,16 @@ class TestDualTokenConfig:
                 assert config.get_basic_token() == single_env["MOODLE_TOKEN"]
                 assert config.get_plugin_token() == single_env["MOODLE_TOKEN"]
 
+    def test_inline_css_setting(self, mock_env_vars):
+        """Test the shared stylesheet option"""
+        with patch.dict(os.environ, mock_env_vars, clear=True):
+            with patch('os.path.exists', return_value=False):
+                assert DualTokenConfig.from_env().inline_css is True
+
+        with patch.dict(os.environ, {**mock_env_vars, "MOODLE_CLAUDE_INLINE_CSS": "false"}, clear=True):
+            with patch('os.path.exists', return_value=False):
+                assert DualTokenConfig.from_env().inline_css is False
+
     def test_get_config_summary(self, mock_env_vars):
         """Test configuration summary"""
         with patch.dict(os.environ, mock_env_vars, clear=True):
@@ -0,0 +1,48 @@
+"""
+Unit tests for content formatter caching and stylesheet emission
+"""
+
+import pytest
+
+from src.core.content_formatter import ContentFormatter
+
+CODE = "def greet(name):\n    return f'Hello, {name}!'"
+
+
+class TestContentFormatterCaching:
+    """Test lexer/highlight memoisation and shared stylesheet option"""
+
+    @pytest.fixture
+    def formatter(self):
+        return ContentFormatter()
+
+    def test_highlight_is_memoised(self, formatter):
+        first = formatter._highlight_code(CODE, "python")
+        second = formatter._highlight_code(CODE, "python")
+
+        assert first == second
+        assert len(formatter._highlight_cache) == 1
+        assert "python" in formatter._lexer_cache
+
+    def test_unknown_language_falls_back_to_plain_text(self, formatter):
+        highlighted = formatter._highlight_code("<b>x</b>", "not-a-language")
+
+        assert highlighted == '<pre class="code-highlight"><code>&lt;b&gt;x&lt;/b&gt;</code></pre>'
+        assert formatter._lexer_cache["not-a-language"] is None
+
+    def test_highlight_cache_is_bounded(self):
+        formatter = ContentFormatter(highlight_cache_size=2)
+
+        for i in range(5):
+            formatter._highlight_code(f"x = {i}", "python")
+
+        assert len(formatter._highlight_cache) == 2
+
+    def test_shared_stylesheet_is_not_inlined(self):
+        inline = ContentFormatter().format_code_for_moodle(CODE, "python", "Greet")
+        shared_formatter = ContentFormatter(inline_css=False)
+        shared = shared_formatter.format_code_for_moodle(CODE, "python", "Greet")
+
+        assert "<style>" in inline
+        assert "<style>" not in shared
+        assert "<style>" in shared_formatter.get_stylesheet()
@@ -215,6 +215,28 @@ class TestChatContentParserFixed:
         result = parser._are_similar_topics(content1, content2)
         assert isinstance(result, bool)
 
+    def test_deduplicate_matches_pairwise_similarity(self, parser):
+        """Test indexed topic deduplication agrees with pairwise comparison"""
+        import random
+
+        rng = random.Random(7)
+        vocab = [f"word{i}" for i in range(40)] + ["the", "a", "of"]
+        items = []
+        for _ in range(200):
+            if items and rng.random() < 0.5:
+                words = rng.choice(items).content.split()
+                words = [w if rng.random() < 0.9 else rng.choice(vocab) for w in words]
+            else:
+                words = [rng.choice(vocab) for _ in range(rng.randint(5, 25))]
+            items.append(ContentItem(type="topic", title="Topic", content=" ".join(words)))
+
+        expected = []
+        for item in items:
+            if not any(parser._are_similar_topics(item.content, kept.content) for kept in expected):
+                expected.append(item)
+
+        assert parser._deduplicate_and_organize(items) == expected
+
     def test_parse_with_realistic_content(self, parser):
         """Test parsing with realistic chat content structure"""
         content = """
@@ -298,6 +320,29 @@ class TestChatContentParserFixed:
         matches = parser.code_block_pattern.findall(test_text)
         assert isinstance(matches, list)
 
+    def test_compiled_detector_matches_per_pattern_scoring(self, parser):
+        """Test compiled detector scores equal re.findall over every pattern"""
+        import re
+
+        snippets = [
+            "def hello():\n    print('hi')",
+            "SELECT * FROM users WHERE id = 1",
+            "#include <iostream>\nint main() { std::cout << 1 << std::endl; }",
+            "<?php echo $name; ?>",
+            "key: value\nlist:\n  - item",
+            "plain words only",
+        ]
+
+        for code in snippets:
+            expected = [
+                sum(
+                    len(re.findall(pattern, code, re.IGNORECASE | re.MULTILINE))
+                    for pattern in patterns
+                )
+                for patterns in parser.language_patterns.values()
+            ]
+            assert parser.language_detector.score(code) == expected
+
 
 class TestChatContentParserIntegration:
     """Integration tests for content parser"""
@@ -343,6 +388,51 @@ class TestChatContentParserIntegration:
             assert hasattr(parser, "parse_chat")
             pytest.skip(f"Parser implementation may need refinement: {e}")
 
+    def test_parse_stream_matches_parse_chat(self, parser):
+        """Test streaming parse yields the same items for any chunk size"""
+        content = (
+            "Let's discuss python programming basics.\n\n"
+            "Here's a function that greets people:\n"
+            "```python\ndef greet(name):\n    return name\n```\n\n"
+            "This explanation covers the concept of functions. In other words, "
+            "a function is a reusable block of code.\n\n"
+            "Another example of queries:\n```sql\nSELECT * FROM users;\n```\n"
+        )
+        expected = [item.to_dict() for item in parser.parse_chat(content).items]
+
+        for size in (1, 3, 16, len(content)):
+            chunks = [content[i : i + size] for i in range(0, len(content), size)]
+            streamed = [item.to_dict() for item in parser.parse_stream(chunks)]
+            assert streamed == expected
+
+    def test_parallel_parse_matches_serial(self, parser):
+        """Test process-pool parsing reproduces serial output and topic carry-over"""
+        content = "\n\n".join(
+            [
+                "Let's discuss database design for the course.",
+                "Here is an example:\n```\nfunction add(a, b) { return a + b; }\n```",
+                "Talking about python programming now.",
+                "```\nSELECT name FROM users WHERE id = 1;\n```",
+                "This explanation covers the concept. In other words, it works by design.",
+            ]
+        )
+
+        serial = parser.parse_chat(content)
+        parallel = parser.parse_chat(content, max_workers=2)
+
+        assert [item.to_dict() for item in parallel.items] == [
+            item.to_dict() for item in serial.items
+        ]
+
+    def test_parse_stream_keeps_fenced_blocks_whole(self, parser):
+        """Test blank lines inside a fenced block do not split the message"""
+        content = "Intro:\n```python\ndef a():\n    pass\n\nclass B:\n    pass\n```\n\nDone."
+        chunks = [content[i : i + 4] for i in range(0, len(content), 4)]
+
+        code_items = [item for item in parser.parse_stream(chunks) if item.type == "code"]
+        assert len(code_items) == 1
+        assert "class B" in code_items[0].content
+
     def test_error_handling(self, parser):
         """Test error handling with malformed content"""
         malformed_content = "```python\ndef broken_function(\nprint('missing closing parenthesis'"
@@ -0,0 +1,143 @@
+"""
+Unit tests for EnhancedMoodleClient's individual-call structure fallback
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+
+
+class FakeEnhancedClient(EnhancedMoodleClient):
+    """Client whose Moodle calls are simulated in memory"""
+
+    ACTIVITY_RETRY_DELAY = 0
+
+    def __init__(self, flaky=None, timeouts=None):
+        super().__init__("http://moodle.test", token="token")
+        self.flaky = dict(flaky or {})
+        self.timeouts = set(timeouts or ())
+        self.events = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _simulate(self, event, delay=0.001):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.events.append(event)
+        await asyncio.sleep(delay)
+        self.in_flight -= 1
+        self.events.append(("done",) + event)
+
+    async def update_section_content(self, course_id, section_number, name, summary=""):
+        await self._simulate(("section", section_number))
+        return True
+
+    async def create_page_activity(self, course_id, section_id, name, content):
+        # Earlier activities of a section take longer, so parallel creates would finish out of order
+        await self._simulate(("page", name), delay=0.001 * (5 - int(name[-1])))
+        if self.flaky.get(name, 0) > 0:
+            self.flaky[name] -= 1
+            return {"success": False, "message": "Error: circuit open", "retryable": True}
+        if name in self.timeouts:
+            return {"success": False, "message": "Error: Request timed out", "retryable": False}
+        return {"success": True, "message": "ok", "activity_id": hash(name) % 1000}
+
+
+def make_sections(sections: int, activities: int):
+    return [
+        {
+            "name": f"Section {s}",
+            "summary": "",
+            "activities": [
+                {"type": "page", "name": f"s{s}a{a}", "content": "<p>x</p>"}
+                for a in range(activities)
+            ],
+        }
+        for s in range(1, sections + 1)
+    ]
+
+
+class TestIndividualStructureFallback:
+    """Test bounded concurrency, ordering and retries of unsent activities"""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_order_under_bounded_concurrency(self):
+        client = FakeEnhancedClient()
+
+        result = await client._create_structure_individually(1, make_sections(5, 4), max_concurrency=3)
+
+        assert result["success"]
+        assert [s["sectionnumber"] for s in result["sections"]] == [1, 2, 3, 4, 5]
+        assert [a["name"] for a in result["sections"][2]["activities"]] == [
+            "s3a0", "s3a1", "s3a2", "s3a3"
+        ]
+        assert 1 < client.max_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_section_header_precedes_its_activities(self):
+        client = FakeEnhancedClient()
+
+        await client._create_structure_individually(1, make_sections(3, 2))
+
+        for s in range(1, 4):
+            header = client.events.index(("section", s))
+            assert all(client.events.index(("page", f"s{s}a{a}")) > header for a in range(2))
+
+    @pytest.mark.asyncio
+    async def test_failed_activity_is_retried_alone(self):
+        client = FakeEnhancedClient(flaky={"s1a1": 2, "s2a0": 5})
+
+        result = await client._create_structure_individually(1, make_sections(2, 2))
+
+        activities = [a for s in result["sections"] for a in s["activities"]]
+        assert [a["success"] for a in activities] == [True, True, False, True]
+        assert client.events.count(("page", "s1a1")) == 3
+        assert client.events.count(("page", "s2a0")) == client.ACTIVITY_MAX_ATTEMPTS
+        assert client.events.count(("page", "s1a0")) == 1
+
+    @pytest.mark.asyncio
+    async def test_activities_are_created_in_section_order(self):
+        client = FakeEnhancedClient()
+
+        await client._create_structure_individually(1, make_sections(2, 4))
+
+        for s in range(1, 3):
+            finished = [event[2] for event in client.events if event[:2] == ("done", "page")
+                        and event[2].startswith(f"s{s}")]
+            assert finished == [f"s{s}a{a}" for a in range(4)]
+
+    @pytest.mark.asyncio
+    async def test_sent_failures_are_not_retried(self):
+        client = FakeEnhancedClient(timeouts={"s1a0"})
+
+        result = await client._create_structure_individually(1, make_sections(1, 2))
+
+        assert [a["success"] for a in result["sections"][0]["activities"]] == [False, True]
+        assert client.events.count(("page", "s1a0")) == 1
+
+
+class TestNeverSent:
+    """Test which failures are known not to have reached Moodle"""
+
+    def test_exception_chains(self):
+        from src.clients.moodle_client_enhanced import MoodleAPIError, _never_sent
+        from src.clients.resilience import CircuitOpenError, DeadlineExceeded
+        from src.core.constants import ErrorCodes
+
+        def wrapped(error):
+            try:
+                try:
+                    raise error
+                except Exception as e:
+                    raise MoodleAPIError(str(e), ErrorCodes.CONNECTION_ERROR) from e
+            except MoodleAPIError as outer:
+                return outer
+
+        assert _never_sent(wrapped(CircuitOpenError("moodle.test", 5.0)))
+        assert _never_sent(wrapped(DeadlineExceeded("expired", sent=False)))
+        assert not _never_sent(wrapped(DeadlineExceeded("too slow")))
+        assert not _never_sent(MoodleAPIError("Request timed out", ErrorCodes.CONNECTION_ERROR))
@@ -0,0 +1,218 @@
+"""
+Unit tests for concurrent draft file uploads
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.clients.file_uploader import DraftFileUploader, UploadError, UploadSource
+from src.core.rate_limiter import RateLimiter
+
+
+def form_fields(form):
+    """Map FormData field names to their values"""
+    return {options["name"]: value for options, _, value in form._fields}
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.001)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return json.dumps(self.payload)
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+
+class FakeUploadSession:
+    """Answers upload.php like Moodle, allocating a draft itemid for itemid 0"""
+
+    def __init__(self):
+        self.uploads = []
+
+    def post(self, url, data):
+        fields = form_fields(data)
+        file = fields["file"]
+        body = file if isinstance(file, bytes) else file.read()
+        self.uploads.append({**fields, "body": body})
+
+        itemid = int(fields["itemid"]) or 777
+        return FakeResponse([{"itemid": itemid, "filename": "f", "url": f"draft/{itemid}/{len(self.uploads)}"}])
+
+
+class FakeSessionFactory:
+    def __init__(self, session):
+        self.session = session
+
+    async def get_session(self):
+        return self.session
+
+
+def make_uploader(session, **kwargs):
+    return DraftFileUploader(
+        "https://moodle.test",
+        "token",
+        session_factory=FakeSessionFactory(session),
+        rate_limiter=RateLimiter(rate=1000, burst=1000),
+        **kwargs,
+    )
+
+
+class TestUploadSource:
+    def test_requires_exactly_one_body(self):
+        with pytest.raises(ValueError):
+            UploadSource("a.py")
+        with pytest.raises(ValueError):
+            UploadSource("a.py", content=b"x", path="/tmp/a.py")
+
+
+class TestDraftFileUploader:
+    @pytest.mark.asyncio
+    async def test_upload_many_shares_draft_itemid(self):
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+
+        sources = [UploadSource(f"file{i}.py", content=f"print({i})".encode()) for i in range(5)]
+        results = await uploader.upload_many(sources)
+
+        assert [r["itemid"] for r in results] == [777] * 5
+        assert session.uploads[0]["itemid"] == "0"
+        assert {u["itemid"] for u in session.uploads[1:]} == {"777"}
+        assert all(u["filearea"] == "draft" for u in session.uploads)
+
+    @pytest.mark.asyncio
+    async def test_streams_files_from_disk(self, tmp_path):
+        path = tmp_path / "example.js"
+        path.write_bytes(b"console.log(1);")
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+
+        await uploader.upload(UploadSource("example.js", path=str(path)))
+
+        assert session.uploads[0]["body"] == b"console.log(1);"
+        assert uploader.get_stats()["bytes_uploaded"] == len(b"console.log(1);")
+
+    @pytest.mark.asyncio
+    async def test_dedupes_identical_payloads_within_scope(self, tmp_path):
+        path = tmp_path / "same.py"
+        path.write_bytes(b"x = 1")
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+
+        sources = [
+            UploadSource("same.py", content=b"x = 1"),
+            UploadSource("same.py", path=str(path)),
+            UploadSource("same.py", content=b"x = 1"),
+            UploadSource("b.py", content=b"x = 1"),
+        ]
+        results = await uploader.upload_many(sources, scope=42)
+
+        assert len(session.uploads) == 2
+        assert results[0] == results[1] == results[2]
+        assert uploader.get_stats()["deduplicated"] == 2
+        # Same bytes under another name still get their own draft file
+        assert session.uploads[1]["body"] == b"x = 1"
+
+        # Another course uploads its own copy
+        await uploader.upload(UploadSource("same.py", content=b"x = 1"), scope=43)
+        assert len(session.uploads) == 3
+
+    @pytest.mark.asyncio
+    async def test_upload_many_never_reuses_an_earlier_draft_area(self):
+        class AllocatingSession(FakeUploadSession):
+            """Allocates a new draft itemid for every itemid 0 upload"""
+
+            def post(self, url, data):
+                fields = form_fields(data)
+                self.uploads.append(fields)
+                itemid = int(fields["itemid"]) or 700 + len(self.uploads)
+                return FakeResponse([{"itemid": itemid, "url": "u"}])
+
+        session = AllocatingSession()
+        uploader = make_uploader(session)
+
+        source = UploadSource("a.py", content=b"x = 1")
+        first = await uploader.upload_many([source, UploadSource("b.py", content=b"y")], scope=1)
+        second = await uploader.upload_many([source, UploadSource("c.py", content=b"z")], scope=1)
+
+        assert first[0]["itemid"] != second[0]["itemid"]
+        assert session.uploads[-1]["itemid"] == str(second[0]["itemid"])
+
+    @pytest.mark.asyncio
+    async def test_dedupe_records_are_bounded(self):
+        session = FakeUploadSession()
+        uploader = make_uploader(session, dedupe_entries=2)
+
+        for i in range(5):
+            await uploader.upload(UploadSource(f"{i}.py", content=str(i).encode()), scope=1)
+
+        assert uploader.get_stats()["tracked_payloads"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_upload_once(self):
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+
+        source = UploadSource("a.py", content=b"x = 1")
+        await asyncio.gather(*(uploader.upload(source, scope=1) for _ in range(10)))
+
+        assert len(session.uploads) == 1
+
+    @pytest.mark.asyncio
+    async def test_forget_drops_scope(self):
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+        source = UploadSource("a.py", content=b"x = 1")
+
+        await uploader.upload(source, scope=1)
+        uploader.forget(1)
+        await uploader.upload(source, scope=1)
+
+        assert len(session.uploads) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        class Tracked(FakeResponse):
+            async def __aenter__(self):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.005)
+                in_flight -= 1
+                return self
+
+        session = FakeUploadSession()
+        session.post = lambda url, data: Tracked([{"itemid": 5, "url": "u"}])
+        uploader = make_uploader(session, max_concurrency=2)
+
+        sources = [UploadSource(f"f{i}.py", content=str(i).encode()) for i in range(8)]
+        await uploader.upload_many(sources)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_upload_error_is_raised_and_not_cached(self):
+        session = FakeUploadSession()
+        uploader = make_uploader(session)
+        session.post = lambda url, data: FakeResponse({"error": "quota exceeded"})
+
+        with pytest.raises(UploadError):
+            await uploader.upload(UploadSource("a.py", content=b"x"), scope=1)
+
+        assert uploader.get_stats()["tracked_payloads"] == 0
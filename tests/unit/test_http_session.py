@@ -0,0 +1,50 @@
+"""
+Unit tests for the shared HTTP session factory
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.clients.http_session import SharedSessionFactory
+from src.clients.moodle_client import MoodleClient
+from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+
+
+class TestSharedSessionFactory:
+    """Test that clients borrow pooled sessions"""
+
+    @pytest.mark.asyncio
+    async def test_clients_share_one_session(self):
+        factory = SharedSessionFactory(limit_per_host=4)
+        try:
+            basic = MoodleClient("http://moodle.test", "token", session_factory=factory)
+            plugin = EnhancedMoodleClient("http://moodle.test", "token", session_factory=factory)
+
+            async with basic, plugin:
+                assert basic.session is plugin.session
+            # Leaving the context must not close the pooled session
+            assert not basic.session.closed
+
+            async with basic:
+                pass
+            stats = factory.get_stats()
+            assert stats["sessions_created"] == 1
+            assert basic.session.connector.limit_per_host == 4
+        finally:
+            await factory.close()
+
+    def test_sessions_are_per_event_loop(self):
+        factory = SharedSessionFactory()
+
+        async def borrow():
+            session = await factory.get_session()
+            await factory.close()
+            return session
+
+        first = asyncio.run(borrow())
+        second = asyncio.run(borrow())
+        assert first is not second
+        assert factory.get_stats()["sessions_created"] == 2
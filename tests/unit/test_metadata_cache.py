@@ -0,0 +1,218 @@
+"""
+Unit tests for the read-only metadata cache
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+import pytest
+
+from src.clients.metadata_cache import MetadataCache
+
+SITE = "http://moodle.test"
+
+
+class CountingFetch:
+    def __init__(self, value=None, delay=0.0, error=None):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.value if self.value is not None else {"call": self.calls}
+
+
+class TestMetadataCache:
+    @pytest.mark.asyncio
+    async def test_hit_within_ttl(self):
+        cache = MetadataCache(ttls={"core_course_get_categories": 60})
+        fetch = CountingFetch()
+
+        first = await cache.get_or_fetch(SITE, "t", "core_course_get_categories", {}, fetch)
+        second = await cache.get_or_fetch(SITE, "t", "core_course_get_categories", None, fetch)
+
+        assert first == second == {"call": 1}
+        assert fetch.calls == 1
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_keys_include_token_and_params(self):
+        cache = MetadataCache(ttls={"core_course_get_contents": 60})
+        fetch = CountingFetch()
+
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 1}, fetch)
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 2}, fetch)
+        await cache.get_or_fetch(SITE, "other", "core_course_get_contents", {"courseid": 1}, fetch)
+
+        assert fetch.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_uncached_functions_and_expiry(self):
+        cache = MetadataCache(ttls={"core_course_get_courses": 0.01})
+        fetch = CountingFetch()
+
+        await cache.get_or_fetch(SITE, "t", "core_course_create_courses", {}, fetch)
+        await cache.get_or_fetch(SITE, "t", "core_course_create_courses", {}, fetch)
+        assert fetch.calls == 2
+
+        await cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, fetch)
+        await asyncio.sleep(0.02)
+        await cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, fetch)
+        assert fetch.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self):
+        cache = MetadataCache(ttls={"core_webservice_get_site_info": 60})
+        fetch = CountingFetch(delay=0.01)
+
+        results = await asyncio.gather(*(
+            cache.get_or_fetch(SITE, "t", "core_webservice_get_site_info", {}, fetch) for _ in range(10)
+        ))
+
+        assert fetch.calls == 1
+        assert all(r == {"call": 1} for r in results)
+        assert cache.get_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        cache = MetadataCache(ttls={"core_course_get_courses": 60})
+        failing = CountingFetch(delay=0.01, error=RuntimeError("down"))
+
+        results = await asyncio.gather(*(
+            cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, failing) for _ in range(3)
+        ), return_exceptions=True)
+
+        assert failing.calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, CountingFetch()) == {"call": 1}
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_matching_course(self):
+        cache = MetadataCache(ttls={"core_course_get_contents": 60})
+        fetch = CountingFetch()
+
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 1}, fetch)
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 2}, fetch)
+        cache.invalidate_for_write(SITE, "core_course_edit_section", {"courseid": 1})
+
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 1}, fetch)
+        await cache.get_or_fetch(SITE, "t", "core_course_get_contents", {"courseid": 2}, fetch)
+        assert fetch.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_every_token_of_the_site(self):
+        cache = MetadataCache(ttls={"core_course_get_contents": 60})
+        fetch = CountingFetch()
+
+        await cache.get_or_fetch(SITE, "basic", "core_course_get_contents", {"courseid": 1}, fetch)
+        await cache.get_or_fetch("http://other.test", "basic", "core_course_get_contents", {"courseid": 1}, fetch)
+        cache.invalidate_for_write(SITE, "local_moodleclaude_create_page_activity", {"courseid": 1})
+
+        await cache.get_or_fetch(SITE, "basic", "core_course_get_contents", {"courseid": 1}, fetch)
+        await cache.get_or_fetch("http://other.test", "basic", "core_course_get_contents", {"courseid": 1}, fetch)
+        assert fetch.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_fetch_discards_result(self):
+        cache = MetadataCache(ttls={"core_course_get_courses": 60})
+        fetch = CountingFetch(delay=0.01)
+
+        pending = asyncio.ensure_future(cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, fetch))
+        await asyncio.sleep(0)
+        cache.invalidate_for_write(SITE, "core_course_create_courses", {"courses": [{"fullname": "x"}]})
+        await pending
+
+        await cache.get_or_fetch(SITE, "t", "core_course_get_courses", {}, fetch)
+        assert fetch.calls == 2
+
+
+class FakeMoodle:
+    """Answers the course creation path and counts requests per wsfunction"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_session(self):
+        return self
+
+    def post(self, url, data, headers=None):
+        function = dict(parse_qsl(data.decode()))["wsfunction"]
+        self.calls.append(function)
+        payloads = {
+            "core_course_get_categories": [{"id": 7, "name": "MoodleClaude Courses"}],
+            "core_course_create_courses": [{"id": 42 + len(self.calls), "shortname": "c"}],
+            "core_webservice_get_site_info": {"userid": 2, "username": "admin"},
+            "core_enrol_get_users_courses": [],
+            "core_enrol_get_course_enrolment_methods": [{"id": 1, "type": "self", "status": 0}],
+            "enrol_self_enrol_user": {"status": True},
+            "core_course_get_contents": [{"id": 1, "modules": []}],
+            "local_moodleclaude_create_page_activity": {"success": True, "cmid": 5},
+        }
+        return FakeResponse(payloads[function])
+
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+
+class TestMoodleClientCaching:
+    @pytest.mark.asyncio
+    async def test_repeated_course_creation_skips_metadata_calls(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.moodle_client import MoodleClient
+        from src.core.rate_limiter import RateLimiter
+
+        moodle = FakeMoodle()
+        client = MoodleClient(
+            "http://moodle.test", "token",
+            rate_limiter=RateLimiter(rate=1000, burst=1000),
+            session_factory=moodle,
+            metadata_cache=MetadataCache(),
+        )
+
+        await client.create_course("First")
+        moodle.calls.clear()
+        await client.create_course("Second")
+
+        assert "core_course_get_categories" not in moodle.calls
+        assert "core_webservice_get_site_info" not in moodle.calls
+        assert moodle.calls[0] == "core_course_create_courses"
+
+    @pytest.mark.asyncio
+    async def test_plugin_writes_invalidate_basic_client_results(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.moodle_client import MoodleClient
+        from src.clients.moodle_client_enhanced import EnhancedMoodleClient
+        from src.core.rate_limiter import RateLimiter
+
+        moodle = FakeMoodle()
+        cache = MetadataCache()
+        limiter = RateLimiter(rate=1000, burst=1000)
+        basic = MoodleClient("http://moodle.test", "basic", rate_limiter=limiter,
+                             session_factory=moodle, metadata_cache=cache)
+        plugin = EnhancedMoodleClient("http://moodle.test/", token="plugin", rate_limiter=limiter,
+                                      session_factory=moodle, metadata_cache=cache)
+
+        await basic._call_api("core_course_get_contents", {"courseid": 3})
+        await plugin._call_api("local_moodleclaude_create_page_activity", {"courseid": 3, "name": "p"})
+        await basic._call_api("core_course_get_contents", {"courseid": 3})
+
+        assert moodle.calls.count("core_course_get_contents") == 2
@@ -0,0 +1,83 @@
+"""
+Unit tests for the Moodle web service parameter encoder
+"""
+
+import email
+from email import policy
+from urllib.parse import parse_qsl
+
+from src.clients.param_encoder import encode_params, flatten_params
+
+
+def legacy_flatten_params(params, parent_key=""):
+    """The recursive per-level-dict implementation the encoder replaces"""
+    items = []
+    for k, v in params.items():
+        new_key = f"{parent_key}[{k}]" if parent_key else k
+        if isinstance(v, list):
+            for i, item in enumerate(v):
+                list_key = f"{new_key}[{i}]"
+                if isinstance(item, dict):
+                    items.extend(legacy_flatten_params(item, list_key).items())
+                else:
+                    items.append((list_key, item))
+            if not v:
+                items.append((new_key, []))
+        elif isinstance(v, dict):
+            items.extend(legacy_flatten_params(v, new_key).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+STRUCTURE = {
+    "courseid": 7,
+    "sections": [
+        {
+            "name": f"Section {s}",
+            "summary": "<p>Summary & more</p>",
+            "activities": [
+                {"type": "page", "name": f"Page {a}", "content": f"<h1>Ünïcode {a}</h1>", "visible": True}
+                for a in range(3)
+            ],
+            "tags": ["a", "b"],
+            "empty": [],
+        }
+        for s in range(4)
+    ],
+}
+
+
+class TestParamEncoder:
+    """Test flattening and body encoding"""
+
+    def test_flatten_matches_legacy_implementation(self):
+        assert flatten_params(STRUCTURE) == legacy_flatten_params(STRUCTURE)
+        assert flatten_params({"name": "x"}, "sections[0]") == {"sections[0][name]": "x"}
+
+    def test_urlencoded_round_trip(self):
+        encoded = encode_params({"wsfunction": "fn", **STRUCTURE})
+
+        assert encoded.content_type == "application/x-www-form-urlencoded"
+        fields = dict(parse_qsl(encoded.body.decode("ascii")))
+        assert fields["wsfunction"] == "fn"
+        assert fields["sections[2][activities][1][content]"] == "<h1>Ünïcode 1</h1>"
+        assert fields["sections[0][activities][0][visible]"] == "1"
+        assert "sections[0][empty]" not in fields
+
+    def test_large_payload_uses_multipart(self):
+        html = "<p>" + "x & y " * 100_000 + "</p>"
+        encoded = encode_params({"wsfunction": "fn", "sections": [{"content": html}]},
+                                multipart_threshold=1024)
+
+        assert encoded.content_type.startswith("multipart/form-data; boundary=")
+        message = email.message_from_bytes(
+            b"Content-Type: " + encoded.content_type.encode() + b"\r\n\r\n" + encoded.body,
+            policy=policy.HTTP,
+        )
+        fields = {
+            part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+            for part in message.iter_parts()
+        }
+        assert fields["wsfunction"] == b"fn"
+        assert fields["sections[0][content]"] == html.encode()
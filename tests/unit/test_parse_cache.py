@@ -0,0 +1,93 @@
+"""
+Unit tests for the content-addressed parse cache
+"""
+
+import os
+
+import pytest
+
+from src.core.content_parser import ChatContentParser
+from src.core.parse_cache import ParseCache, content_hash
+
+CHAT = (
+    "Here's a function that adds numbers:\n"
+    "```python\ndef add(a, b):\n    return a + b\n```\n\n"
+    "This explanation covers the concept of functions in python programming."
+)
+
+
+class CountingParser(ChatContentParser):
+    """Parser that counts parse_chat calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def parse_chat(self, chat_content, max_workers=None):
+        self.calls += 1
+        return super().parse_chat(chat_content, max_workers)
+
+
+class TestParseCache:
+    """Test ParseCache behaviour"""
+
+    @pytest.fixture
+    def parser(self):
+        return CountingParser()
+
+    def test_repeated_content_parses_once(self, parser):
+        cache = ParseCache()
+
+        first = cache.get_or_parse(parser, CHAT)
+        second = cache.get_or_parse(parser, CHAT, content_hash(CHAT))
+
+        assert parser.calls == 1
+        assert first.items == second.items
+        assert cache.get_stats()["hits"] == 1
+
+    def test_lru_eviction_by_entry_count(self, parser):
+        cache = ParseCache(max_entries=1)
+
+        cache.get_or_parse(parser, CHAT)
+        cache.get_or_parse(parser, CHAT + "\n\nMore text")
+        cache.get_or_parse(parser, CHAT)
+
+        assert parser.calls == 3
+        assert cache.get_stats()["evictions"] == 2
+
+    def test_disk_tier_survives_new_cache(self, parser, tmp_path):
+        ParseCache(disk_dir=str(tmp_path)).get_or_parse(parser, CHAT)
+
+        restored = ParseCache(disk_dir=str(tmp_path)).get_or_parse(parser, CHAT)
+
+        assert parser.calls == 1
+        assert [item.to_dict() for item in restored.items] == [
+            item.to_dict() for item in ChatContentParser().parse_chat(CHAT).items
+        ]
+
+    def test_disk_tier_stores_json_not_pickle(self, parser, tmp_path):
+        ParseCache(disk_dir=str(tmp_path)).get_or_parse(parser, CHAT)
+
+        assert [path.name for path in tmp_path.iterdir()] == [f"{content_hash(CHAT)}.json"]
+        (tmp_path / f"{content_hash(CHAT)}.pickle").write_bytes(b"not trusted")
+        (tmp_path / f"{content_hash(CHAT)}.json").write_text("{broken")
+
+        assert ParseCache(disk_dir=str(tmp_path)).get(content_hash(CHAT)) is None
+
+    def test_disk_tier_evicts_least_recently_used(self, parser, tmp_path):
+        chats = [CHAT + f"\n\nExtra paragraph number {i} about python functions." for i in range(3)]
+        cache = ParseCache(max_entries=1, disk_dir=str(tmp_path))
+        cache.get_or_parse(parser, chats[0])
+        entry_size = (tmp_path / f"{content_hash(chats[0])}.json").stat().st_size
+        cache.disk_max_bytes = 2 * entry_size + entry_size // 2
+
+        for i, chat in enumerate(chats):
+            cache.get_or_parse(parser, chat)
+            path = tmp_path / f"{content_hash(chat)}.json"
+            if path.exists():
+                os.utime(path, (1000 + i, 1000 + i))
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+            f"{content_hash(chat)}.json" for chat in chats[1:]
+        )
+        assert cache.get_stats()["disk_evictions"] == 1
@@ -0,0 +1,57 @@
+"""
+Unit tests for the token-bucket rate limiter
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestRateLimiter:
+    """Test token bucket and per-function budgets"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_sustained_rate(self):
+        bucket = TokenBucket(rate=50, capacity=3)
+
+        started = time.monotonic()
+        waits = await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        elapsed = time.monotonic() - started
+
+        # Three calls fit the burst, the other three are spaced 20 ms apart
+        assert sorted(waits)[:3] == [0.0, 0.0, 0.0]
+        assert elapsed >= 0.05
+        stats = bucket.get_stats()
+        assert stats["acquired"] == 6
+        assert stats["throttled"] == 3
+        assert stats["max_wait"] >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_function_budget_is_independent(self):
+        limiter = RateLimiter(rate=1000, burst=100, function_limits={"slow_function": (10, 1)})
+
+        await limiter.acquire("slow_function")
+        assert await limiter.acquire("fast_function") == 0.0
+        assert await limiter.acquire("slow_function") > 0.0
+
+        stats = limiter.get_stats()
+        assert stats["site"]["acquired"] == 3
+        assert stats["functions"]["slow_function"]["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_refunds_tokens(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        await bucket.acquire()
+
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # The abandoned reservation must not push later callers further back
+        assert bucket.reserve() <= 1.0
+        assert bucket.get_stats()["acquired"] == 1
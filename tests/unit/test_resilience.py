@@ -0,0 +1,259 @@
+"""
+Unit tests for circuit breakers, hedged requests and deadline propagation
+"""
+
+import asyncio
+
+import pytest
+
+from src.clients.resilience import (
+    BreakerRegistry, CircuitBreaker, CircuitOpenError, DeadlineExceeded,
+    call_deadline, hedged, remaining_time, retry_after, within_deadline,
+)
+
+
+class Outage(Exception):
+    pass
+
+
+async def fail():
+    raise Outage("down")
+
+
+async def succeed():
+    return "ok"
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("moodle.test", failure_threshold=2, recovery_timeout=60)
+
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert 0 < exc_info.value.retry_after <= 60
+        assert breaker.get_stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker("moodle.test", failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_admits_one_probe(self):
+        breaker = CircuitBreaker("moodle.test", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("moodle.test", failure_threshold=3, recovery_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestBreakerRegistry:
+    @pytest.mark.asyncio
+    async def test_function_circuit_is_isolated(self):
+        registry = BreakerRegistry(failure_threshold=2, recovery_timeout=60)
+
+        for _ in range(2):
+            with pytest.raises(Outage):
+                await registry.call("moodle.test", "broken_function", fail)
+            # The host keeps seeing successes, so only the function circuit opens
+            assert await registry.call("moodle.test", "core_course_get_courses", succeed) == "ok"
+
+        with pytest.raises(CircuitOpenError):
+            await registry.call("moodle.test", "broken_function", succeed)
+        assert await registry.call("moodle.test", "core_course_get_courses", succeed) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_host_circuit_blocks_every_function(self):
+        registry = BreakerRegistry(failure_threshold=2, recovery_timeout=60)
+
+        for function in ("a", "b"):
+            with pytest.raises(Outage):
+                await registry.call("moodle.test", function, fail)
+
+        with pytest.raises(CircuitOpenError):
+            await registry.call("moodle.test", "c", succeed)
+        assert await registry.call("other.test", "c", succeed) == "ok"
+        assert registry.get_stats()["moodle.test"]["state"] == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_application_errors_do_not_trip(self):
+        registry = BreakerRegistry(failure_threshold=1)
+
+        with pytest.raises(Outage):
+            await registry.call("moodle.test", "f", fail, is_failure=lambda e: False)
+
+        assert await registry.call("moodle.test", "f", succeed) == "ok"
+
+
+class TestHedged:
+    @pytest.mark.asyncio
+    async def test_duplicate_wins_over_slow_attempt(self):
+        delays = [1.0, 0.0]
+        started = []
+
+        async def fetch():
+            attempt = len(started)
+            started.append(attempt)
+            await asyncio.sleep(delays[attempt])
+            return attempt
+
+        assert await asyncio.wait_for(hedged(fetch, delay=0.01), timeout=0.5) == 1
+        assert started == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_fast_attempt_is_not_duplicated(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return "ok"
+
+        assert await hedged(fetch, delay=0.05) == "ok"
+        await asyncio.sleep(0.06)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_all_attempts_failing_raises(self):
+        async def fetch():
+            await asyncio.sleep(0.02)
+            raise Outage("down")
+
+        with pytest.raises(Outage):
+            await hedged(fetch, delay=0.01)
+
+
+class TestDeadlines:
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_calls(self):
+        with call_deadline(0.01):
+            with pytest.raises(DeadlineExceeded):
+                await within_deadline(asyncio.sleep(1))
+
+        assert remaining_time() is None
+        assert await within_deadline(succeed()) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_nested_deadline_only_shortens(self):
+        with call_deadline(0.05):
+            with call_deadline(10):
+                assert remaining_time() <= 0.05
+
+    @pytest.mark.asyncio
+    async def test_spawned_tasks_inherit_deadline(self):
+        with call_deadline(5):
+            inherited = await asyncio.ensure_future(self._remaining())
+
+        assert inherited is not None and inherited <= 5
+
+    @staticmethod
+    async def _remaining():
+        return remaining_time()
+
+
+def test_retry_after_follows_exception_chain():
+    try:
+        try:
+            raise CircuitOpenError("moodle.test", 12.0)
+        except CircuitOpenError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert retry_after(wrapped) == 12.0
+
+    assert retry_after(RuntimeError("plain")) is None
+
+
+class TestClientIntegration:
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_with_connection_error(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.metadata_cache import MetadataCache
+        from src.clients.moodle_client import MoodleAPIError, MoodleClient
+        from src.core.constants import ErrorCodes
+
+        class FailingClient(MoodleClient):
+            sent = 0
+
+            async def _send_request(self, function, params=None):
+                self.sent += 1
+                raise MoodleAPIError("HTTP 503", ErrorCodes.CONNECTION_ERROR)
+
+        client = FailingClient(
+            "http://moodle.test", "token",
+            metadata_cache=MetadataCache(ttls={}),
+            breakers=BreakerRegistry(failure_threshold=2, recovery_timeout=60),
+        )
+
+        for _ in range(3):
+            with pytest.raises(MoodleAPIError) as exc_info:
+                await client._call_api("core_course_create_courses", {})
+
+        assert client.sent == 2
+        assert exc_info.value.error_code == ErrorCodes.CONNECTION_ERROR
+        assert retry_after(exc_info.value) is not None
+
+    @pytest.mark.asyncio
+    async def test_deadline_timeouts_open_the_circuit(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.metadata_cache import MetadataCache
+        from src.clients.moodle_client import MoodleAPIError, MoodleClient
+
+        class SlowClient(MoodleClient):
+            sent = 0
+
+            async def _send_request(self, function, params=None):
+                self.sent += 1
+                await asyncio.sleep(1)
+
+        breakers = BreakerRegistry(failure_threshold=2, recovery_timeout=60)
+        client = SlowClient(
+            "http://moodle.test", "token", metadata_cache=MetadataCache(ttls={}), breakers=breakers,
+        )
+
+        for _ in range(3):
+            with call_deadline(0.01):
+                with pytest.raises(MoodleAPIError) as exc_info:
+                    await client._call_api("core_course_create_courses", {})
+
+        assert client.sent == 2
+        assert retry_after(exc_info.value) is not None
+        assert breakers.get_stats()["moodle.test"]["state"] == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_does_not_count_against_the_circuit(self):
+        pytest.importorskip("aiohttp")
+        from src.clients.metadata_cache import MetadataCache
+        from src.clients.moodle_client import MoodleAPIError, MoodleClient
+
+        breakers = BreakerRegistry(failure_threshold=1, recovery_timeout=60)
+        client = MoodleClient(
+            "http://moodle.test", "token", metadata_cache=MetadataCache(ttls={}), breakers=breakers,
+        )
+
+        with call_deadline(-1):
+            with pytest.raises(MoodleAPIError):
+                await client._call_api("core_course_create_courses", {})
+
+        assert breakers.get_stats()["moodle.test"]["failures"] == 0
@@ -0,0 +1,99 @@
+"""
+Unit tests for the cached session repository
+"""
+
+import json
+
+import pytest
+
+from src.core.interfaces import SessionView
+from src.core.repositories import CachedSessionRepository, InMemorySessionRepository
+
+
+class CountingRepository(InMemorySessionRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+        self.listings = 0
+
+    async def get_by_id(self, session_id, view=SessionView.FULL):
+        self.reads += 1
+        return await super().get_by_id(session_id, view)
+
+    async def get_active_sessions(self, limit=100):
+        self.listings += 1
+        return await super().get_active_sessions(limit)
+
+
+def session(session_id, content="x", **fields):
+    return {"session_id": session_id, "course_name": "Course", "state": "created",
+            "content": content, "progress": {"done": []}, **fields}
+
+
+class TestCachedSessionRepository:
+    @pytest.mark.asyncio
+    async def test_hits_return_immutable_snapshots(self):
+        primary = CountingRepository()
+        repo = CachedSessionRepository(primary)
+        await repo.save(session("s1"))
+
+        first = await repo.get_by_id("s1")
+        assert await repo.get_by_id("s1") is first
+        assert primary.reads == 0
+
+        with pytest.raises(TypeError):
+            first["state"] = "failed"
+        with pytest.raises(TypeError):
+            first["progress"]["done"].append(1)
+        assert json.loads(json.dumps(first))["progress"] == {"done": []}
+        copy = first.copy()
+        copy["state"] = "failed"
+
+        await repo.update_session_state("s1", "processing", {"course_id": 3})
+        updated = await repo.get_by_id("s1")
+        assert (updated["state"], updated["course_id"]) == ("processing", 3)
+        assert first["state"] == "created"
+        assert repo.get_cache_stats()["hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_by_count_and_bytes(self):
+        primary = CountingRepository()
+        repo = CachedSessionRepository(primary, cache_size=3, max_bytes=5000)
+
+        for i in range(3):
+            await repo.save(session(f"s{i}"))
+        await repo.get_by_id("s0")
+        await repo.save(session("s3"))
+        assert list(repo.cache) == ["s2", "s0", "s3"]
+
+        await repo.save(session("big", content="x" * 4000))
+        assert list(repo.cache) == ["s3", "big"]
+        assert repo.get_cache_stats()["evictions"] == 3
+        assert repo.get_cache_stats()["cache_bytes"] <= 5000
+
+        await repo.get_by_id("s1")
+        assert primary.reads == 1
+        assert repo.get_cache_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_active_sessions_are_served_from_index(self):
+        primary = CountingRepository()
+        repo = CachedSessionRepository(primary, index_ttl=60)
+        await repo.save(session("s1"))
+        await repo.save(session("s2"))
+
+        listed = await repo.get_active_sessions()
+        assert {entry["session_id"] for entry in listed} == {"s1", "s2"}
+        assert "content" not in listed[0]
+
+        await repo.update_session_state("s1", "processing", {})
+        await repo.delete("s2")
+        listed = await repo.get_active_sessions()
+        assert [(entry["session_id"], entry["state"]) for entry in listed] == [("s1", "processing")]
+        assert primary.listings == 1
+
+        # A new session reloads the index
+        await repo.save(session("s3"))
+        assert len(await repo.get_active_sessions()) == 2
+        assert primary.listings == 2
+        assert repo.get_cache_stats()["index_hits"] == 1
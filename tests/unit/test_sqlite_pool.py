@@ -0,0 +1,132 @@
+"""
+Unit tests for the pooled SQLite connections and the session repository on top
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.interfaces import SessionView
+from src.core.repositories import LazyChunks, SQLiteSessionRepository
+from src.core.sqlite_pool import SQLiteConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "sessions.db"), size=2)
+    yield pool
+    pool.close()
+
+
+class TestSQLiteConnectionPool:
+    @pytest.mark.asyncio
+    async def test_connections_are_reused_in_wal_mode(self, pool):
+        for _ in range(20):
+            mode = await pool.run(lambda db: db.execute("PRAGMA journal_mode").fetchone()[0])
+
+        assert mode == "wal"
+        assert pool.get_stats()["connections"] <= 2
+        assert pool.get_stats()["operations"] == 20
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_rolls_back(self, pool):
+        await pool.run(lambda db: db.execute("CREATE TABLE t (x INTEGER)"))
+
+        def insert_then_fail(db):
+            db.execute("INSERT INTO t VALUES (1)")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await pool.run(insert_then_fail)
+
+        assert await pool.run(lambda db: db.execute("SELECT COUNT(*) FROM t").fetchone()[0]) == 0
+        assert pool.get_stats()["rollbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_closed_pool_rejects_operations(self, pool):
+        pool.close()
+
+        with pytest.raises(RuntimeError):
+            await pool.run(lambda db: None)
+
+
+class TestSQLiteSessionRepository:
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path, pool):
+        repo = SQLiteSessionRepository(str(tmp_path / "sessions.db"), pool=pool)
+
+        await repo.save({
+            "session_id": "s1",
+            "content": "chat",
+            "course_name": "Course",
+            "progress": {"done": 1},
+            "chunks": ["a", "b"],
+            "metadata": {"source": {"kind": "chat"}},
+        })
+        assert await repo.update_session_state("s1", "processing", {"course_id": 7})
+
+        session = await repo.get_by_id("s1")
+        assert session["state"] == "processing"
+        assert session["course_id"] == 7
+        assert session["progress"] == {"done": 1}
+        assert session["chunks"] == ["a", "b"]
+        assert session["metadata"] == {"source": {"kind": "chat"}}
+
+        assert await repo.delete("s1")
+        assert await repo.get_by_id("s1") is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_creates_schema_once(self, tmp_path, pool):
+        repo = SQLiteSessionRepository(str(tmp_path / "sessions.db"), pool=pool)
+
+        await asyncio.gather(*(
+            repo.save({"session_id": f"s{i}", "content": "x", "course_name": "c"}) for i in range(10)
+        ))
+
+        stats = await repo.get_session_statistics()
+        assert stats["total_sessions"] == 10
+        assert stats["connection_pool"]["connections"] <= 2
+
+    @pytest.mark.asyncio
+    async def test_save_is_atomic(self, tmp_path, pool):
+        repo = SQLiteSessionRepository(str(tmp_path / "sessions.db"), pool=pool)
+        await repo.save({"session_id": "s1", "content": "x", "course_name": "c", "chunks": ["a"]})
+
+        with pytest.raises(Exception):
+            # Unserializable metadata fails after the session row was written
+            await repo.save({"session_id": "s1", "content": "y", "course_name": "c",
+                             "metadata": {"bad": object()}})
+
+        session = await repo.get_by_id("s1")
+        assert session["content"] == "x"
+        assert session["chunks"] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_views_load_only_their_fields(self, tmp_path, pool):
+        repo = SQLiteSessionRepository(str(tmp_path / "sessions.db"), pool=pool)
+        content = "first chunk\n\nsecond chunk"
+        await repo.save({
+            "session_id": "s1", "content": content, "course_name": "Course",
+            "progress": {"done": 1}, "chunks": content.split("\n\n"), "metadata": {"source": "chat"},
+        })
+
+        status = await repo.get_by_id("s1", SessionView.STATUS)
+        assert status["state"] == "created"
+        assert status["progress"] == {"done": 1}
+        assert not {"content", "chunks", "metadata", "course_structure"} & status.keys()
+
+        lazy = await repo.get_by_id("s1", SessionView.LAZY_CHUNKS)
+        assert "content" not in lazy
+        assert lazy["metadata"] == {"source": "chat"}
+        assert isinstance(lazy["chunks"], LazyChunks)
+        assert len(lazy["chunks"]) == 2 and not lazy["chunks"].loaded
+        with pytest.raises(RuntimeError):
+            lazy["chunks"][1]
+        assert await lazy["chunks"].load() == ["first chunk", "second chunk"]
+        assert lazy["chunks"][1] == "second chunk"
+
+        full = await repo.get_by_id("s1")
+        assert full["content"] == content
+        assert full["chunks"] == ["first chunk", "second chunk"]
+        assert full["chunks_processed"] == [0, 0]
+        assert await repo.get_by_id("missing", SessionView.STATUS) is None
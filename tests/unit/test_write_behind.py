@@ -0,0 +1,157 @@
+"""
+Unit tests for write-behind session persistence
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.core.adaptive_content_processor import ProcessingSession, ProcessingStrategy, SessionState
+from src.core.sqlite_pool import SQLiteConnectionPool
+from src.core.write_behind import WriteBehindQueue
+
+
+class RecordingWriter:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, db, batch):
+        if self.fail:
+            raise sqlite3.OperationalError("disk I/O error")
+        db.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT)")
+        db.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?)", batch)
+        self.batches.append(list(batch))
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "sessions.db"), size=1)
+    yield pool
+    pool.close()
+
+
+def rows(pool):
+    return pool.run_sync(lambda db: dict(db.execute("SELECT k, v FROM kv").fetchall()))
+
+
+class TestWriteBehindQueue:
+    def test_repeated_saves_are_coalesced(self, pool):
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(pool, writer, flush_interval=60)
+
+        for progress in range(10):
+            queue.submit("s1", f"progress {progress}")
+        queue.submit("s2", "created")
+        assert queue.flush(timeout=5)
+
+        assert writer.batches == [[("s1", "progress 9"), ("s2", "created")]]
+        assert queue.get_stats()["coalesced"] == 9
+        queue.close()
+
+    def test_interval_and_size_trigger_flush(self, pool):
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(pool, writer, flush_interval=0.01, max_batch=100)
+
+        queue.submit("s1", "a")
+        assert queue.flush(timeout=5)
+        assert rows(pool) == {"s1": "a"}
+
+        sized = WriteBehindQueue(pool, writer, flush_interval=60, max_batch=2)
+        sized.submit("s2", "b")
+        sized.submit("s3", "c")
+        assert sized.flush(timeout=5)
+        assert sized.get_stats()["batches"] == 1
+        queue.close()
+        sized.close()
+
+    def test_durable_submit_flushes_synced(self, pool):
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(pool, writer, flush_interval=60)
+
+        queue.submit("s1", "completed", durable=True)
+        assert queue.flush(timeout=5)
+
+        assert queue.get_stats()["durable_batches"] == 1
+        assert pool.run_sync(lambda db: db.execute("PRAGMA synchronous").fetchone()[0]) == 1  # NORMAL again
+        queue.close()
+
+    def test_close_flushes_and_later_saves_write_directly(self, pool):
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(pool, writer, flush_interval=60)
+
+        queue.submit("s1", "pending")
+        queue.close()
+        queue.submit("s2", "after close")
+
+        assert rows(pool) == {"s1": "pending", "s2": "after close"}
+
+    def test_failed_flush_is_logged_not_raised(self, pool):
+        queue = WriteBehindQueue(pool, RecordingWriter(fail=True), flush_interval=60)
+
+        queue.submit("s1", "x")
+        assert queue.flush(timeout=5)
+
+        assert queue.get_stats()["failures"] == 1
+        queue.close()
+
+
+class TestSessionManagerPersistence:
+    @pytest.mark.asyncio
+    async def test_progress_saves_skip_unchanged_content(self, tmp_path):
+        from src.core.intelligent_session_manager import IntelligentSessionManager, SessionDatabase
+
+        db_path = str(tmp_path / "sessions.db")
+        manager = IntelligentSessionManager(db_config=SessionDatabase(db_path=db_path))
+        session = ProcessingSession(
+            session_id="s1", content_hash="h", original_content="x" * 100_000,
+            strategy=ProcessingStrategy.INTELLIGENT_CHUNK, course_name="Course", total_chunks=3,
+        )
+
+        manager._save_session_to_db(session)
+        manager._session_writer.flush()
+        for chunk in range(3):
+            session.processed_chunks = chunk + 1
+            manager._save_session_to_db(session)
+        session.state = SessionState.COMPLETED
+        manager._save_session_to_db(session)
+        manager._session_writer.flush()
+
+        with sqlite3.connect(db_path) as conn:
+            state, processed, content_length = conn.execute(
+                "SELECT state, processed_chunks, size FROM sessions "
+                "JOIN content_blobs ON content_blobs.content_hash = sessions.content_ref"
+            ).fetchone()
+        assert (state, processed, content_length) == ("completed", 3, 100_000)
+        assert manager._session_writer.get_stats()["batches"] == 2
+
+        await manager.cleanup_and_shutdown()
+
+    @pytest.mark.asyncio
+    async def test_analytics_count_queued_saves_off_the_event_loop(self, tmp_path):
+        from src.core.intelligent_session_manager import IntelligentSessionManager, SessionDatabase
+
+        manager = IntelligentSessionManager(db_config=SessionDatabase(db_path=str(tmp_path / "sessions.db")))
+        session = ProcessingSession(
+            session_id="s1", content_hash="h", original_content="content",
+            strategy=ProcessingStrategy.SINGLE_PASS, course_name="Course", total_chunks=1,
+        )
+        manager._save_session_to_db(session)
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        analytics = await manager.load_session_analytics()
+        ticker.cancel()
+
+        assert analytics["overall"]["total_sessions"] == 1
+        assert ticks > 0
+
+        await manager.cleanup_and_shutdown()
@@ -0,0 +1,47 @@
+"""
+Unit tests for the JSON backend and typed web service responses
+"""
+
+import json
+
+import pytest
+
+from src.clients import json_codec
+from src.clients.ws_responses import SiteInfo
+
+
+class TestJsonCodec:
+    def test_round_trip_bytes_and_str(self):
+        payload = {"name": "Über", "ids": [1, 2, 3], "nested": {"ok": True}}
+
+        assert json_codec.loads(json.dumps(payload).encode("utf-8")) == payload
+        assert json_codec.loads(json_codec.dumps(payload)) == payload
+
+    def test_decode_error(self):
+        with pytest.raises(json_codec.DecodeError):
+            json_codec.loads(b"<html>Not JSON</html>")
+
+
+class TestSiteInfo:
+    def test_function_lookup(self):
+        info = SiteInfo.from_dict({
+            "sitename": "Moodle",
+            "userid": 2,
+            "functions": [{"name": "core_course_get_contents"}, {"name": "local_moodleclaude_batch"}],
+        })
+
+        assert info.userid == 2
+        assert info.lists_functions
+        assert info.has_function("local_moodleclaude_batch")
+        assert not info.has_function("local_moodleclaude_create_page_activity")
+
+    def test_missing_function_list(self):
+        info = SiteInfo.from_dict({"sitename": "Moodle"})
+
+        assert not info.lists_functions
+        assert not info.has_function("core_course_get_contents")
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            SiteInfo().extra = 1
+
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call latency of pooled vs per-client HTTP sessions
+
+Usage:
+    python tools/benchmarks/bench_http_pool.py [--calls 500] [--concurrency 4]
+
+Starts a local stub Moodle web service that answers every wsfunction with
+a small JSON document, then times MoodleClient calls two ways:
+
+- per-client: a fresh aiohttp.ClientSession per ``async with`` block, the
+  previous behaviour where every tool call paid a new TCP handshake
+- pooled: clients borrowing from the shared keep-alive session factory
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.clients.http_session import SharedSessionFactory
+from src.clients.metadata_cache import MetadataCache
+from src.clients.moodle_client import MoodleClient
+from src.core.constants import Defaults
+from src.core.rate_limiter import RateLimiter
+
+
+class FixedSessionFactory:
+    """Factory lending one caller-owned session, reproducing the old per-client sessions"""
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+
+    async def get_session(self):
+        return self.session
+
+
+async def stub_moodle(request: web.Request) -> web.Response:
+    """Answer any wsfunction the way core_webservice_get_site_info would"""
+    form = await request.post()
+    return web.json_response({"sitename": "stub", "userid": 2, "function": form.get("wsfunction")})
+
+
+async def start_stub_server():
+    app = web.Application()
+    app.router.add_post(Defaults.WEBSERVICE_PATH, stub_moodle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def time_calls(base_url: str, factory: Optional[SharedSessionFactory], calls: int, concurrency: int):
+    # Effectively unlimited budget so only connection handling is measured
+    limiter = RateLimiter(rate=1e9, burst=1e9)
+    # Site info is cacheable; disable caching so every call reaches the server
+    uncached = MetadataCache(ttls={})
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            start = time.perf_counter()
+            # One client per call, as each MCP tool call enters its clients anew
+            if factory is None:
+                async with aiohttp.ClientSession() as session:
+                    client = MoodleClient(base_url, "token", rate_limiter=limiter,
+                                          session_factory=FixedSessionFactory(session),
+                                          metadata_cache=uncached)
+                    await client._call_api("core_webservice_get_site_info")
+            else:
+                async with MoodleClient(base_url, "token", rate_limiter=limiter,
+                                        session_factory=factory, metadata_cache=uncached) as client:
+                    await client._call_api("core_webservice_get_site_info")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies, total: float):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:12} mean {statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"p95 {p95 * 1000:7.2f} ms  total {total:6.2f} s")
+
+
+async def run(calls: int, concurrency: int):
+    runner, base_url = await start_stub_server()
+    try:
+        latencies, total = await time_calls(base_url, None, calls, concurrency)
+        report("per-client", latencies, total)
+
+        pooled = SharedSessionFactory()
+        latencies, total = await time_calls(base_url, pooled, calls, concurrency)
+        report("pooled", latencies, total)
+        print(f"{'':12} sessions created: {pooled.get_stats()['sessions_created']}")
+        await pooled.close()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--calls", type=int, default=500)
+    arg_parser.add_argument("--concurrency", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding of large Moodle web service responses
+
+Usage:
+    python tools/benchmarks/bench_json_decoding.py [--repeat 20] [RESPONSE.json ...]
+
+Times core_webservice_get_site_info and core_course_get_contents responses
+decoded three ways:
+
+- stdlib: json.loads on the decoded text, as aiohttp's response.json() does
+- backend: json_codec.loads on the raw bytes (orjson/msgspec when installed)
+- plugin check: the old list-building membership test vs SiteInfo.has_function
+
+Pass recorded responses (raw bodies saved from the web service) to time
+those; a site info file is recognised by its "functions" key. Without
+arguments, responses shaped like a Moodle 4.x site are generated.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.clients import json_codec
+from src.clients.ws_responses import SiteInfo, parse_course_contents
+
+PLUGIN_FUNCTION = "local_moodleclaude_create_page_activity"
+
+
+def make_site_info(functions: int = 700) -> bytes:
+    """Site info of an admin token, with the plugin function listed last"""
+    return json.dumps({
+        "sitename": "MoodleClaude",
+        "siteurl": "https://moodle.example.com",
+        "userid": 2,
+        "username": "admin",
+        "release": "4.3.2 (Build: 20231222)",
+        "version": "2023100902",
+        "functions": [{"name": f"core_function_{i}", "version": "2023100902"} for i in range(functions)]
+        + [{"name": PLUGIN_FUNCTION, "version": "2026101600"}],
+    }).encode("utf-8")
+
+
+def make_course_contents(sections: int = 30, modules: int = 25) -> bytes:
+    """Course contents of a code-heavy course with page modules"""
+    return json.dumps([
+        {
+            "id": 100 + s,
+            "name": f"Section {s}",
+            "section": s,
+            "summary": f"<p>Summary of section {s} with <code>inline code</code></p>" * 5,
+            "visible": 1,
+            "modules": [
+                {
+                    "id": 1000 + s * modules + m,
+                    "name": f"Example {s}.{m}",
+                    "modname": "page",
+                    "instance": s * modules + m,
+                    "visible": 1,
+                    "url": f"https://moodle.example.com/mod/page/view.php?id={1000 + s * modules + m}",
+                    "contents": [{"type": "file", "filename": "index.html", "filesize": 4096,
+                                  "fileurl": "https://moodle.example.com/webservice/pluginfile.php/1/mod_page/content/index.html"}],
+                }
+                for m in range(modules)
+            ],
+        }
+        for s in range(sections)
+    ]).encode("utf-8")
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_plugin_check(site_info):
+    functions = [f.get("name", "") for f in site_info["functions"]]
+    return PLUGIN_FUNCTION in functions, "local_moodleclaude_batch" in functions
+
+
+def typed_plugin_check(site_info):
+    info = SiteInfo.from_dict(site_info)
+    return info.has_function(PLUGIN_FUNCTION), info.has_function("local_moodleclaude_batch")
+
+
+def bench_response(label: str, body: bytes, repeat: int):
+    stdlib = best_of(lambda: json.loads(body.decode("utf-8")), repeat)
+    backend = best_of(lambda: json_codec.loads(body), repeat)
+    print(f"{label:16} {len(body) / 1024:8.1f} KB  stdlib {stdlib * 1000:7.2f} ms  "
+          f"{json_codec.BACKEND} {backend * 1000:7.2f} ms  ({stdlib / backend:.1f}x)")
+
+    decoded = json_codec.loads(body)
+    if isinstance(decoded, dict) and "functions" in decoded:
+        legacy = best_of(lambda: legacy_plugin_check(decoded), repeat)
+        typed = best_of(lambda: typed_plugin_check(decoded), repeat)
+        print(f"{'':16} plugin check  list {legacy * 1e6:7.1f} us  SiteInfo {typed * 1e6:7.1f} us")
+    elif isinstance(decoded, list):
+        typed = best_of(lambda: parse_course_contents(decoded), repeat)
+        print(f"{'':16} section views {typed * 1e6:7.1f} us")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("responses", nargs="*", help="Recorded response bodies")
+    args = arg_parser.parse_args()
+
+    print(f"JSON backend: {json_codec.BACKEND}, best of {args.repeat}")
+    if args.responses:
+        for path in args.responses:
+            with open(path, "rb") as f:
+                bench_response(os.path.basename(path), f.read(), args.repeat)
+    else:
+        bench_response("site_info", make_site_info(), args.repeat)
+        bench_response("course_contents", make_course_contents(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
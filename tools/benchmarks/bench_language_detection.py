@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled language detector against the legacy per-pattern scorer
+
+Usage:
+    python tools/benchmarks/bench_language_detection.py [transcript ...]
+
+Without arguments a synthetic ~200 KB transcript is generated.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.content_parser import ChatContentParser
+
+SAMPLE_BLOCKS = [
+    "def greet(name):\n    # Say hello\n    return f'Hello, {name}!'",
+    "function greet(name) {\n    console.log('Hello ' + name);\n}\nconst x = () => 1;",
+    "public class Main {\n    public static void main(String[] args) {\n        System.out.println(1);\n    }\n}",
+    "SELECT id, name FROM users WHERE active = 1;\nCREATE TABLE t (id INT);",
+    "#include <stdio.h>\nint main() {\n    printf(\"hi\");\n    return 0;\n}",
+    "<!DOCTYPE html>\n<html><body><div class=\"x\"><span>Hi</span></div></body></html>",
+    ".card {\n  font-family: sans-serif;\n  background-color: #fff;\n}\n@media (max-width: 600px) {}",
+    "#!/bin/bash\necho $HOME | grep root | awk '{print $1}'",
+    "fn main() {\n    let x = 5;\n    match x { _ => () }\n}\nimpl Foo {}",
+    "package main\nimport (\n  \"fmt\"\n)\nfunc main() { go func() {}() }",
+]
+
+
+def legacy_detect_language(language_patterns, code: str) -> str:
+    """The scorer ChatContentParser used before CompiledLanguageDetector"""
+    scores = {}
+    for language, patterns in language_patterns.items():
+        score = 0
+        for pattern in patterns:
+            score += len(re.findall(pattern, code, re.IGNORECASE | re.MULTILINE))
+        if score > 0:
+            scores[language] = score
+
+    if scores:
+        return max(scores.keys(), key=lambda k: scores[k])
+    return "text"
+
+
+def build_synthetic_corpus(target_bytes: int = 200_000) -> str:
+    """Build a transcript of fenced blocks separated by prose"""
+    parts = []
+    size = 0
+    index = 0
+    while size < target_bytes:
+        block = SAMPLE_BLOCKS[index % len(SAMPLE_BLOCKS)]
+        part = f"Here is example {index} of the concept.\n\n```\n{block}\n```\n\n"
+        parts.append(part)
+        size += len(part)
+        index += 1
+    return "".join(parts)
+
+
+def collect_snippets(parser: ChatContentParser, transcript: str):
+    """Collect every snippet the parser would run language detection on"""
+    snippets = [m.group(2).strip() for m in parser.code_block_pattern.finditer(transcript)]
+    snippets.extend(m.group(1).strip() for m in parser.inline_code_pattern.finditer(transcript))
+    return [snippet for snippet in snippets if snippet]
+
+
+def time_it(func, snippets, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for snippet in snippets:
+            func(snippet)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("transcripts", nargs="*", help="Chat transcript files")
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    if args.transcripts:
+        corpus = ""
+        for path in args.transcripts:
+            with open(path, "r", encoding="utf-8") as f:
+                corpus += f.read() + "\n\n"
+    else:
+        corpus = build_synthetic_corpus()
+
+    parser = ChatContentParser()
+    snippets = collect_snippets(parser, corpus)
+
+    mismatches = [
+        snippet
+        for snippet in snippets
+        if legacy_detect_language(parser.language_patterns, snippet)
+        != parser._detect_language(snippet)
+    ]
+
+    legacy = time_it(
+        lambda code: legacy_detect_language(parser.language_patterns, code), snippets, args.rounds
+    )
+    compiled = time_it(parser._detect_language, snippets, args.rounds)
+
+    print(f"Corpus: {len(corpus):,} bytes, {len(snippets)} snippets, {args.rounds} rounds")
+    print(f"Legacy scorer:   {legacy * 1000:8.1f} ms")
+    print(f"Compiled scorer: {compiled * 1000:8.1f} ms ({legacy / compiled:.1f}x)")
+    print(f"Winner mismatches: {len(mismatches)}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
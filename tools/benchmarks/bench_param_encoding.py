@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark web service parameter encoding for large course structures
+
+Usage:
+    python tools/benchmarks/bench_param_encoding.py [--megabytes 5] [--repeat 5]
+
+Builds a local_moodleclaude_create_course_structure payload of roughly the
+requested size and compares:
+
+- legacy: recursive _flatten_params (a dict per nesting level) followed by
+  urlencode(doseq=True), which is what aiohttp's FormData does with a dict
+- urlencoded: the single-pass encoder forced to url-encode
+- auto: the single-pass encoder, switching to multipart for large bodies
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.clients.param_encoder import encode_params
+
+
+def legacy_flatten_params(params, parent_key=""):
+    items = []
+    for k, v in params.items():
+        new_key = f"{parent_key}[{k}]" if parent_key else k
+        if isinstance(v, list):
+            for i, item in enumerate(v):
+                list_key = f"{new_key}[{i}]"
+                if isinstance(item, dict):
+                    items.extend(legacy_flatten_params(item, list_key).items())
+                else:
+                    items.append((list_key, item))
+            if not v:
+                items.append((new_key, []))
+        elif isinstance(v, dict):
+            items.extend(legacy_flatten_params(v, new_key).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def legacy_encode(data):
+    flattened = legacy_flatten_params(data)
+    return urlencode(flattened, doseq=True).encode("ascii")
+
+
+def make_payload(megabytes: float):
+    """Course structure with code-heavy HTML pages totalling ~megabytes"""
+    block = (
+        '<div class="code-block"><pre><code class="language-python">'
+        "def fib(n):\n    return n if n < 2 else fib(n - 1) + fib(n - 2)\n"
+        "</code></pre><p>Explanation with &amp; entities, \"quotes\" and ümlauts.</p></div>\n"
+    )
+    activities_per_section = 25
+    sections = 20
+    page = block * max(1, int(megabytes * 1024 * 1024 / (sections * activities_per_section * len(block))))
+    return {
+        "wstoken": "token",
+        "wsfunction": "local_moodleclaude_create_course_structure",
+        "moodlewsrestformat": "json",
+        "courseid": 42,
+        "sections": [
+            {
+                "name": f"Section {s}",
+                "summary": f"<p>Summary {s}</p>",
+                "activities": [
+                    {"type": "page", "name": f"Page {s}.{a}", "content": page}
+                    for a in range(activities_per_section)
+                ],
+            }
+            for s in range(sections)
+        ],
+    }
+
+
+def measure(label, func, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(payload)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:12} {best * 1000:9.1f} ms   body {len(body) / 1024 / 1024:6.2f} MB")
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--megabytes", type=float, default=5.0)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    payload = make_payload(args.megabytes)
+    print(f"Payload: ~{args.megabytes} MB of page content, best of {args.repeat}")
+
+    legacy = measure("legacy", legacy_encode, payload, args.repeat)
+    measure("urlencoded", lambda p: encode_params(p, multipart_threshold=float("inf")).body,
+            payload, args.repeat)
+    auto = measure("auto", lambda p: encode_params(p).body, payload, args.repeat)
+    print(f"Speedup (auto vs legacy): {legacy / auto:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
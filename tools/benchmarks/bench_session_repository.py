@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLiteSessionRepository with pooled vs per-operation connections
+
+Usage:
+    python tools/benchmarks/bench_session_repository.py [--ops 10000] [--concurrency 8]
+
+Runs the same random mix of operations (50% get_by_id, 25%
+update_session_state, 20% save, 5% delete) against a fresh database two ways:
+
+- per-operation: a new connection and thread for every operation without
+  WAL, like the previous aiosqlite.connect() per call (which additionally
+  hopped threads once per statement)
+- pooled: the shared SQLiteConnectionPool with WAL and tuned pragmas
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.repositories import SQLiteSessionRepository
+from src.core.sqlite_pool import SQLiteConnectionPool
+
+
+class PerOperationConnections:
+    """Pool stand-in opening a fresh connection per operation, reproducing the old behaviour"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    async def run(self, fn):
+        def transaction():
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                result = fn(conn)
+                conn.commit()
+                return result
+            finally:
+                conn.close()
+
+        return await asyncio.to_thread(transaction)
+
+    def get_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def session(session_id: str, content_size: int):
+    return {
+        "session_id": session_id,
+        "content": "x" * content_size,
+        "course_name": f"Course {session_id}",
+        "progress": {"chunks_done": 0},
+        "chunks": ["chunk"] * 4,
+        "metadata": {"source": "benchmark"},
+    }
+
+
+async def time_operations(repo: SQLiteSessionRepository, ops: int, concurrency: int,
+                          sessions: int, content_size: int):
+    rng = random.Random(42)
+    ids = [f"s{i}" for i in range(sessions)]
+    for session_id in ids:
+        await repo.save(session(session_id, content_size))
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_operation(kind: str, session_id: str):
+        async with semaphore:
+            start = time.perf_counter()
+            if kind == "get":
+                await repo.get_by_id(session_id)
+            elif kind == "update":
+                await repo.update_session_state(session_id, "processing", {"progress": {"chunks_done": 1}})
+            elif kind == "save":
+                await repo.save(session(session_id, content_size))
+            else:
+                await repo.delete(session_id)
+                await repo.save(session(session_id, content_size))
+            latencies.append(time.perf_counter() - start)
+
+    kinds = rng.choices(["get", "update", "save", "delete"], weights=[50, 25, 20, 5], k=ops)
+    start = time.perf_counter()
+    await asyncio.gather(*(one_operation(kind, rng.choice(ids)) for kind in kinds))
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies, total: float):
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"{label:14} mean {statistics.mean(latencies) * 1000:7.3f} ms  "
+          f"p50 {statistics.median(latencies) * 1000:7.3f} ms  "
+          f"p99 {p99 * 1000:7.3f} ms  total {total:6.2f} s")
+
+
+async def run(ops: int, concurrency: int, sessions: int, content_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, make_pool in (
+            ("per-operation", PerOperationConnections),
+            ("pooled", SQLiteConnectionPool),
+        ):
+            db_path = os.path.join(tmp, f"{label}.db")
+            pool = make_pool(db_path)
+            repo = SQLiteSessionRepository(db_path, pool=pool)
+            latencies, total = await time_operations(repo, ops, concurrency, sessions, content_size)
+            report(label, latencies, total)
+            pool.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--ops", type=int, default=10000)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--sessions", type=int, default=200)
+    arg_parser.add_argument("--content-size", type=int, default=4096)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args.ops, args.concurrency, args.sessions, args.content_size))
+
+
+if __name__ == "__main__":
+    main()